@@ -0,0 +1,145 @@
+"""
+Compact numeric encoding of delay models.
+
+A delay model is encoded as a flat DevVarDoubleArray:
+
+    [version, num_models,
+     epoch, destination, num_rows, row, row, ...,   # first model
+     ...]                                           # other models
+
+where destination is one of DESTINATION_TYPES (as an index) and each row is
+ROW_LENGTH doubles: receptor ID, frequency slice ID and the NUM_COEFFS delay
+coefficients. The rows alone (a "delay details" array) are what the VCC and
+FSP UpdateDelayModelBinary commands take, optionally preceded by the epoch
+at which they are to be activated (see stage_rows).
+"""
+
+import numpy
+
+__all__ = [
+    "CODEC_VERSION",
+    "DESTINATION_TYPES",
+    "NUM_COEFFS",
+    "ROW_LENGTH",
+    "encode_delay_model",
+    "decode_delay_model",
+    "delay_details_to_rows",
+    "rows_to_delay_details",
+    "stage_rows",
+    "split_staged_rows",
+]
+
+CODEC_VERSION = 1
+DESTINATION_TYPES = ["vcc", "fsp"]
+NUM_COEFFS = 6
+ROW_LENGTH = 2 + NUM_COEFFS
+
+_HEADER_LENGTH = 2
+_MODEL_HEADER_LENGTH = 3
+
+
+def delay_details_to_rows(delay_details):
+    """
+    Convert the "delayDetails" of a JSON delay model to rows.
+
+    :param delay_details: list of receptor delay details
+    :return: array of shape (num_rows, ROW_LENGTH)
+    """
+    rows = [
+        [receptor["receptor"], frequency_slice["fsid"]] + list(frequency_slice["delayCoeff"])
+        for receptor in delay_details
+        for frequency_slice in receptor["receptorDelayDetails"]
+    ]
+    if any(len(row) != ROW_LENGTH for row in rows):
+        raise ValueError("'delayCoeff' must have {} coefficients".format(NUM_COEFFS))
+    return numpy.array(rows, dtype=numpy.float64).reshape(-1, ROW_LENGTH)
+
+
+def rows_to_delay_details(rows):
+    """Convert rows back to the "delayDetails" of a JSON delay model."""
+    delay_details = {}
+    for row in numpy.reshape(rows, (-1, ROW_LENGTH)):
+        delay_details.setdefault(int(row[0]), []).append({
+            "fsid": int(row[1]),
+            "delayCoeff": row[2:].tolist()
+        })
+    return [
+        {"receptor": receptor, "receptorDelayDetails": details}
+        for receptor, details in delay_details.items()
+    ]
+
+
+def encode_delay_model(delay_model_all):
+    """
+    Encode a JSON delay model (the object published on the delayModel
+    attribute, with a "delayModel" list).
+
+    :return: 1D float64 array
+    """
+    parts = [numpy.array([CODEC_VERSION, len(delay_model_all["delayModel"])], dtype=numpy.float64)]
+    for delay_model in delay_model_all["delayModel"]:
+        rows = delay_details_to_rows(delay_model["delayDetails"])
+        parts.append(numpy.array([
+            float(delay_model["epoch"]),
+            DESTINATION_TYPES.index(delay_model["destinationType"]),
+            len(rows)
+        ], dtype=numpy.float64))
+        parts.append(rows.ravel())
+    return numpy.concatenate(parts)
+
+
+def decode_delay_model(data):
+    """
+    Decode an encoded delay model.
+
+    :param data: 1D array of doubles, as produced by encode_delay_model
+    :return: list of (epoch, destination type, rows) tuples, where rows is
+        an array of shape (num_rows, ROW_LENGTH)
+    :raise ValueError: if the data is not a valid encoded delay model
+    """
+    data = numpy.asarray(data, dtype=numpy.float64)
+    if len(data) < _HEADER_LENGTH or int(data[0]) != CODEC_VERSION:
+        raise ValueError("Unsupported delay model encoding")
+
+    models = []
+    position = _HEADER_LENGTH
+    for _ in range(int(data[1])):
+        if position + _MODEL_HEADER_LENGTH > len(data):
+            raise ValueError("Truncated delay model")
+        epoch, destination, num_rows = data[position:position + _MODEL_HEADER_LENGTH]
+        position += _MODEL_HEADER_LENGTH
+        end = position + int(num_rows) * ROW_LENGTH
+        if end > len(data):
+            raise ValueError("Truncated delay model")
+        models.append((
+            epoch,
+            DESTINATION_TYPES[int(destination)],
+            data[position:end].reshape(-1, ROW_LENGTH)
+        ))
+        position = end
+    return models
+
+
+def stage_rows(epoch, rows):
+    """
+    Prefix flattened delay details rows with their activation epoch.
+
+    :return: [epoch, row, row, ...]
+    """
+    return numpy.concatenate(([float(epoch)], numpy.ravel(rows)))
+
+
+def split_staged_rows(data):
+    """
+    Split delay details rows from their optional activation epoch, as added
+    by stage_rows; a leading epoch makes the length one more than a
+    multiple of ROW_LENGTH.
+
+    :return: (epoch, rows), with epoch None if there is none
+    :raise ValueError: if the data is not made of whole rows
+    """
+    data = numpy.asarray(data, dtype=numpy.float64)
+    epoch = None
+    if len(data) % ROW_LENGTH == 1:
+        epoch, data = float(data[0]), data[1:]
+    return epoch, numpy.reshape(data, (-1, ROW_LENGTH))
@@ -0,0 +1,171 @@
+import os
+import threading
+
+import numpy
+
+from ska_mid_cbf_mcs.commons.delay_model_codec import NUM_COEFFS
+
+__all__ = ["DelayModelHistory", "HISTORY_DTYPE", "HISTORY_ROW_LENGTH", "export_path"]
+
+# one entry: the epoch of its model (the origin of its polynomial), when
+# it became active, for which receptor and frequency slice, and its delay
+# coefficients
+HISTORY_DTYPE = numpy.dtype([
+    ("epoch", numpy.float64),
+    ("active_from", numpy.float64),
+    ("receptor", numpy.uint16),
+    ("fsid", numpy.uint16),
+    ("coeffs", numpy.float64, (NUM_COEFFS,)),
+])
+# length of the rows returned by DelayModelHistory.query_rows:
+# epoch, receptor, fsid and the coefficients
+HISTORY_ROW_LENGTH = 3 + NUM_COEFFS
+
+
+def export_path(directory, file_name):
+    """
+    Path of a delay model history export, which may only be written to the
+    export directory of the device.
+
+    :param directory: the export directory
+    :param file_name: name of the file, without any directory
+    :return: the path of the file in the export directory
+    :raise ValueError: if the file name is empty or would lead out of the
+        directory
+    """
+    separators = {"/", "\\", os.sep, os.altsep} - {None}
+    if file_name in ("", ".") or ".." in file_name or "\0" in file_name \
+            or any(separator in file_name for separator in separators):
+        raise ValueError("Invalid file name {!r}: expected a name without "
+                         "directory".format(file_name))
+    if not directory:
+        raise ValueError("No export directory is set")
+    return os.path.join(directory, file_name)
+
+
+class DelayModelHistory:
+    """
+    Fixed-size ring buffer of the delay model entries activated on a device,
+    to find out which model was active at a given time.
+
+    Entries are kept in activation order: an entry is active from its epoch,
+    or from the activation of the last entry if its model arrived out of
+    order, so the activation times stay sorted and are searched by
+    bisection. The epoch itself is kept as it is, since it is the origin of
+    the delay polynomial. Once the buffer is full, the oldest entries are
+    overwritten.
+
+    :param capacity: maximum number of entries
+    """
+
+    def __init__(self, capacity):
+        self._entries = numpy.zeros(max(1, capacity), dtype=HISTORY_DTYPE)
+        self._lock = threading.Lock()
+        self._start = 0  # index of the oldest entry
+        self._count = 0
+
+    @property
+    def capacity(self):
+        return len(self._entries)
+
+    def __len__(self):
+        return self._count
+
+    def record(self, epoch, receptors, fsids, coeffs):
+        """
+        Record entries activated at an epoch.
+
+        :param epoch: activation time, in seconds since the Unix epoch
+        :param receptors: receptor ID of every entry (or a single one)
+        :param fsids: frequency slice ID of every entry (or a single one)
+        :param coeffs: coefficients of every entry, one row per entry
+        """
+        coeffs = numpy.asarray(coeffs, dtype=numpy.float64).reshape(-1, NUM_COEFFS)
+        receptors = numpy.broadcast_to(receptors, (len(coeffs),))
+        fsids = numpy.broadcast_to(fsids, (len(coeffs),))
+        # only the last entries fit if there are more than the capacity
+        num_entries = min(len(coeffs), self.capacity)
+        first = len(coeffs) - num_entries
+        receptors, fsids, coeffs = receptors[first:], fsids[first:], coeffs[first:]
+        with self._lock:
+            active_from = epoch
+            if self._count:
+                last = (self._start + self._count - 1) % self.capacity
+                active_from = max(epoch, self._entries["active_from"][last])
+            end = self._start + self._count
+            indices = numpy.arange(end, end + num_entries) % self.capacity
+            self._entries["epoch"][indices] = epoch
+            self._entries["active_from"][indices] = active_from
+            self._entries["receptor"][indices] = receptors
+            self._entries["fsid"][indices] = fsids
+            self._entries["coeffs"][indices] = coeffs
+            overflow = max(0, self._count + num_entries - self.capacity)
+            self._start = (self._start + overflow) % self.capacity
+            self._count += num_entries - overflow
+
+    def entries(self):
+        """:return: a copy of the entries, oldest first"""
+        with self._lock:
+            indices = (self._start + numpy.arange(self._count)) % self.capacity
+            return self._entries[indices]
+
+    def query(self, timestamp, receptor=None, fsid=None):
+        """
+        Find the entries active at a given time: for every receptor and
+        frequency slice, the last entry activated at or before it.
+
+        :param timestamp: time, in seconds since the Unix epoch
+        :param receptor: only return the entries of this receptor
+        :param fsid: only return the entries of this frequency slice
+        :return: the active entries, sorted by receptor and fsid; entries
+            older than the history are not known
+        """
+        with self._lock:
+            # the buffer holds two sorted runs: [start:] and [:start]
+            epochs = self._entries["active_from"]
+            end = self._start + self._count
+            if end <= self.capacity:
+                runs = [(self._start, end)]
+            else:
+                runs = [(self._start, self.capacity), (0, end - self.capacity)]
+            selected = []
+            for begin, stop in runs:
+                cut = begin + numpy.searchsorted(epochs[begin:stop], timestamp, side="right")
+                selected.append(numpy.arange(begin, cut))
+            entries = self._entries[numpy.concatenate(selected)]
+
+        mask = numpy.ones(len(entries), dtype=bool)
+        if receptor is not None:
+            mask &= entries["receptor"] == receptor
+        if fsid is not None:
+            mask &= entries["fsid"] == fsid
+        entries = entries[mask]
+
+        # last entry of every (receptor, fsid)
+        keys = entries["receptor"].astype(numpy.uint32) << 16 | entries["fsid"]
+        _, last_from_end = numpy.unique(keys[::-1], return_index=True)
+        return entries[len(entries) - 1 - last_from_end]
+
+    def query_rows(self, timestamp, receptor=None, fsid=None):
+        """
+        Same as query, flattened to rows of HISTORY_ROW_LENGTH doubles:
+        epoch, receptor, fsid and the coefficients.
+        """
+        entries = self.query(timestamp, receptor, fsid)
+        rows = numpy.empty((len(entries), HISTORY_ROW_LENGTH))
+        rows[:, 0] = entries["epoch"]
+        rows[:, 1] = entries["receptor"]
+        rows[:, 2] = entries["fsid"]
+        rows[:, 3:] = entries["coeffs"]
+        return rows.ravel()
+
+    def export(self, path):
+        """
+        Write the entries, oldest first, to a .npy file of HISTORY_DTYPE
+        records (numpy.load reads it back).
+
+        :return: the number of entries written
+        """
+        entries = self.entries()
+        numpy.save(path, entries)
+        return len(entries)
@@ -0,0 +1,124 @@
+"""
+Evaluation of delay model polynomials.
+
+The delay coefficients c0..c5 of a receptor and frequency slice give the
+geometric delay d(t) = c0 + c1 (t - epoch) + ... + c5 (t - epoch)^5, where
+epoch is the activation time of the model. The derivatives of d give the
+delay rate, acceleration, etc.
+"""
+
+import numpy
+
+__all__ = [
+    "MAX_EVALUATION_SAMPLES",
+    "evaluate_entries",
+    "evaluate_polynomial",
+    "evaluation_rows",
+    "parse_evaluation_request",
+    "sample_times",
+]
+
+# largest number of timestamps an EvaluateDelay command evaluates
+MAX_EVALUATION_SAMPLES = 10000
+
+
+def _derivative_coeffs(coeffs, derivative):
+    """Coefficients of the derivative of a polynomial (last axis, lowest order first)."""
+    for _ in range(derivative):
+        coeffs = coeffs[..., 1:] * numpy.arange(1, coeffs.shape[-1])
+    return coeffs
+
+
+def evaluate_polynomial(coeffs, dt, derivative=0):
+    """
+    Evaluate many delay polynomials at once.
+
+    :param coeffs: M x K array of coefficients, lowest order first
+    :param dt: times since the epoch of each polynomial, M x N (or N, for
+        the same times for every polynomial)
+    :param derivative: order of the derivative to evaluate; 0 for the delay
+    :return: M x N array
+    """
+    coeffs = _derivative_coeffs(numpy.asarray(coeffs, dtype=numpy.float64), derivative)
+    dt = numpy.asarray(dt, dtype=numpy.float64)
+    result = numpy.zeros(numpy.broadcast(numpy.empty((len(coeffs), 1)), dt).shape)
+    # Horner's scheme, vectorised over the polynomials and the times
+    for k in range(coeffs.shape[-1] - 1, -1, -1):
+        result = result * dt + coeffs[:, k:k + 1]
+    return result
+
+
+def sample_times(t0, dt, n):
+    """:return: the n timestamps t0, t0 + dt, ..."""
+    return t0 + dt * numpy.arange(n)
+
+
+def parse_evaluation_request(argin):
+    """
+    Validate the argument of an EvaluateDelay command.
+
+    :param argin: [t0, dt, n] or [t0, dt, n, derivative]: the first
+        timestamp (in seconds since the Unix epoch), the time step (in s),
+        the number of timestamps and the order of the derivative (0, the
+        delay, by default)
+    :return: (times, derivative)
+    :raise ValueError: if the argument is not valid
+    """
+    if len(argin) not in [3, 4]:
+        raise ValueError("Expected [t0, dt, n] or [t0, dt, n, derivative], got {} values".format(
+            len(argin)))
+    if not numpy.isfinite(argin).all():
+        raise ValueError("Every value must be finite")
+    t0, dt, n = float(argin[0]), float(argin[1]), argin[2]
+    derivative = argin[3] if len(argin) == 4 else 0
+    if n != int(n) or not 1 <= n <= MAX_EVALUATION_SAMPLES:
+        raise ValueError("n must be an integer in [1, {}]".format(MAX_EVALUATION_SAMPLES))
+    if derivative != int(derivative) or not 0 <= derivative <= 5:
+        raise ValueError("derivative must be an integer in [0, 5]")
+    return sample_times(t0, dt, int(n)), int(derivative)
+
+
+def evaluate_entries(entries, times, derivative=0):
+    """
+    Evaluate the delay of every receptor and frequency slice of a delay model
+    history at given times, each time with the model entry active at it, so
+    that the transitions between consecutive models show up.
+
+    :param entries: records with "epoch", "active_from", "receptor", "fsid"
+        and "coeffs" fields (see delay_model_history), sorted by
+        "active_from"; the polynomials are evaluated relative to "epoch"
+    :param times: N timestamps, in seconds since the Unix epoch
+    :param derivative: order of the derivative to evaluate; 0 for the delay
+    :return: (keys, values): the (receptor, fsid) pairs, sorted, and a
+        len(keys) x N array of their delay (or derivative); NaN where no
+        entry was active yet
+    """
+    times = numpy.asarray(times, dtype=numpy.float64)
+    pair_keys = entries["receptor"].astype(numpy.uint32) << 16 | entries["fsid"]
+    unique_keys, inverse = numpy.unique(pair_keys, return_inverse=True)
+
+    values = numpy.full((len(unique_keys), len(times)), numpy.nan)
+    for k in range(len(unique_keys)):
+        pair_entries = entries[inverse == k]
+        # index of the entry active at each time
+        active = numpy.searchsorted(pair_entries["active_from"], times, side="right") - 1
+        known = active >= 0
+        active = active[known]
+        values[k, known] = evaluate_polynomial(
+            pair_entries["coeffs"][active],
+            (times[known] - pair_entries["epoch"][active])[:, None],
+            derivative
+        )[:, 0]
+    keys = [(int(key >> 16), int(key & 0xFFFF)) for key in unique_keys]
+    return keys, values
+
+
+def evaluation_rows(keys, values):
+    """
+    Flatten the result of evaluate_entries to rows of receptor, fsid and
+    the N values, as returned by the EvaluateDelay commands.
+    """
+    rows = numpy.empty((len(keys), 2 + values.shape[1]))
+    rows[:, :2] = numpy.reshape(keys, (-1, 2))
+    rows[:, 2:] = values
+    return rows.ravel()
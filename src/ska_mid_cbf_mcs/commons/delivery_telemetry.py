@@ -0,0 +1,104 @@
+import bisect
+import collections
+import threading
+
+__all__ = ["DeliveryTelemetry", "LATENESS_BUCKET_EDGES"]
+
+# upper edges (in s) of the lateness histogram buckets; the first bucket
+# counts the deliveries completed ahead of their deadline, the last one
+# everything above the last edge
+LATENESS_BUCKET_EDGES = (0.0, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_Delivery = collections.namedtuple(
+    "_Delivery", ["arrived", "epoch", "deadline", "issued", "completed"])
+
+
+class DeliveryTelemetry:
+    """
+    Records the timeline of model deliveries (delay models, Jones matrices,
+    beam weights) and derives their lateness, i.e. completion time minus
+    delivery deadline. The deadline is the activation epoch, or some time
+    before it for updates that their destinations stage until the epoch.
+
+    For each model type, it keeps the last delivery, a histogram of the
+    lateness and the number of updates that arrived after their epoch had
+    already passed. All times are in seconds since the Unix epoch.
+
+    :param bucket_edges: upper edges of the lateness histogram buckets
+    """
+
+    def __init__(self, bucket_edges=LATENESS_BUCKET_EDGES):
+        self._bucket_edges = tuple(bucket_edges)
+        self._lock = threading.Lock()
+        self._histograms = {}  # model_type:[count per bucket]
+        self._arrived_late = {}  # model_type:count
+        self._last = {}  # model_type:_Delivery
+
+    @property
+    def bucket_edges(self):
+        return self._bucket_edges
+
+    def record(self, model_type, arrived, epoch, issued, completed, deadline=None):
+        """
+        Record a delivery.
+
+        :param model_type: e.g. "delay_model"
+        :param arrived: time the update was received
+        :param epoch: activation epoch requested by the update
+        :param issued: time the command to the destination devices was issued
+        :param completed: time the command completed
+        :param deadline: time by which the delivery was due; the epoch by
+            default
+        :return: the lateness of the delivery
+        """
+        if deadline is None:
+            deadline = epoch
+        lateness = completed - deadline
+        bucket = bisect.bisect_left(self._bucket_edges, lateness)
+        with self._lock:
+            histogram = self._histograms.setdefault(
+                model_type, [0] * (len(self._bucket_edges) + 1))
+            histogram[bucket] += 1
+            if arrived > epoch:
+                self._arrived_late[model_type] = self._arrived_late.get(model_type, 0) + 1
+            self._last[model_type] = _Delivery(arrived, epoch, deadline, issued, completed)
+        return lateness
+
+    def histogram(self, model_type=None):
+        """
+        :param model_type: model type, or None for all of them
+        :return: count of deliveries per lateness bucket
+        """
+        with self._lock:
+            histograms = [
+                histogram for key, histogram in self._histograms.items()
+                if model_type in (None, key)
+            ]
+        return [sum(counts) for counts in zip(*histograms)] or \
+            [0] * (len(self._bucket_edges) + 1)
+
+    def arrived_late_count(self, model_type=None):
+        """
+        :param model_type: model type, or None for all of them
+        :return: number of updates that arrived after their epoch
+        """
+        with self._lock:
+            return sum(
+                count for key, count in self._arrived_late.items()
+                if model_type in (None, key)
+            )
+
+    def to_dict(self):
+        """:return: the telemetry of every model type"""
+        with self._lock:
+            model_types = sorted(self._histograms)
+            last = dict(self._last)
+        telemetry = {"bucket_edges": list(self._bucket_edges)}
+        for model_type in model_types:
+            delivery = last[model_type]
+            telemetry[model_type] = {
+                "last": dict(delivery._asdict(), lateness=delivery.completed - delivery.deadline),
+                "histogram": self.histogram(model_type),
+                "arrived_late": self.arrived_late_count(model_type)
+            }
+        return telemetry
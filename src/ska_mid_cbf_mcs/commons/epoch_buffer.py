@@ -0,0 +1,244 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import numpy
+
+__all__ = ["EpochBufferedArray"]
+
+
+class EpochBufferedArray:
+    """
+    Double-buffered model table (delay model, Jones matrix, beam weights)
+    whose updates are staged ahead of time and activated at their epoch.
+
+    Staged updates wait in a queue ordered by epoch. A timer thread prepares
+    the next one in the back buffer (a copy of the active table with the
+    update applied), sleeps until just before its epoch, spins until the
+    epoch and then swaps the buffers, so activation does not depend on when
+    the update was received. The swap jitter is the activation time minus
+    the epoch.
+
+    :param shape: shape of the table
+    :param name: name used for the timer thread and log messages
+    :param spin: time (in s) before the epoch from which the timer spins
+        instead of sleeping
+    :param clock: callable returning the current time, in seconds since the
+        Unix epoch
+    :param on_activate: optional callable taking the activation epoch, the
+        rows and the values of every update when it becomes active (at its
+        epoch, or at the current time for updates applied now)
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, shape, name="", spin=0.002, clock=time.time, on_activate=None,
+                 logger=None):
+        self.name = name
+        self._spin = spin
+        self._clock = clock
+        self._on_activate = on_activate
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._active = numpy.zeros(shape)
+        self._back = numpy.zeros(shape)
+        self._condition = threading.Condition()
+        self._pending = []  # (epoch, sequence number, indices, values)
+        self._sequence = itertools.count()
+        self._prepared = None  # sequence number of the update in the back buffer
+        self._active_epoch = 0.0
+        self._last_jitter = 0.0
+        self._max_jitter = 0.0
+        self._swap_count = 0
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def active(self):
+        """The active table; it must not be modified."""
+        return self._active
+
+    @property
+    def active_epoch(self):
+        """Epoch of the active table, or 0 if no staged update was activated."""
+        return self._active_epoch
+
+    @property
+    def pending_epoch(self):
+        """Epoch of the next staged update, or 0 if none is pending."""
+        with self._condition:
+            return self._pending[0][0] if self._pending else 0.0
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    @property
+    def last_jitter(self):
+        """Activation time minus epoch (in s) of the last swap."""
+        return self._last_jitter
+
+    @property
+    def max_jitter(self):
+        """Largest absolute swap jitter (in s)."""
+        return self._max_jitter
+
+    @property
+    def swap_count(self):
+        return self._swap_count
+
+    def _check_rows(self, indices, values):
+        """
+        Validate an update before it is applied or staged, so that it cannot
+        fail in the timer thread.
+
+        :return: (indices, values) as arrays; values is a copy
+        :raise ValueError: if a row index is out of range or the values do
+            not have the shape of the rows
+        """
+        indices = numpy.asarray(indices)
+        if indices.size == 0:
+            indices = indices.astype(int)
+        if indices.ndim != 1 or not numpy.issubdtype(indices.dtype, numpy.integer):
+            raise ValueError("{}: row indices must be a list of integers".format(self.name))
+        num_rows = self._active.shape[0]
+        out_of_range = indices[(indices < 0) | (indices >= num_rows)]
+        if out_of_range.size:
+            raise ValueError("{}: rows {} out of range [0, {})".format(
+                self.name, out_of_range.tolist(), num_rows))
+        try:
+            values = numpy.array(values, dtype=numpy.float64)
+        except (TypeError, ValueError):
+            raise ValueError("{}: values must be numeric".format(self.name))
+        expected_shape = (len(indices),) + self._active.shape[1:]
+        if values.shape != expected_shape:
+            raise ValueError("{}: values of shape {} expected, got {}".format(
+                self.name, expected_shape, values.shape))
+        return indices, values
+
+    def _activated(self, epoch, indices, values):
+        if self._on_activate is None:
+            return
+        try:
+            self._on_activate(epoch, indices, values)
+        except Exception as e:
+            self.logger.error("{}: activation callback failed for epoch {}: {}".format(
+                self.name, epoch, e))
+
+    def apply(self, indices, values):
+        """
+        Update rows of the active table now.
+
+        :raise ValueError: if the update does not fit the table
+        """
+        indices, values = self._check_rows(indices, values)
+        with self._condition:
+            self._active[indices, :] = values
+            # the back buffer no longer matches the active table
+            self._prepared = None
+            self._condition.notify()
+        self._activated(self._clock(), indices, values)
+
+    def stage(self, epoch, indices, values):
+        """
+        Stage an update of rows of the table, to be activated at an epoch.
+        Updates of past epochs are activated immediately.
+
+        :param epoch: activation time, in seconds since the Unix epoch
+        :param indices: rows to update
+        :param values: new values of the rows
+        :raise ValueError: if the update does not fit the table
+        """
+        indices, values = self._check_rows(indices, values)
+        with self._condition:
+            if self._stopped:
+                return
+            heapq.heappush(self._pending, (epoch, next(self._sequence), indices, values))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="{}-epoch-buffer".format(self.name), daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def clear(self):
+        """Drop the staged updates and reset the table to zeros."""
+        with self._condition:
+            self._pending = []
+            self._prepared = None
+            self._active.fill(0)
+            self._active_epoch = 0.0
+            self._condition.notify()
+
+    def stop(self):
+        """Drop the staged updates and stop the timer thread."""
+        with self._condition:
+            self._stopped = True
+            self._pending = []
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _is_next(self, sequence):
+        return bool(self._pending) and self._pending[0][1] == sequence
+
+    def _run(self):
+        # the timer thread must outlive any failure, or no later update
+        # would ever be activated
+        while True:
+            try:
+                if not self._run_once():
+                    return
+            except Exception as e:
+                self.logger.error("{}: timer failure: {}".format(self.name, e))
+
+    def _run_once(self):
+        """
+        Wait for the next staged update and activate it at its epoch.
+
+        :return: False once stopped
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and not self._pending:
+                    self._condition.wait()
+                if self._stopped:
+                    return False
+                epoch, sequence, indices, values = self._pending[0]
+                if self._prepared != sequence:
+                    try:
+                        self._back[...] = self._active
+                        self._back[indices, :] = values
+                    except (IndexError, ValueError) as e:
+                        heapq.heappop(self._pending)
+                        self.logger.error("{}: update of epoch {} dropped: {}".format(
+                            self.name, epoch, e))
+                        continue
+                    self._prepared = sequence
+                # sleep until shortly before the epoch, unless an earlier
+                # update is staged or the table is changed meanwhile
+                while not self._stopped and self._is_next(sequence) and \
+                        self._prepared == sequence and \
+                        self._clock() < epoch - self._spin:
+                    self._condition.wait(epoch - self._spin - self._clock())
+                if self._stopped or not self._is_next(sequence) or self._prepared != sequence:
+                    continue
+
+            while self._clock() < epoch:
+                pass
+
+            with self._condition:
+                if not self._is_next(sequence) or self._prepared != sequence:
+                    continue
+                self._active, self._back = self._back, self._active
+                jitter = self._clock() - epoch
+                heapq.heappop(self._pending)
+                self._prepared = None
+                self._active_epoch = epoch
+                self._last_jitter = jitter
+                self._max_jitter = max(self._max_jitter, abs(jitter))
+                self._swap_count += 1
+            self.logger.debug("{} activated for epoch {} (jitter {:.6f} s)".format(
+                self.name, epoch, jitter))
+            self._activated(epoch, indices, values)
+            return True
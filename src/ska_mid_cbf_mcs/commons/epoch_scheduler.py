@@ -0,0 +1,152 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+__all__ = ["EpochScheduler"]
+
+
+class EpochScheduler:
+    """
+    Delivers work items at their activation epoch.
+
+    Items are kept in one priority queue per key, ordered by epoch (ties are
+    broken by submission order), and are served by a small, fixed pool of
+    worker threads. At most one item per key is in flight at any time, so
+    items sharing a key are always delivered in epoch order, while items with
+    different keys can be delivered concurrently.
+
+    Pending (not yet started) items can be cancelled at any time, e.g. when
+    the owning subarray is deconfigured.
+
+    :param name: name used for the worker threads and log messages
+    :param num_workers: number of worker threads serving the queue
+    :param late_tolerance: delay (in seconds) past the epoch after which
+        a delivery is counted as late
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, name, num_workers=3, late_tolerance=0.1, logger=None):
+        self._name = name
+        self._late_tolerance = late_tolerance
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._condition = threading.Condition()
+        self._queues = {}  # key:[(epoch, sequence, target, args)]
+        self._busy_keys = set()
+        self._sequence = itertools.count()
+        self._late_count = 0
+        self._stopped = False
+
+        self._workers = []
+        for i in range(max(1, num_workers)):
+            worker = threading.Thread(
+                target=self._serve,
+                name="{}-{}".format(name, i),
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    @property
+    def queue_depth(self):
+        """Number of items waiting to be delivered."""
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def next_epoch(self):
+        """Epoch of the next pending item, or 0 if nothing is pending."""
+        with self._condition:
+            heads = [queue[0][0] for queue in self._queues.values() if queue]
+            return min(heads) if heads else 0
+
+    @property
+    def late_count(self):
+        """Number of items delivered later than their epoch (plus tolerance)."""
+        with self._condition:
+            return self._late_count
+
+    def schedule(self, epoch, key, target, *args):
+        """
+        Queue a call to ``target(*args)`` at the given epoch.
+
+        :param epoch: activation time, in seconds since the Unix epoch
+        :param key: ordering key; items with the same key never overlap
+        :param target: callable to invoke at the epoch
+        """
+        with self._condition:
+            if self._stopped:
+                self.logger.warn(
+                    "{} is stopped; dropping item for epoch {}".format(self._name, epoch)
+                )
+                return
+            heapq.heappush(
+                self._queues.setdefault(key, []),
+                (epoch, next(self._sequence), target, args)
+            )
+            self._condition.notify_all()
+
+    def cancel_pending(self):
+        """
+        Drop every item that has not started yet.
+
+        :return: the number of cancelled items
+        """
+        with self._condition:
+            cancelled = sum(len(queue) for queue in self._queues.values())
+            self._queues = {}
+            self._condition.notify_all()
+        if cancelled:
+            self.logger.info(
+                "{}: cancelled {} pending item(s)".format(self._name, cancelled)
+            )
+        return cancelled
+
+    def stop(self):
+        """Cancel pending items and stop the worker threads."""
+        with self._condition:
+            self._stopped = True
+        self.cancel_pending()
+
+    def _next_due(self):
+        # must be called with the condition held; returns (key, item, delay)
+        candidate = None
+        for key, queue in self._queues.items():
+            if queue and key not in self._busy_keys:
+                if candidate is None or queue[0] < candidate[1]:
+                    candidate = (key, queue[0])
+        if candidate is None:
+            return None, None, None
+        return candidate[0], candidate[1], candidate[1][0] - time.time()
+
+    def _serve(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    key, item, delay = self._next_due()
+                    if item is None:
+                        self._condition.wait()
+                    elif delay > 0:
+                        self._condition.wait(delay)
+                    else:
+                        heapq.heappop(self._queues[key])
+                        self._busy_keys.add(key)
+                        if -delay > self._late_tolerance:
+                            self._late_count += 1
+                        break
+
+            epoch, _, target, args = item
+            try:
+                target(*args)
+            except Exception as e:
+                self.logger.error(
+                    "{}: delivery for epoch {} failed: {}".format(self._name, epoch, str(e))
+                )
+            finally:
+                with self._condition:
+                    self._busy_keys.discard(key)
+                    self._condition.notify_all()
@@ -0,0 +1,48 @@
+__all__ = ["EventDispatchTable"]
+
+
+class EventDispatchTable:
+    """
+    Precomputed map from (device name, attribute name) to the slot where the
+    value of a change event is stored: a container (array, list or dict) and
+    an index (or key) in it. Dispatching an event is a single dict lookup.
+
+    Names are case-insensitive; the attribute name is the last component of
+    the event attribute name, so full attribute names (with the Tango host)
+    are supported.
+    """
+
+    def __init__(self):
+        self._table = {}
+
+    def __len__(self):
+        return len(self._table)
+
+    @staticmethod
+    def _key(device_name, attr_name):
+        return device_name.lower(), attr_name.rsplit("/", 1)[-1].lower()
+
+    def register(self, device_name, attr_name, container, index):
+        """Store the events of an attribute of a device in container[index]."""
+        self._table[self._key(device_name, attr_name)] = (container, index)
+
+    def lookup(self, event):
+        """
+        :return: the (container, index) slot of an event, or None if the
+            attribute is not registered
+        """
+        return self._table.get(self._key(event.device.dev_name(), event.attr_name))
+
+    def dispatch(self, event):
+        """
+        Store the value of an event in its slot.
+
+        :return: True if the event was stored, False if the attribute is
+            not registered
+        """
+        slot = self.lookup(event)
+        if slot is None:
+            return False
+        container, index = slot
+        container[index] = event.attr_value.value
+        return True
@@ -0,0 +1,95 @@
+import collections
+import logging
+import time
+
+import tango
+
+__all__ = ["GroupCommandReport", "group_command_inout"]
+
+_DeviceResult = collections.namedtuple("_DeviceResult", ["ok", "latency", "error"])
+
+
+class GroupCommandReport:
+    """
+    Outcome of a command sent to one or more groups: success, latency (in s,
+    from the start of the fan-out to the collection of the reply) and error
+    message of every device.
+    """
+
+    def __init__(self, command_name):
+        self.command_name = command_name
+        self.started_at = time.time()
+        self.devices = collections.OrderedDict()  # device name:_DeviceResult
+
+    def add(self, device_name, ok, latency, error=""):
+        self.devices[device_name] = _DeviceResult(ok, latency, error)
+
+    @property
+    def failed(self):
+        """Names of the devices for which the command failed."""
+        return [name for name, result in self.devices.items() if not result.ok]
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def to_dict(self):
+        return {
+            "command": self.command_name,
+            "started_at": self.started_at,
+            "devices": {
+                name: result._asdict() for name, result in self.devices.items()
+            }
+        }
+
+
+def group_command_inout(groups, command_name, data=None, deadline=3.0, logger=None):
+    """
+    Send a command to every device of several groups at once, then collect
+    the replies against a common deadline.
+
+    All the groups are sent the command asynchronously before any reply is
+    collected, so devices of different groups start executing it at the same
+    time, and the whole fan-out takes about as long as the slowest device.
+
+    :param groups: tango.Group instances
+    :param command_name: name of the command
+    :param data: tango.DeviceData argument of the command, or None
+    :param deadline: time (in s) after which missing replies count as failed
+    :param logger: logger for the failures; defaults to the module logger
+    :return: a GroupCommandReport
+    """
+    logger = logger or logging.getLogger(__name__)
+    report = GroupCommandReport(command_name)
+    start = time.monotonic()
+
+    requests = []
+    for group in groups:
+        try:
+            if data is None:
+                request_id = group.command_inout_asynch(command_name)
+            else:
+                request_id = group.command_inout_asynch(command_name, data)
+            requests.append((group, request_id))
+        except tango.DevFailed as df:
+            report.add(group.get_name(), False, time.monotonic() - start, df.args[0].desc)
+
+    for group, request_id in requests:
+        # a timeout of 0 would wait forever
+        remaining_ms = max(1, int((start + deadline - time.monotonic()) * 1000))
+        try:
+            replies = group.command_inout_reply(request_id, remaining_ms)
+        except tango.DevFailed as df:
+            report.add(group.get_name(), False, time.monotonic() - start, df.args[0].desc)
+            continue
+        latency = time.monotonic() - start
+        for reply in replies:
+            if reply.has_failed():
+                report.add(reply.dev_name(), False, latency, reply.get_err_stack()[0].desc)
+            else:
+                report.add(reply.dev_name(), True, latency)
+
+    for name in report.failed:
+        logger.error("{} failed on {}: {}".format(
+            command_name, name, report.devices[name].error))
+    return report
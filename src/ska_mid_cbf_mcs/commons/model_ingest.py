@@ -0,0 +1,71 @@
+import numpy
+
+__all__ = ["find_receptor_entry", "frequency_slice_rows", "split_epoch"]
+
+
+def split_epoch(update, entries_key):
+    """
+    Split a model update from its optional activation epoch. An update is
+    either the list of its entries, to be applied now, or a dict with the
+    "epoch" at which to activate it and the entries under ``entries_key``.
+
+    :param update: the deserialized update
+    :param entries_key: e.g. "delayDetails" or "matrixDetails"
+    :return: (epoch, entries), with epoch None if there is none
+    """
+    if isinstance(update, dict):
+        return float(update["epoch"]), update[entries_key]
+    return None, update
+
+
+def find_receptor_entry(entries, receptorID, key="receptor"):
+    """
+    Find the entry of a receptor in a model update (delay model details or
+    Jones matrices, as lists of dicts with a receptor key).
+
+    The subarray sends every VCC only its own entry, so that entry is checked
+    first; other updates are searched until the entry is found.
+
+    :param entries: entries of the update
+    :param receptorID: receptor ID to find
+    :param key: name of the receptor ID key of the entries
+    :return: the entry, or None if the update has none for the receptor
+    """
+    if len(entries) == 1:
+        return entries[0] if entries[0][key] == receptorID else None
+    return next((entry for entry in entries if entry[key] == receptorID), None)
+
+
+def frequency_slice_rows(frequency_slices, values_key, width, num_frequency_slices=26):
+    """
+    Validate the frequency slices of a receptor entry all at once.
+
+    :param frequency_slices: dicts with an "fsid" and a list of ``width``
+        values under ``values_key``
+    :param values_key: e.g. "delayCoeff" or "matrix"
+    :param width: number of values per frequency slice
+    :param num_frequency_slices: highest valid fsid
+    :return: (indices, values), the fsid - 1 of every slice and a
+        len(frequency_slices) x width array of their values, ready for a
+        single assignment ``storage[indices, :] = values``
+    :raise ValueError: if any fsid is out of range or any slice does not
+        have ``width`` values; nothing is returned for the valid slices
+    """
+    if not frequency_slices:
+        return numpy.zeros(0, dtype=int), numpy.zeros((0, width))
+    try:
+        fsids = numpy.array([frequency_slice["fsid"] for frequency_slice in frequency_slices],
+                            dtype=int)
+        values = numpy.array([frequency_slice[values_key] for frequency_slice in frequency_slices],
+                             dtype=numpy.float64)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Every frequency slice needs an 'fsid' and {} numeric '{}'".format(
+            width, values_key))
+
+    invalid_fsids = fsids[(fsids < 1) | (fsids > num_frequency_slices)]
+    if invalid_fsids.size:
+        raise ValueError("'fsid' {} not valid".format(invalid_fsids.tolist()))
+    if values.shape != (len(fsids), width):
+        raise ValueError("'{}' not valid: {} values per frequency slice expected".format(
+            values_key, width))
+    return fsids - 1, values
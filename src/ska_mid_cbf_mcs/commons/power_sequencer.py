@@ -0,0 +1,75 @@
+import logging
+
+import tango
+
+from ska_mid_cbf_mcs.commons.group_command import GroupCommandReport, group_command_inout
+
+__all__ = ["PowerSequencer"]
+
+
+class PowerSequencer:
+    """
+    Sends a power command (On, Off) to many devices in batches.
+
+    The devices of a batch are sent the command at once, and their replies
+    are collected against the same timeout; batches run one after the other,
+    in the order of the devices. Powering all the devices therefore takes
+    about the sum of the slowest device of each batch.
+
+    :param device_names: FQDNs of the devices, in power-up order
+    :param batch_size: maximum number of devices per batch; 0 for a single
+        batch
+    :param timeout: time (in s) after which a device that has not replied
+        counts as failed
+    :param group_factory: callable creating a tango.Group from its name
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, device_names, batch_size=0, timeout=3.0,
+                 group_factory=tango.Group, logger=None):
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+        device_names = list(device_names)
+        batch_size = batch_size or max(1, len(device_names))
+        self._batches = []  # (group, number of devices)
+        for start in range(0, len(device_names), batch_size):
+            batch = device_names[start:start + batch_size]
+            group = group_factory("Power batch {}".format(len(self._batches) + 1))
+            for device_name in batch:
+                group.add(device_name)
+            group.set_timeout_millis(int(timeout * 1000))
+            self._batches.append((group, len(batch)))
+        self._count = len(device_names)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def batch_count(self):
+        return len(self._batches)
+
+    def run(self, command_name, on_progress=None):
+        """
+        Send a command to every device, batch by batch.
+
+        A failed device does not stop the sequence; it is reported.
+
+        :param command_name: name of the command
+        :param on_progress: optional callable taking the percentage of the
+            devices done, called after every batch
+        :return: a GroupCommandReport of every device; latencies are
+            relative to the start of the batch of the device
+        """
+        report = GroupCommandReport(command_name)
+        done = 0
+        for group, size in self._batches:
+            batch_report = group_command_inout(
+                [group], command_name, deadline=self.timeout, logger=self.logger)
+            report.devices.update(batch_report.devices)
+            done += size
+            if on_progress is not None:
+                on_progress(done * 100 // self._count)
+        if on_progress is not None and not self._batches:
+            on_progress(100)
+        return report
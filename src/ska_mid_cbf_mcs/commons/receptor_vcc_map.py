@@ -0,0 +1,243 @@
+import logging
+import threading
+
+import numpy
+import tango
+
+__all__ = [
+    "ControllerReplicas",
+    "ReceptorVccMap",
+    "VccMembershipReplica",
+    "encode_receptor_to_vcc",
+    "parse_receptor_to_vcc"
+]
+
+
+def parse_receptor_to_vcc(pairs, count):
+    """
+    Build the dense receptor to VCC and VCC to receptor tables from
+    "receptorID:vccID" pairs, e.g. the ReceptorToVcc property of
+    CbfController. Without pairs, receptor i is assigned to VCC i.
+
+    :param pairs: "receptorID:vccID" strings
+    :param count: number of receptors (and VCCs)
+    :return: (receptor_to_vcc, vcc_to_receptor), uint16 arrays indexed by
+        ID - 1, with 0 for IDs without an assignment
+    :raise ValueError: if a pair is malformed, an ID is out of range or
+        assigned twice
+    """
+    if not pairs:
+        ids = numpy.arange(1, count + 1, dtype=numpy.uint16)
+        return ids, ids.copy()
+
+    receptor_to_vcc = numpy.zeros(count, dtype=numpy.uint16)
+    vcc_to_receptor = numpy.zeros(count, dtype=numpy.uint16)
+    for pair in pairs:
+        try:
+            receptorID, vccID = (int(ID) for ID in pair.split(":"))
+        except ValueError:
+            raise ValueError("Invalid receptor to VCC pair {!r}".format(pair))
+        if not (1 <= receptorID <= count and 1 <= vccID <= count):
+            raise ValueError("Receptor or VCC ID out of range [1, {}] in {!r}".format(count, pair))
+        if receptor_to_vcc[receptorID - 1] or vcc_to_receptor[vccID - 1]:
+            raise ValueError("Receptor or VCC assigned twice in {!r}".format(pair))
+        receptor_to_vcc[receptorID - 1] = vccID
+        vcc_to_receptor[vccID - 1] = receptorID
+    return receptor_to_vcc, vcc_to_receptor
+
+
+def encode_receptor_to_vcc(version, receptor_to_vcc, num_receptors):
+    """
+    Encode a receptor to VCC map as published by CbfController on the
+    receptorToVccMap attribute: [version, vccID of receptor 1, ...,
+    vccID of receptor num_receptors], with 0 for receptors without a VCC.
+
+    :param version: version of the map, incremented by the controller on
+        every change
+    :param receptor_to_vcc: dict of receptorID:vccID
+    :param num_receptors: highest receptor ID
+    """
+    return [version] + [
+        receptor_to_vcc.get(receptorID, 0) for receptorID in range(1, num_receptors + 1)
+    ]
+
+
+class ReceptorVccMap:
+    """
+    Local, versioned replica of the receptor to VCC map of CbfController,
+    kept up to date by the change events of its receptorToVccMap attribute.
+    Lookups are O(1) and never call the controller, except to load the map
+    once if no event has been received yet.
+
+    :param read: callable returning the current encoded map (e.g. a read of
+        the controller attribute), used until the first event arrives
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, read=None, logger=None):
+        self._read = read
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._receptor_to_vcc = ()  # index receptorID - 1
+        self._vcc_to_receptor = {}
+
+    @property
+    def version(self):
+        """Version of the replica; 0 until the map is received."""
+        return self._version
+
+    def update(self, encoded):
+        """
+        Replace the replica with an encoded map.
+
+        :param encoded: the map, encoded as by encode_receptor_to_vcc
+        :return: True if the replica changed
+        """
+        version = int(encoded[0])
+        receptor_to_vcc = tuple(int(vccID) for vccID in encoded[1:])
+        with self._lock:
+            if version == self._version and receptor_to_vcc == self._receptor_to_vcc:
+                return False
+            self._version = version
+            self._receptor_to_vcc = receptor_to_vcc
+            self._vcc_to_receptor = {
+                vccID: receptorID
+                for receptorID, vccID in enumerate(receptor_to_vcc, 1) if vccID
+            }
+        self.logger.info("Receptor to VCC map updated to version {}".format(version))
+        return True
+
+    def on_change_event(self, event):
+        """Callback for the change events of receptorToVccMap."""
+        if not event.err:
+            try:
+                self.update(event.attr_value.value)
+            except Exception as e:
+                self.logger.error(str(e))
+        else:
+            for item in event.errors:
+                log_msg = item.reason + ": on attribute " + str(event.attr_name)
+                self.logger.error(log_msg)
+
+    def _ensure_loaded(self):
+        if not self._version and self._read is not None:
+            self.update(self._read())
+
+    def vcc_id(self, receptorID):
+        """
+        :return: the VCC ID of a receptor
+        :raise KeyError: if the receptor ID is not valid
+        """
+        self._ensure_loaded()
+        receptor_to_vcc = self._receptor_to_vcc
+        receptorID = int(receptorID)
+        if 1 <= receptorID <= len(receptor_to_vcc) and receptor_to_vcc[receptorID - 1]:
+            return receptor_to_vcc[receptorID - 1]
+        raise KeyError(receptorID)
+
+    def receptor_id(self, vccID):
+        """
+        :return: the receptor ID of a VCC
+        :raise KeyError: if the VCC ID is not valid
+        """
+        self._ensure_loaded()
+        return self._vcc_to_receptor[int(vccID)]
+
+
+class VccMembershipReplica:
+    """
+    Local replica of the subarray membership of every VCC, kept up to date
+    by the change events of the CbfController reportVCCSubarrayMembership
+    attribute.
+
+    Events can lag behind the VCCs, so a negative answer is confirmed with
+    ``read_membership`` before it is returned; a positive answer never calls
+    a VCC.
+
+    :param read_membership: callable taking a VCC ID and returning the
+        current subarray membership of that VCC
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, read_membership, logger=None):
+        self._read_membership = read_membership
+        self.logger = logger or logging.getLogger(__name__)
+        self._membership = []  # index vccID - 1
+
+    def update(self, membership):
+        self._membership = [int(subarrayID) for subarrayID in membership]
+
+    def on_change_event(self, event):
+        """Callback for the change events of reportVCCSubarrayMembership."""
+        if not event.err:
+            try:
+                self.update(event.attr_value.value)
+            except Exception as e:
+                self.logger.error(str(e))
+        else:
+            for item in event.errors:
+                log_msg = item.reason + ": on attribute " + str(event.attr_name)
+                self.logger.error(log_msg)
+
+    def subarray_id(self, vccID, expected):
+        """
+        :param vccID: ID of the VCC
+        :param expected: the subarray ID the caller expects; if the replica
+            has a different value, the VCC is read instead
+        :return: the subarray membership of the VCC
+        """
+        membership = self._membership
+        if vccID <= len(membership) and membership[vccID - 1] == expected:
+            return expected
+        subarrayID = int(self._read_membership(vccID))
+        if vccID <= len(membership):
+            membership[vccID - 1] = subarrayID
+        return subarrayID
+
+
+class ControllerReplicas:
+    """
+    The ReceptorVccMap and VccMembershipReplica of a device, with their
+    subscriptions to the change events of CbfController.
+
+    :param proxy_controller: device proxy of CbfController
+    :param proxies_vcc: device proxies of the VCCs, indexed by vccID - 1
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, proxy_controller, proxies_vcc, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._proxy_controller = proxy_controller
+        self.receptor_to_vcc = ReceptorVccMap(
+            read=lambda: proxy_controller.receptorToVccMap,
+            logger=self.logger
+        )
+        self.vcc_membership = VccMembershipReplica(
+            lambda vccID: proxies_vcc[vccID - 1].subarrayMembership,
+            logger=self.logger
+        )
+        self._event_ids = []
+
+    def subscribe(self):
+        """Subscribe the replicas to the change events of the controller."""
+        for attribute_name, callback in [
+            ("receptorToVccMap", self.receptor_to_vcc.on_change_event),
+            ("reportVCCSubarrayMembership", self.vcc_membership.on_change_event),
+        ]:
+            self._event_ids.append(self._proxy_controller.subscribe_event(
+                attribute_name,
+                tango.EventType.CHANGE_EVENT,
+                callback,
+                stateless=True
+            ))
+
+    def unsubscribe(self):
+        """Undo subscribe; to be called from delete_device."""
+        event_ids, self._event_ids = self._event_ids, []
+        for event_id in event_ids:
+            try:
+                self._proxy_controller.unsubscribe_event(event_id)
+            except tango.DevFailed as df:
+                self.logger.warn("Failure in unsubscription from CbfController: {}".format(
+                    df.args[0].desc))
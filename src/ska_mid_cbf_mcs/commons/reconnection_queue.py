@@ -0,0 +1,111 @@
+import heapq
+import logging
+import threading
+import time
+
+__all__ = ["ReconnectionQueue"]
+
+
+class ReconnectionQueue:
+    """
+    Retries the connection to unreachable devices in a background thread,
+    with exponential backoff, until it succeeds.
+
+    The delay before attempt n (from 0) is ``initial_delay * 2 ** n``,
+    capped at ``max_delay``.
+
+    :param connect: callable taking a device name and connecting to it;
+        the connection failed if it raises
+    :param initial_delay: delay (in s) before the first attempt
+    :param max_delay: maximum delay (in s) between two attempts
+    :param on_connected: optional callable taking a device name, called
+        after a successful attempt
+    :param logger: logger to use; defaults to the module logger
+    """
+
+    def __init__(self, connect, initial_delay=1.0, max_delay=60.0,
+                 on_connected=None, logger=None):
+        self._connect = connect
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._on_connected = on_connected
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._condition = threading.Condition()
+        self._heap = []  # (due time, device name)
+        self._attempts = {}  # device name:number of failed attempts
+        self._connected_count = 0
+        self._stopped = False
+        self._thread = None
+
+    def _delay(self, attempts):
+        return min(self._initial_delay * 2 ** attempts, self._max_delay)
+
+    @property
+    def pending(self):
+        """Names of the devices not connected yet."""
+        with self._condition:
+            return sorted(self._attempts)
+
+    @property
+    def connected_count(self):
+        """Number of devices connected by the queue."""
+        return self._connected_count
+
+    def __len__(self):
+        return len(self._attempts)
+
+    def add(self, device_name):
+        """Queue a device; does nothing if it is already queued."""
+        with self._condition:
+            if self._stopped or device_name in self._attempts:
+                return
+            self._attempts[device_name] = 0
+            heapq.heappush(self._heap, (time.monotonic() + self._delay(0), device_name))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ReconnectionQueue", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self):
+        """Stop retrying; pending devices are dropped."""
+        with self._condition:
+            self._stopped = True
+            self._heap = []
+            self._attempts.clear()
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and (
+                        not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                _, device_name = heapq.heappop(self._heap)
+
+            try:
+                self._connect(device_name)
+            except Exception as e:
+                with self._condition:
+                    if self._stopped:
+                        return
+                    attempts = self._attempts[device_name] + 1
+                    self._attempts[device_name] = attempts
+                    delay = self._delay(attempts)
+                    heapq.heappush(self._heap, (time.monotonic() + delay, device_name))
+                self.logger.warn("Reconnection to {} failed ({}), retrying in {} s".format(
+                    device_name, e, delay))
+                continue
+
+            with self._condition:
+                self._attempts.pop(device_name, None)
+                self._connected_count += 1
+            self.logger.info("Reconnected to {}".format(device_name))
+            if self._on_connected is not None:
+                self._on_connected(device_name)
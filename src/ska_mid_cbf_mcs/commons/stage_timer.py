@@ -0,0 +1,105 @@
+import collections
+import threading
+import time
+
+__all__ = ["StageTimer", "StageTimingHistory"]
+
+
+class StageTimer:
+    """
+    Times the consecutive stages of one run of a command with a monotonic
+    clock. Each call to ``mark`` closes the stage that started at the
+    previous mark (or at the creation of the timer).
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._last = self._start
+        self.stages = collections.OrderedDict()  # stage:duration (s)
+
+    def mark(self, stage):
+        """
+        Close the current stage.
+
+        :param stage: name of the stage; the durations of a stage marked
+            more than once are added up
+        """
+        now = time.monotonic()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    @property
+    def total(self):
+        """Time from the creation of the timer to the last mark (s)."""
+        return self._last - self._start
+
+
+class StageTimingHistory:
+    """
+    Keeps the stage breakdowns of the last runs of a command, and rolling
+    statistics per stage over those runs.
+
+    :param length: number of runs kept
+    """
+
+    PERCENTILES = (50, 95)
+
+    def __init__(self, length=20):
+        self._lock = threading.Lock()
+        self._runs = collections.deque(maxlen=max(1, length))
+
+    def __len__(self):
+        return len(self._runs)
+
+    def add(self, timer, **info):
+        """
+        Record a finished run.
+
+        :param timer: the StageTimer of the run
+        :param info: additional JSON-serializable details of the run
+        """
+        run = dict(info)
+        run["started_at"] = timer.started_at
+        run["stages"] = dict(timer.stages)
+        run["total"] = timer.total
+        with self._lock:
+            self._runs.append(run)
+
+    def statistics(self):
+        """
+        :return: dict of stage:{"p50", "p95", "max", "count"} over the kept
+            runs, including the "total" pseudo-stage
+        """
+        with self._lock:
+            runs = list(self._runs)
+
+        durations = collections.OrderedDict()
+        for run in runs:
+            for stage, duration in run["stages"].items():
+                durations.setdefault(stage, []).append(duration)
+        if runs:
+            durations["total"] = [run["total"] for run in runs]
+
+        statistics = collections.OrderedDict()
+        for stage, values in durations.items():
+            values.sort()
+            stage_statistics = {
+                "p{}".format(p): _percentile(values, p) for p in self.PERCENTILES
+            }
+            stage_statistics["max"] = values[-1]
+            stage_statistics["count"] = len(values)
+            statistics[stage] = stage_statistics
+        return statistics
+
+    def to_dict(self):
+        """:return: the kept runs, oldest first, and the statistics"""
+        with self._lock:
+            runs = list(self._runs)
+        return {"runs": runs, "statistics": self.statistics()}
+
+
+def _percentile(sorted_values, percent):
+    # nearest-rank percentile of a non-empty sorted list
+    rank = -(-percent * len(sorted_values) // 100)  # ceil
+    return sorted_values[max(0, rank - 1)]
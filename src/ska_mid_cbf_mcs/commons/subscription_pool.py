@@ -0,0 +1,179 @@
+import logging
+import threading
+
+import tango
+
+__all__ = ["SubscriptionPool"]
+
+
+class _Subscription:
+    def __init__(self, attribute_proxy):
+        self.attribute_proxy = attribute_proxy
+        self.event_id = None
+        self.callback = None
+        self.generation = None
+        self.last_event = None
+        self.users = 0
+
+
+class SubscriptionPool:
+    """
+    Keeps change event subscriptions to attributes, keyed by attribute FQDN,
+    so that they can be reused instead of subscribing again.
+
+    Each configuration of the owner is a generation. ``begin_generation``
+    deactivates every subscription, without unsubscribing; ``acquire`` then
+    (re)activates the subscriptions used by the new generation, creating
+    only the ones that do not exist yet. Events are only passed on for
+    subscriptions acquired in the current generation, so stale events are
+    ignored.
+
+    When a subscription is reused, the last event received on it is
+    replayed to the new callback, just like a new subscription delivers the
+    current value of the attribute.
+
+    Subscriptions are reference counted: every ``acquire`` must be matched
+    by a ``release``, and the attribute is unsubscribed from once it has no
+    users left. Releasing the points of a configuration after acquiring the
+    ones of the next configuration keeps the points they share subscribed.
+
+    :param name: name used in log messages
+    :param logger: logger to use; defaults to the module logger
+    :param proxy_factory: callable creating the attribute proxy of an FQDN
+    """
+
+    def __init__(self, name, logger=None, proxy_factory=tango.AttributeProxy):
+        self._name = name
+        self.logger = logger or logging.getLogger(__name__)
+        self._proxy_factory = proxy_factory
+
+        self._lock = threading.Lock()
+        # serializes acquire and release, so that an attribute is never
+        # subscribed to twice; _lock is not held while subscribing, since
+        # the first event is dispatched during subscribe_event
+        self._subscribe_lock = threading.Lock()
+        self._subscriptions = {}  # fqdn:_Subscription
+        self._generation = 0
+        self._subscribe_count = 0
+        self._reuse_count = 0
+
+    @property
+    def generation(self):
+        """The current generation."""
+        return self._generation
+
+    @property
+    def subscribe_count(self):
+        """Number of subscriptions created."""
+        return self._subscribe_count
+
+    @property
+    def reuse_count(self):
+        """Number of times an existing subscription was reused."""
+        return self._reuse_count
+
+    @property
+    def active_count(self):
+        """Number of subscriptions acquired in the current generation."""
+        with self._lock:
+            return sum(
+                subscription.generation == self._generation
+                for subscription in self._subscriptions.values()
+            )
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def begin_generation(self):
+        """
+        Deactivate every subscription; events are ignored until the
+        subscription is acquired again.
+
+        :return: the new generation
+        """
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def acquire(self, fqdn, callback):
+        """
+        Pass the change events of an attribute to callback for the current
+        generation, subscribing only if the attribute is not subscribed yet.
+
+        :param fqdn: FQDN of the attribute
+        :param callback: callable taking the event
+        :raise tango.DevFailed: if the attribute cannot be subscribed to
+        """
+        with self._subscribe_lock:
+            with self._lock:
+                subscription = self._subscriptions.get(fqdn)
+                if subscription is not None:
+                    subscription.callback = callback
+                    subscription.generation = self._generation
+                    subscription.users += 1
+                    self._reuse_count += 1
+                    last_event = subscription.last_event
+
+            if subscription is not None:
+                if last_event is not None:
+                    callback(last_event)
+                return
+
+            attribute_proxy = self._proxy_factory(fqdn)
+            attribute_proxy.ping()  # To be sure the connection is good
+            subscription = _Subscription(attribute_proxy)
+            with self._lock:
+                subscription.callback = callback
+                subscription.generation = self._generation
+            # the first event (the current value) is delivered during subscribe_event
+            subscription.event_id = attribute_proxy.subscribe_event(
+                tango.EventType.CHANGE_EVENT,
+                lambda event: self._dispatch(subscription, event)
+            )
+            with self._lock:
+                subscription.users = 1
+                self._subscriptions[fqdn] = subscription
+                self._subscribe_count += 1
+
+    def release(self, fqdn):
+        """
+        Release an attribute acquired before; it is unsubscribed from once
+        it has no users left.
+
+        :param fqdn: FQDN of the attribute
+        """
+        with self._subscribe_lock:
+            with self._lock:
+                subscription = self._subscriptions.get(fqdn)
+                if subscription is None:
+                    return
+                subscription.users -= 1
+                if subscription.users > 0:
+                    return
+                del self._subscriptions[fqdn]
+                # no events are passed on from now on
+                subscription.generation = None
+            self._unsubscribe(fqdn, subscription)
+
+    def close(self):
+        """Unsubscribe from every attribute."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.items())
+            self._subscriptions = {}
+        for fqdn, subscription in subscriptions:
+            self._unsubscribe(fqdn, subscription)
+
+    def _unsubscribe(self, fqdn, subscription):
+        try:
+            subscription.attribute_proxy.unsubscribe_event(subscription.event_id)
+        except tango.DevFailed as df:
+            self.logger.warn("{}: failed to unsubscribe from {}: {}".format(
+                self._name, fqdn, df.args[0].desc))
+
+    def _dispatch(self, subscription, event):
+        with self._lock:
+            subscription.last_event = event
+            if subscription.generation != self._generation:
+                return  # stale: not used by the current generation
+            callback = subscription.callback
+        callback(event)
@@ -0,0 +1,66 @@
+import threading
+import time
+
+__all__ = ["TimedLock"]
+
+
+class TimedLock:
+    """
+    A lock that measures how long it is waited for and held, so that
+    contention shows up in monitoring. Use it as a context manager.
+
+    :param name: name of the lock, included in the statistics
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._acquired_at = None
+        self._count = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_hold = 0.0
+        self._max_hold = 0.0
+        self._last_hold = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        self._lock.acquire()
+        self._acquired_at = time.monotonic()
+        wait = self._acquired_at - start
+        with self._stats_lock:
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def release(self):
+        hold = time.monotonic() - self._acquired_at
+        self._lock.release()
+        with self._stats_lock:
+            self._count += 1
+            self._total_hold += hold
+            self._max_hold = max(self._max_hold, hold)
+            self._last_hold = hold
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def statistics(self):
+        """
+        :return: number of acquisitions, and the mean, max and last hold
+            times and mean and max wait times (in s)
+        """
+        with self._stats_lock:
+            count = self._count
+            return {
+                "count": count,
+                "mean_hold": self._total_hold / count if count else 0.0,
+                "max_hold": self._max_hold,
+                "last_hold": self._last_hold,
+                "mean_wait": self._total_wait / count if count else 0.0,
+                "max_wait": self._max_wait,
+            }
@@ -16,7 +16,7 @@ Sub-element controller device for Mid.CBf
 
 from __future__ import annotations  # allow forward references in type hints
 
-from typing import Tuple
+from typing import List, Tuple
 
 # tango imports
 import tango
@@ -27,15 +27,26 @@ from tango import AttrWriteType
 # Additional import
 # PROTECTED REGION ID(CbfController.additionnal_import) ENABLED START #
 # add the path to import global_enum package.
+import json
 import os
 import sys
-from random import randint
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy
 
 file_path = os.path.dirname(os.path.abspath(__file__))
 
 from ska_tango_base import SKAMaster, SKABaseDevice
 from ska_tango_base.control_model import HealthState, AdminMode
-from ska_tango_base.commands import ResultCode
+from ska_tango_base.commands import ResultCode, ResponseCommand
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import \
+    encode_receptor_to_vcc, parse_receptor_to_vcc
+from ska_mid_cbf_mcs.commons.event_dispatch import EventDispatchTable
+from ska_mid_cbf_mcs.commons.group_command import GroupCommandReport
+from ska_mid_cbf_mcs.commons.power_sequencer import PowerSequencer
+from ska_mid_cbf_mcs.commons.reconnection_queue import ReconnectionQueue
 
 # PROTECTED REGION END #    //  CbfController.additionnal_import
 
@@ -85,6 +96,45 @@ class CbfController(SKAMaster):
         dtype=('str',)
     )
 
+    PowerBatchSize = device_property(
+        dtype='uint16',
+        doc="Maximum number of subarrays/capabilities powered on or off at once "
+            "by On, Off and Standby; 0 for all of them",
+        default_value=64
+    )
+
+    PowerCommandTimeout = device_property(
+        dtype='double',
+        doc="Time (in s) a subarray/capability has to reply to On or Off",
+        default_value=3.0
+    )
+
+    ReceptorToVcc = device_property(
+        dtype=('str',),
+        doc="Assignment of the receptors to the VCCs, in the form \"receptorID:vccID\"; "
+            "receptor i is assigned to VCC i if not defined"
+    )
+
+    DiscoveryWorkers = device_property(
+        dtype='uint16',
+        doc="Maximum number of subarrays/capabilities connected to concurrently at startup",
+        default_value=32
+    )
+
+    ReconnectInitialDelay = device_property(
+        dtype='double',
+        doc="Delay (in s) before retrying the connection to a subarray/capability "
+            "that was unreachable at startup; doubled after every failed attempt",
+        default_value=1.0
+    )
+
+    ReconnectMaxDelay = device_property(
+        dtype='double',
+        doc="Maximum delay (in s) between two connection attempts to an unreachable "
+            "subarray/capability",
+        default_value=60.0
+    )
+
     # ----------
     # Attributes
     # ----------
@@ -100,6 +150,37 @@ class CbfController(SKAMaster):
         doc="Percentage progress implemented for commands that result in state/mode transitions for a large \nnumber of components and/or are executed in stages (e.g power up, power down)",
     )
 
+    lastPowerReport = attribute(
+        dtype='str',
+        label="Last power report",
+        doc="Success, latency (in s) and error of every subarray/capability for the "
+            "last On, Off or Standby command, as JSON",
+    )
+
+    initProgress = attribute(
+        dtype='uint16',
+        label="Init progress percentage",
+        max_value=100,
+        min_value=0,
+        doc="Percentage of the subarrays/capabilities connected to (or queued for "
+            "reconnection) by the Init command",
+    )
+
+    initDuration = attribute(
+        dtype='double',
+        unit="s",
+        label="Init duration",
+        doc="Time taken by the last Init command",
+    )
+
+    unreachableDevices = attribute(
+        dtype=('str',),
+        max_dim_x=240,
+        label="Unreachable devices",
+        doc="Subarrays/capabilities that could not be connected to yet; the "
+            "connection is retried in the background",
+    )
+
     receptorToVcc = attribute(
         dtype=('str',),
         max_dim_x=197,
@@ -108,6 +189,14 @@ class CbfController(SKAMaster):
         doc="Maps receptors IDs to VCC IDs, in the form \"receptorID:vccID\"",
     )
 
+    receptorToVccMap = attribute(
+        dtype=('uint',),
+        max_dim_x=198,
+        label="Receptor-VCC map (numeric)",
+        doc="Version of the map, followed by the VCC ID of each receptor ID from 1 "
+            "(0 if none); pushed as change events whenever the map changes",
+    )
+
     vccToReceptor = attribute(
         dtype=('str',),
         max_dim_x=197,
@@ -116,6 +205,20 @@ class CbfController(SKAMaster):
         doc="Maps VCC IDs to receptor IDs, in the form \"vccID:receptorID\"",
     )
 
+    receptorToVccIDs = attribute(
+        dtype=('uint16',),
+        max_dim_x=197,
+        label="VCC ID of each receptor",
+        doc="VCC ID of each receptor ID from 1 (0 if none)",
+    )
+
+    vccToReceptorIDs = attribute(
+        dtype=('uint16',),
+        max_dim_x=197,
+        label="Receptor ID of each VCC",
+        doc="Receptor ID of each VCC ID from 1 (0 if none)",
+    )
+
     subarrayconfigID = attribute(
         dtype=('str',),
         max_dim_x=16,
@@ -256,6 +359,10 @@ class CbfController(SKAMaster):
             "Off", self.OffCommand(*device_args)
         )
 
+        self.register_command_object(
+            "RefreshSubscriptions", self.RefreshSubscriptionsCommand(*device_args)
+        )
+
     class InitCommand(SKAMaster.InitCommand):
 
         def __state_change_event_callback(
@@ -267,56 +374,14 @@ class CbfController(SKAMaster):
 
             if not event.err:
                 try:
-                    device_name = event.device.dev_name()
-                    if "healthstate" in event.attr_name:
-                        if "subarray" in device_name:
-                            device._report_subarray_health_state[
-                                device._fqdn_subarray.index(device_name)] = \
-                                event.attr_value.value
-                        elif "vcc" in device_name:
-                            device._report_vcc_health_state[device._fqdn_vcc.index(device_name)] = \
-                                event.attr_value.value
-                        elif "fsp" in device_name:
-                            device._report_fsp_health_state[device._fqdn_fsp.index(device_name)] = \
-                                event.attr_value.value
-                        else:
-                            # should NOT happen!
-                            log_msg = "Received health state change for unknown device " + \
-                                    str(event.attr_name)
-                            device.logger.warn(log_msg)
-                            return
-                    elif "state" in event.attr_name:
-                        if "subarray" in device_name:
-                            device._report_subarray_state[device._fqdn_subarray.index(device_name)] = \
-                                event.attr_value.value
-                        elif "vcc" in device_name:
-                            device._report_vcc_state[device._fqdn_vcc.index(device_name)] = \
-                                event.attr_value.value
-                        elif "fsp" in device_name:
-                            device._report_fsp_state[device._fqdn_fsp.index(device_name)] = \
-                                event.attr_value.value
-                        else:
-                            # should NOT happen!
-                            log_msg = "Received state change for unknown device " + \
-                                    str(event.attr_name)
-                            device.logger.warn(log_msg)
-                            return
-                    elif "adminmode" in event.attr_name:
-                        if "subarray" in device_name:
-                            device._report_subarray_admin_mode[device._fqdn_subarray.index(device_name)] = \
-                                event.attr_value.value
-                        elif "vcc" in device_name:
-                            device._report_vcc_admin_mode[device._fqdn_vcc.index(device_name)] = \
-                                event.attr_value.value
-                        elif "fsp" in device_name:
-                            device._report_fsp_admin_mode[device._fqdn_fsp.index(device_name)] = \
-                                event.attr_value.value
-                        else:
-                            # should NOT happen!
-                            log_msg = "Received admin mode change for unknown device " + \
-                                    str(event.attr_name)
-                            self.logger.warn(log_msg)
-                            return
+                    with device._stale_lock:
+                        device._stale_devices.discard(event.device.dev_name().lower())
+                    if not device._event_dispatch.dispatch(event):
+                        # should NOT happen!
+                        log_msg = "Received change event for unknown attribute " + \
+                                str(event.attr_name)
+                        device.logger.warn(log_msg)
+                        return
 
                     log_msg = "New value for " + str(event.attr_name) + " is " + \
                             str(event.attr_value.value)
@@ -324,6 +389,7 @@ class CbfController(SKAMaster):
                 except Exception as except_occurred:
                     self.logger.error(str(except_occurred))
             else:
+                self.__mark_stale(event)
                 for item in event.errors:
                     log_msg = item.reason + ": on attribute " + str(event.attr_name)
                     self.logger.error(log_msg)
@@ -338,23 +404,26 @@ class CbfController(SKAMaster):
             if not event.err:
                 try:
                     device_name = event.device.dev_name()
-                    if "vcc" in device_name:
-                        device._report_vcc_subarray_membership[device._fqdn_vcc.index(device_name)] = \
-                            event.attr_value.value
-                    elif "fsp" in device_name:
-                        if event.attr_value.value not in device._report_fsp_corr_subarray_membership[
-                            device._fqdn_fsp.index(device_name)]:
-                            device.logger.warning("{}".format(event.attr_value.value))
-                            device._report_fsp_corr_subarray_membership[
-                                device._fqdn_fsp.index(device_name)
-                            ].append(event.attr_value.value)
-                    else:
+                    slot = device._event_dispatch.lookup(event)
+                    if slot is None:
                         # should NOT happen!
                         log_msg = "Received event for unknown device " + str(
                             event.attr_name)
                         self.logger.warn(log_msg)
                         return
 
+                    memberships, index = slot
+                    if memberships is device._report_vcc_subarray_membership:
+                        memberships[index] = event.attr_value.value
+                        device.push_change_event(
+                            "reportVCCSubarrayMembership",
+                            device._report_vcc_subarray_membership
+                        )
+                    elif event.attr_value.value not in memberships[index]:
+                        # FSPs can belong to several subarrays
+                        device.logger.warning("{}".format(event.attr_value.value))
+                        memberships[index].append(event.attr_value.value)
+
                     log_msg = "New value for " + str(event.attr_name) + " of device " + \
                             device_name + " is " + str(event.attr_value.value)
                     self.logger.debug(log_msg)
@@ -362,10 +431,23 @@ class CbfController(SKAMaster):
                 except Exception as except_occurred:
                     self.logger.error(str(except_occurred))
             else:
+                self.__mark_stale(event)
                 for item in event.errors:
                     log_msg = item.reason + ": on attribute " + str(event.attr_name)
                     self.logger.error(log_msg)
 
+        def __mark_stale(
+            self: CbfController.InitCommand,
+            event
+        ) -> None:
+            """Remember that the subscriptions of the device of an error event
+            dropped, so that RefreshSubscriptions re-establishes them"""
+            try:
+                with self.target._stale_lock:
+                    self.target._stale_devices.add(event.device.dev_name().lower())
+            except Exception as except_occurred:
+                self.logger.error(str(except_occurred))
+
         def __get_num_capabilities(
             self: CbfController.InitCommand, 
         ) -> None:
@@ -394,6 +476,156 @@ class CbfController(SKAMaster):
             else:
                 self.logger.warn("MaxCapabilities device property not defined")
 
+        def __connect_device(
+            self: CbfController.InitCommand,
+            fqdn: str
+        ) -> None:
+            """
+            Connect to a subarray/capability: ping it, write the receptor ID
+            of a VCC and subscribe to its change events.
+
+            :param fqdn: FQDN of the device
+            :raise tango.DevFailed: if the device cannot be reached; the
+                subscriptions made so far are undone
+            """
+            device = self.target
+
+            self.logger.info("Trying connection to " + fqdn + " device")
+            device_proxy = tango.DeviceProxy(fqdn)
+            device_proxy.ping()
+
+            if fqdn in device._vcc_receptor_id:
+                device_proxy.receptorID = device._vcc_receptor_id[fqdn]
+
+            # subscribe to change events on subarrays/capabilities
+            attributes = ["adminMode", "healthState", "State"]
+            callbacks = [self.__state_change_event_callback] * len(attributes)
+            # subscribe to VCC/FSP subarray membership change events
+            if "vcc" in fqdn or "fsp" in fqdn:
+                attributes.append("subarrayMembership")
+                callbacks.append(self.__membership_event_callback)
+
+            # subscribe to subarray config ID change events
+            # if "subarray" in fqdn:
+            #     attributes.append("configID")
+            #     callbacks.append(device.__config_ID_event_callback)
+
+            events = []
+            try:
+                for attribute_val, callback in zip(attributes, callbacks):
+                    events.append(
+                        device_proxy.subscribe_event(
+                            attribute_val, tango.EventType.CHANGE_EVENT,
+                            callback, stateless=True
+                        )
+                    )
+            except tango.DevFailed:
+                for event_id in events:
+                    try:
+                        device_proxy.unsubscribe_event(event_id)
+                    except tango.DevFailed:
+                        pass
+                raise
+
+            device._proxies[fqdn] = device_proxy
+            device._event_id[device_proxy] = events
+
+        def __disconnect_device(
+            self: CbfController.InitCommand,
+            fqdn: str
+        ) -> None:
+            """Unsubscribe from the change events of a subarray/capability and
+            drop its proxy"""
+            device = self.target
+            device_proxy = device._proxies.pop(fqdn, None)
+            if device_proxy is None:
+                return
+            for event_id in device._event_id.pop(device_proxy, []):
+                try:
+                    device_proxy.unsubscribe_event(event_id)
+                except tango.DevFailed as df:
+                    device.logger.warn("Failure in unsubscription from {}: {}".format(
+                        fqdn, df.args[0].desc))
+
+        def disconnect_devices(
+            self: CbfController.InitCommand,
+        ) -> None:
+            """Unsubscribe from the change events of every subarray/capability
+            and drop their proxies"""
+            for fqdn in list(self.target._proxies):
+                self.__disconnect_device(fqdn)
+
+        def __connect_devices(
+            self: CbfController.InitCommand,
+            fqdns: List[str],
+            on_progress=None
+        ) -> int:
+            """
+            Connect to subarrays/capabilities concurrently, on at most
+            DiscoveryWorkers threads; the ones that are unreachable are
+            retried in the background.
+
+            :param fqdns: FQDNs of the devices
+            :param on_progress: optional callable taking the percentage of
+                the devices done
+            :return: the number of devices connected to
+            """
+            device = self.target
+            connected = 0
+            with ThreadPoolExecutor(max_workers=max(1, device.DiscoveryWorkers)) as executor:
+                futures = {
+                    executor.submit(self.__connect_device, fqdn): fqdn for fqdn in fqdns
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    fqdn = futures[future]
+                    try:
+                        future.result()
+                        connected += 1
+                    except tango.DevFailed as df:
+                        for item in df.args:
+                            log_msg = "Failure in connection to " + fqdn + " device: " + str(item.reason)
+                            device.logger.error(log_msg)
+                        device._reconnection_queue.add(fqdn)
+                    if on_progress is not None:
+                        on_progress(done * 100 // len(fqdns))
+            return connected
+
+        def refresh_subscriptions(
+            self: CbfController.InitCommand,
+        ) -> Tuple[int, int]:
+            """
+            Re-establish the subscriptions that dropped: the devices whose
+            subscriptions reported an error since their last event are
+            disconnected and connected again, and the devices without a
+            proxy that are not queued for reconnection are connected.
+
+            :return: the number of devices refreshed and the number of them
+                connected to
+            """
+            device = self.target
+            queued = set(device._reconnection_queue.pending)
+            # the event threads update the stale devices meanwhile
+            with device._stale_lock:
+                stale = set(device._stale_devices)
+            fqdns = [
+                fqdn for fqdn in device._fqdn_vcc + device._fqdn_fsp + device._fqdn_subarray
+                if fqdn not in queued and (
+                    fqdn not in device._proxies or fqdn.lower() in stale)
+            ]
+            with device._stale_lock:
+                device._stale_devices.difference_update(fqdn.lower() for fqdn in fqdns)
+            for fqdn in fqdns:
+                self.__disconnect_device(fqdn)
+            return len(fqdns), self.__connect_devices(fqdns)
+
+        def __set_init_progress(
+            self: CbfController.InitCommand,
+            progress: int
+        ) -> None:
+            device = self.target
+            device._init_progress = progress
+            device.push_change_event("initProgress", progress)
+
         def do(
             self: CbfController.InitCommand,
         ) -> Tuple[ResultCode, str]:
@@ -410,6 +642,11 @@ class CbfController(SKAMaster):
             super().do()
 
             device = self.target
+            init_start = time.monotonic()
+
+            # Init is not a registered command object: keep this one, which
+            # holds the subscription callbacks, for RefreshSubscriptions
+            device._init_command = self
 
             # defines self._count_vcc, self._count_fsp, and self._count_subarray
             self.__get_num_capabilities()
@@ -420,17 +657,31 @@ class CbfController(SKAMaster):
 
             # initialize attribute values
             device._command_progress = 0
+            device.set_change_event("commandProgress", True, False)
+            device._last_power_report = None
+            device._init_progress = 0
+            device._init_duration = 0.0
+            device.set_change_event("initProgress", True, False)
+            # the numeric report attributes are held in arrays of their Tango
+            # type, so they are returned as they are on read
             device._report_vcc_state = [tango.DevState.UNKNOWN] * device._count_vcc
-            device._report_vcc_health_state = [HealthState.UNKNOWN.value] * device._count_vcc
-            device._report_vcc_admin_mode = [AdminMode.ONLINE.value] * device._count_vcc
-            device._report_vcc_subarray_membership = [0] * device._count_vcc
+            device._report_vcc_health_state = numpy.full(
+                device._count_vcc, HealthState.UNKNOWN.value, dtype=numpy.uint16)
+            device._report_vcc_admin_mode = numpy.full(
+                device._count_vcc, AdminMode.ONLINE.value, dtype=numpy.uint16)
+            device._report_vcc_subarray_membership = numpy.zeros(
+                device._count_vcc, dtype=numpy.uint16)
             device._report_fsp_state = [tango.DevState.UNKNOWN] * device._count_fsp
-            device._report_fsp_health_state = [HealthState.UNKNOWN.value] * device._count_fsp
-            device._report_fsp_admin_mode = [AdminMode.ONLINE.value] * device._count_fsp
+            device._report_fsp_health_state = numpy.full(
+                device._count_fsp, HealthState.UNKNOWN.value, dtype=numpy.uint16)
+            device._report_fsp_admin_mode = numpy.full(
+                device._count_fsp, AdminMode.ONLINE.value, dtype=numpy.uint16)
             device._report_fsp_corr_subarray_membership = [[] for i in range(device._count_fsp)]
             device._report_subarray_state = [tango.DevState.UNKNOWN] * device._count_subarray
-            device._report_subarray_health_state = [HealthState.UNKNOWN.value] * device._count_subarray
-            device._report_subarray_admin_mode = [AdminMode.ONLINE.value] * device._count_subarray
+            device._report_subarray_health_state = numpy.full(
+                device._count_subarray, HealthState.UNKNOWN.value, dtype=numpy.uint16)
+            device._report_subarray_admin_mode = numpy.full(
+                device._count_subarray, AdminMode.ONLINE.value, dtype=numpy.uint16)
             device._frequency_offset_k = [0] * device._count_vcc
             device._frequency_offset_delta_f = [0] * device._count_vcc
             device._subarray_config_ID = [""] * device._count_subarray
@@ -440,21 +691,56 @@ class CbfController(SKAMaster):
             device._fqdn_fsp = list(device.FSP)[:device._count_fsp]
             device._fqdn_subarray = list(device.CbfSubarray)[:device._count_subarray]
 
-            # initialize dicts with maps receptorID <=> vccID (randomly for now, for testing purposes)
-            # maps receptor IDs to VCC IDs, in the form "receptorID:vccID"
-            device._receptor_to_vcc = []
-            # maps VCC IDs to receptor IDs, in the form "vccID:receptorID"
-            device._vcc_to_receptor = []
-
-            remaining = list(range(1, device._count_vcc + 1))
-            for i in range(1, device._count_vcc + 1):
-                receptorIDIndex = randint(0, len(remaining) - 1)
-                receptorID = remaining[receptorIDIndex]
-                device._receptor_to_vcc.append("{}:{}".format(receptorID, i))
-                device._vcc_to_receptor.append("{}:{}".format(i, receptorID))
-                vcc_proxy = tango.DeviceProxy(device._fqdn_vcc[i - 1])
-                vcc_proxy.receptorID = receptorID
-                del remaining[receptorIDIndex]
+            # (device, attribute) -> report attribute slot, for the change
+            # event callbacks
+            device._event_dispatch = EventDispatchTable()
+            for fqdns, states, health_states, admin_modes in [
+                (device._fqdn_vcc, device._report_vcc_state,
+                 device._report_vcc_health_state, device._report_vcc_admin_mode),
+                (device._fqdn_fsp, device._report_fsp_state,
+                 device._report_fsp_health_state, device._report_fsp_admin_mode),
+                (device._fqdn_subarray, device._report_subarray_state,
+                 device._report_subarray_health_state, device._report_subarray_admin_mode),
+            ]:
+                for index, fqdn in enumerate(fqdns):
+                    device._event_dispatch.register(fqdn, "State", states, index)
+                    device._event_dispatch.register(fqdn, "healthState", health_states, index)
+                    device._event_dispatch.register(fqdn, "adminMode", admin_modes, index)
+            for index, fqdn in enumerate(device._fqdn_vcc):
+                device._event_dispatch.register(
+                    fqdn, "subarrayMembership", device._report_vcc_subarray_membership, index)
+            for index, fqdn in enumerate(device._fqdn_fsp):
+                device._event_dispatch.register(
+                    fqdn, "subarrayMembership", device._report_fsp_corr_subarray_membership, index)
+
+            # receptorID <=> vccID tables, indexed by ID - 1
+            try:
+                device._receptor_to_vcc_ids, device._vcc_to_receptor_ids = \
+                    parse_receptor_to_vcc(device.ReceptorToVcc, device._count_vcc)
+            except ValueError as e:
+                device.logger.error(
+                    "Invalid ReceptorToVcc property ({}), assigning receptor i to VCC i".format(e))
+                device._receptor_to_vcc_ids, device._vcc_to_receptor_ids = \
+                    parse_receptor_to_vcc([], device._count_vcc)
+            receptor_to_vcc = {
+                receptorID: int(vccID)
+                for receptorID, vccID in enumerate(device._receptor_to_vcc_ids, 1) if vccID
+            }
+            # receptor ID to write to each VCC once it is connected to
+            device._vcc_receptor_id = {
+                device._fqdn_vcc[vccID - 1]: int(receptorID)
+                for vccID, receptorID in enumerate(device._vcc_to_receptor_ids, 1)
+                if receptorID and vccID <= len(device._fqdn_vcc)
+            }
+
+            # numeric form of the same map, replicated by the subarrays and
+            # FSP subarrays through change events
+            device._receptor_to_vcc_version = getattr(device, "_receptor_to_vcc_version", 0) + 1
+            device._receptor_to_vcc_map = encode_receptor_to_vcc(
+                device._receptor_to_vcc_version, receptor_to_vcc, device._count_vcc)
+            device.set_change_event("receptorToVccMap", True, False)
+            device.push_change_event("receptorToVccMap", device._receptor_to_vcc_map)
+            device.set_change_event("reportVCCSubarrayMembership", True, False)
 
             # initialize the dict with subarray/capability proxies
             device._proxies = {}  # device_name:proxy
@@ -462,60 +748,36 @@ class CbfController(SKAMaster):
             # initialize the dict with the subscribed event IDs
             device._event_id = {}  # proxy:[eventID]
 
-            # initialize groups
-            device._group_vcc = tango.Group("VCC")
-            for fqdn in device._fqdn_vcc:
-                device._group_vcc.add(fqdn)
-            device._group_fsp = tango.Group("FSP")
-            for fqdn in device._fqdn_fsp:
-                device._group_fsp.add(fqdn)
-            device._group_subarray = tango.Group("CBF Subarray")
-            for fqdn in device._fqdn_subarray:
-                device._group_subarray.add(fqdn)
-
-            # Try connection with each subarray/capability
-            for fqdn in device._fqdn_vcc + device._fqdn_fsp + device._fqdn_subarray:
-                try:
-                    log_msg = "Trying connection to " + fqdn + " device"
-                    device.logger.info(log_msg)
-                    device_proxy = tango.DeviceProxy(fqdn)
-                    device_proxy.ping()
-
-                    device._proxies[fqdn] = device_proxy
-                    events = []
-
-                    # subscribe to change events on subarrays/capabilities
-                    for attribute_val in ["adminMode", "healthState", "State"]:
-                        events.append(
-                            device_proxy.subscribe_event(
-                                attribute_val, tango.EventType.CHANGE_EVENT,
-                                self.__state_change_event_callback, stateless=True
-                            )
-                        )
-
-                    # subscribe to VCC/FSP subarray membership change events
-                    if "vcc" in fqdn or "fsp" in fqdn:
-                        events.append(
-                            device_proxy.subscribe_event(
-                                "subarrayMembership", tango.EventType.CHANGE_EVENT,
-                                self.__membership_event_callback, stateless=True
-                            )
-                        )
-
-                    # subscribe to subarray config ID change events
-                    # if "subarray" in fqdn:
-                    #     events.append(
-                    #         device_proxy.subscribe_event(
-                    #             "configID", tango.EventType.CHANGE_EVENT,
-                    #             device.__config_ID_event_callback, stateless=True
-                    #         )
-                    #     )
-
-                    device._event_id[device_proxy] = events
-                except tango.DevFailed as df:
-                    for item in df.args:
-                        log_msg = "Failure in connection to " + fqdn + " device: " + str(item.reason)
-                        device.logger.error(log_msg)
+            # names (lowercase) of the devices with dropped subscriptions
+            device._stale_devices = set()
+            device._stale_lock = threading.Lock()
+
+            # On, Off and Standby are sent to the subarrays/capabilities in
+            # batches of groups
+            device._power_sequencer = PowerSequencer(
+                device._fqdn_subarray + device._fqdn_vcc + device._fqdn_fsp,
+                batch_size=device.PowerBatchSize,
+                timeout=device.PowerCommandTimeout,
+                logger=device.logger
+            )
+
+            # Connect to the subarrays/capabilities concurrently; the ones
+            # that are unreachable are retried in the background
+            if getattr(device, "_reconnection_queue", None) is not None:
+                device._reconnection_queue.stop()
+            device._reconnection_queue = ReconnectionQueue(
+                self.__connect_device,
+                initial_delay=device.ReconnectInitialDelay,
+                max_delay=device.ReconnectMaxDelay,
+                logger=device.logger
+            )
+            fqdns = device._fqdn_vcc + device._fqdn_fsp + device._fqdn_subarray
+            connected = self.__connect_devices(fqdns, on_progress=self.__set_init_progress)
+            self.__set_init_progress(100)
+
+            device._init_duration = time.monotonic() - init_start
+            self.logger.info("Connected to {} of {} subarrays/capabilities in {:.3f} s".format(
+                connected, len(fqdns), device._init_duration))
 
             message = "CbfController Init command completed OK"
             self.logger.info(message)
@@ -530,9 +792,34 @@ class CbfController(SKAMaster):
     def delete_device(self: CbfController) -> None:
         """Unsubscribe to events, turn all the subarrays, VCCs and FSPs off""" 
         # PROTECTED REGION ID(CbfController.delete_device) ENABLED START #
-        pass
+        if getattr(self, "_reconnection_queue", None) is not None:
+            self._reconnection_queue.stop()
+        init_command = getattr(self, "_init_command", None)
+        if init_command is not None:
+            init_command.disconnect_devices()
         # PROTECTED REGION END #    //  CbfController.delete_device
 
+    def _set_command_progress(self: CbfController, progress: int) -> None:
+        self._command_progress = progress
+        self.push_change_event("commandProgress", progress)
+
+    def _run_power_sequence(self: CbfController, command_name: str) -> GroupCommandReport:
+        """
+        Send a power command to every subarray/capability through the power
+        sequencer, updating commandProgress after every batch. The
+        per-device report is kept for the lastPowerReport attribute.
+
+        :param command_name: "On" or "Off"
+        :return: the GroupCommandReport
+        """
+        self._set_command_progress(0)
+        report = self._power_sequencer.run(command_name, on_progress=self._set_command_progress)
+        self._last_power_report = report
+        self.logger.info("{} sent to {} devices in {} batches, {} failed".format(
+            command_name, len(self._power_sequencer), self._power_sequencer.batch_count,
+            len(report.failed)))
+        return report
+
     # ------------------
     # Attributes methods
     # ------------------
@@ -545,18 +832,70 @@ class CbfController(SKAMaster):
         return self._command_progress
         # PROTECTED REGION END #    //  CbfController.commandProgress_read
 
+    def read_lastPowerReport(self: CbfController) -> str:
+        # PROTECTED REGION ID(CbfController.lastPowerReport_read) ENABLED START #
+        """Return the per-device report of the last power command, as JSON"""
+        if self._last_power_report is None:
+            return "{}"
+        return json.dumps(self._last_power_report.to_dict())
+        # PROTECTED REGION END #    //  CbfController.lastPowerReport_read
+
+    def read_initProgress(self: CbfController) -> int:
+        # PROTECTED REGION ID(CbfController.initProgress_read) ENABLED START #
+        """Return initProgress attribute: percentage of the subarrays/capabilities
+        processed by the Init command"""
+        return self._init_progress
+        # PROTECTED REGION END #    //  CbfController.initProgress_read
+
+    def read_initDuration(self: CbfController) -> float:
+        # PROTECTED REGION ID(CbfController.initDuration_read) ENABLED START #
+        """Return initDuration attribute: time (in s) taken by the last Init command"""
+        return self._init_duration
+        # PROTECTED REGION END #    //  CbfController.initDuration_read
+
+    def read_unreachableDevices(self: CbfController) -> List[str]:
+        # PROTECTED REGION ID(CbfController.unreachableDevices_read) ENABLED START #
+        """Return unreachableDevices attribute: subarrays/capabilities waiting
+        for reconnection"""
+        return self._reconnection_queue.pending
+        # PROTECTED REGION END #    //  CbfController.unreachableDevices_read
+
     def read_receptorToVcc(self: CbfController) -> str:
         # PROTECTED REGION ID(CbfController.receptorToVcc_read) ENABLED START #
         """Return 'receptorID:vccID'"""
-        return self._receptor_to_vcc
+        return [
+            "{}:{}".format(receptorID, vccID)
+            for receptorID, vccID in enumerate(self._receptor_to_vcc_ids, 1) if vccID
+        ]
         # PROTECTED REGION END #    //  CbfController.receptorToVcc_read
 
+    def read_receptorToVccMap(self: CbfController) -> List[int]:
+        # PROTECTED REGION ID(CbfController.receptorToVccMap_read) ENABLED START #
+        """Return receptorToVccMap attribute: [version, vccID of receptor 1, ...]"""
+        return self._receptor_to_vcc_map
+        # PROTECTED REGION END #    //  CbfController.receptorToVccMap_read
+
     def read_vccToReceptor(self: CbfController) -> str:
         # PROTECTED REGION ID(CbfController.vccToReceptor_read) ENABLED START #
         """Return receptorToVcc attribute: 'vccID:receptorID'"""
-        return self._vcc_to_receptor
+        return [
+            "{}:{}".format(vccID, receptorID)
+            for vccID, receptorID in enumerate(self._vcc_to_receptor_ids, 1) if receptorID
+        ]
         # PROTECTED REGION END #    //  CbfController.vccToReceptor_read
 
+    def read_receptorToVccIDs(self: CbfController) -> numpy.ndarray:
+        # PROTECTED REGION ID(CbfController.receptorToVccIDs_read) ENABLED START #
+        """Return receptorToVccIDs attribute: VCC ID of each receptor"""
+        return self._receptor_to_vcc_ids
+        # PROTECTED REGION END #    //  CbfController.receptorToVccIDs_read
+
+    def read_vccToReceptorIDs(self: CbfController) -> numpy.ndarray:
+        # PROTECTED REGION ID(CbfController.vccToReceptorIDs_read) ENABLED START #
+        """Return vccToReceptorIDs attribute: receptor ID of each VCC"""
+        return self._vcc_to_receptor_ids
+        # PROTECTED REGION END #    //  CbfController.vccToReceptorIDs_read
+
     def read_subarrayconfigID(self: CbfController) -> str:
         # PROTECTED REGION ID(CbfController.subarrayconfigID_read) ENABLED START #
         """Return subarrayconfigID atrribute: ID of subarray config. 
@@ -694,10 +1033,10 @@ class CbfController(SKAMaster):
 
             device = self.target
 
-            device._group_subarray.command_inout("On")
-            device._group_vcc.command_inout("On")
-            device._group_fsp.command_inout("On")
+            report = device._run_power_sequence("On")
             device.set_state(tango.DevState.ON)
+            if not report.ok:
+                message += "; On failed on {}".format(", ".join(report.failed))
 
             return (result_code,message)
 
@@ -720,16 +1059,67 @@ class CbfController(SKAMaster):
 
             device = self.target
 
-            for proxy in list(device._event_id.keys()):
-                for event_id in device._event_id[proxy]:
-                    proxy.unsubscribe_event(event_id)
-            device._group_subarray.command_inout("Off")
-            device._group_vcc.command_inout("Off")
-            device._group_fsp.command_inout("Off")
+            # the subscriptions are kept, to keep tracking the subarrays and
+            # capabilities while they are off
+            report = device._run_power_sequence("Off")
             device.set_state(tango.DevState.OFF)
+            if not report.ok:
+                message += "; Off failed on {}".format(", ".join(report.failed))
 
             return (result_code,message)
 
+    class RefreshSubscriptionsCommand(ResponseCommand):
+        """
+        A class for the CbfController's RefreshSubscriptions() command.
+        """
+        def do(
+            self: CbfController.RefreshSubscriptionsCommand,
+        ) -> Tuple[ResultCode, str]:
+            """
+            Stateless hook for RefreshSubscriptions() command functionality.
+
+            :return: A tuple containing a return code and a string
+                message indicating status. The message is for
+                information purpose only.
+            :rtype: (ResultCode, str)
+            """
+            device = self.target
+
+            init_command = getattr(device, "_init_command", None)
+            if init_command is None:
+                message = "RefreshSubscriptions failed: device not initialised"
+                self.logger.error(message)
+                return (ResultCode.FAILED, message)
+            refreshed, connected = init_command.refresh_subscriptions()
+
+            message = "Subscriptions of {} devices refreshed, {} connected".format(
+                refreshed, connected)
+            self.logger.info(message)
+            if connected < refreshed:
+                return (ResultCode.FAILED, message)
+            return (ResultCode.OK, message)
+
+    @command(
+        dtype_out='DevVarLongStringArray',
+        doc_out="(ReturnType, 'informational message')",
+    )
+    def RefreshSubscriptions(self: CbfController) -> Tuple[ResultCode, str]:
+        # PROTECTED REGION ID(CbfController.RefreshSubscriptions) ENABLED START #
+        """
+        Re-establish the change event subscriptions to the subarrays and
+        capabilities that dropped; devices that are still unreachable are
+        retried in the background.
+
+        :return: A tuple containing a return code and a string
+            message indicating status. The message is for
+            information purpose only.
+        :rtype: (ResultCode, str)
+        """
+        command = self.get_command_object("RefreshSubscriptions")
+        (return_code, message) = command()
+        return [[return_code], [message]]
+        # PROTECTED REGION END #    //  CbfController.RefreshSubscriptions
+
     # TODO: If the Standby command is needed: 
     # Convert it to the new base class StandbyCommand
     # Test it (can use integration test_standby_valid)
@@ -743,9 +1133,7 @@ class CbfController(SKAMaster):
     def Standby(self: CbfController) -> None:
         # PROTECTED REGION ID(CbfController.Standby) ENABLED START #
         """turn off subarray, vcc, fsp, turn CbfController to standby"""
-        self._group_subarray.command_inout("Off")
-        self._group_vcc.command_inout("Off")
-        self._group_fsp.command_inout("Off")
+        self._run_power_sequence("Off")
         self.set_state(tango.DevState.STANDBY)
         # PROTECTED REGION END #    //  CbfController.Standby
 
@@ -37,6 +37,7 @@ from random import randint
 file_path = os.path.dirname(os.path.abspath(__file__))
 
 from ska_mid_cbf_mcs.commons.global_enum import const, freq_band_dict
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import ControllerReplicas
 from ska_tango_base.control_model import HealthState, AdminMode, ObsState
 from ska_tango_base import CspSubElementObsDevice
 from ska_tango_base.commands import ResultCode
@@ -278,6 +279,14 @@ class FspCorrSubarray(CspSubElementObsDevice):
             device._fqdn_vcc = list(device.VCC)[:device._count_vcc]
             device._proxies_vcc = [*map(tango.DeviceProxy, device._fqdn_vcc)]
 
+            # local replicas of the controller receptor to VCC map and VCC
+            # subarray memberships, kept up to date by change events
+            device._controller_replicas = ControllerReplicas(
+                device._proxy_cbf_controller, device._proxies_vcc, logger=device.logger)
+            device._receptor_to_vcc = device._controller_replicas.receptor_to_vcc
+            device._vcc_membership = device._controller_replicas.vcc_membership
+            device._controller_replicas.subscribe()
+
             message = "FspCorrSubarry Init command completed OK"
             self.logger.info(message)
             return (ResultCode.OK, message)
@@ -292,7 +301,8 @@ class FspCorrSubarray(CspSubElementObsDevice):
 
     def delete_device(self):
         # PROTECTED REGION ID(FspCorrSubarray.delete_device) ENABLED START #
-        pass
+        if hasattr(self, "_controller_replicas"):
+            self._controller_replicas.unsubscribe()
         # PROTECTED REGION END #    //  FspCorrSubarray.delete_device
 
     # ------------------
@@ -424,12 +434,10 @@ class FspCorrSubarray(CspSubElementObsDevice):
     def _add_receptors(self, argin):
         """add specified receptors to the FSP subarray. Input is array of int."""
         errs = []  # list of error messages
-        receptor_to_vcc = dict([*map(int, pair.split(":"))] for pair in
-                               self._proxy_cbf_controller.receptorToVcc)
         for receptorID in argin:
             try:
-                vccID = receptor_to_vcc[receptorID]
-                subarrayID = self._proxies_vcc[vccID - 1].subarrayMembership
+                vccID = self._receptor_to_vcc.vcc_id(receptorID)
+                subarrayID = self._vcc_membership.subarray_id(vccID, self._subarray_id)
 
                 # only add receptor if it belongs to the CBF subarray
                 if subarrayID != self._subarray_id:
@@ -31,6 +31,10 @@ import json
 file_path = os.path.dirname(os.path.abspath(__file__))
 
 from ska_tango_base import SKACapability
+from ska_mid_cbf_mcs.commons.delay_model_codec import split_staged_rows
+from ska_mid_cbf_mcs.commons.delay_model_history import DelayModelHistory, export_path
+from ska_mid_cbf_mcs.commons.epoch_buffer import EpochBufferedArray
+from ska_mid_cbf_mcs.commons.model_ingest import split_epoch
 # PROTECTED REGION END #    //  Fsp.additionnal_import
 
 __all__ = ["Fsp", "main"]
@@ -106,6 +110,19 @@ class Fsp(SKACapability):
         dtype=('str',)
     )
 
+    DelayModelHistoryLength = device_property(
+        dtype='DevULong',
+        doc="Number of delay model entries (one per receptor) kept in the delay "
+            "model history",
+        default_value=4096
+    )
+
+    DelayModelHistoryExportDir = device_property(
+        dtype='str',
+        doc="Directory to which ExportDelayModelHistory writes its files",
+        default_value="/tmp"
+    )
+
     # ----------
     # Attributes
     # ----------
@@ -165,6 +182,34 @@ class Fsp(SKACapability):
         label='Timing Beam Weights',
         doc='Amplitude weights used in the tied-array beamforming'
     )
+
+    activeModelEpochs = attribute(
+        dtype=('double',),
+        max_dim_x=3,
+        access=AttrWriteType.READ,
+        label="Active model epochs",
+        doc="Epoch of the active Jones matrix, delay model and timing beam weights "
+            "(0 if not activated at an epoch)",
+    )
+
+    pendingModelEpochs = attribute(
+        dtype=('double',),
+        max_dim_x=3,
+        access=AttrWriteType.READ,
+        label="Pending model epochs",
+        doc="Epoch of the next staged Jones matrix, delay model and timing beam "
+            "weights (0 if none)",
+    )
+
+    modelSwapJitter = attribute(
+        dtype=('double',),
+        max_dim_x=3,
+        access=AttrWriteType.READ,
+        unit="s",
+        label="Model swap jitter",
+        doc="Activation time minus epoch of the last staged Jones matrix, delay "
+            "model and timing beam weights",
+    )
    
     # ---------------
     # General methods
@@ -187,9 +232,22 @@ class Fsp(SKACapability):
         self._subarray_membership = []
         self._scan_id = 0
         self._config_id = ""
-        self._jones_matrix = [[0.0] * 4 for _ in range(4)]
-        self._delay_model = [[0.0] * 6 for _ in range(4)]
-        self._timing_beam_weights = [[0.0] * 6 for _ in range(4)]
+        # double-buffered: updates are either applied in place, or staged and
+        # swapped in at their epoch
+        for table in [getattr(self, "_jones_matrix", None),
+                      getattr(self, "_delay_model", None),
+                      getattr(self, "_timing_beam_weights", None)]:
+            if table is not None:
+                table.stop()
+        self._jones_matrix = EpochBufferedArray(
+            (4, 4), name="jones_matrix", logger=self.logger)
+        # every delay model entry activated, for QueryDelayModel
+        self._delay_model_history = DelayModelHistory(self.DelayModelHistoryLength)
+        self._delay_model = EpochBufferedArray(
+            (4, 6), name="delay_model", on_activate=self._record_delay_model,
+            logger=self.logger)
+        self._timing_beam_weights = EpochBufferedArray(
+            (4, 6), name="timing_beam_weights", logger=self.logger)
 
         # initialize FSP subarray group
         self._group_fsp_corr_subarray = tango.Group("FSP Subarray Corr")
@@ -216,6 +274,8 @@ class Fsp(SKACapability):
     def delete_device(self):
         # PROTECTED REGION ID(Fsp.delete_device) ENABLED START #
         """Hook to delete device. Turn corr, pss, pst, vlbi, corr and pss subarray OFF. Remove membership; """
+        for table in [self._jones_matrix, self._delay_model, self._timing_beam_weights]:
+            table.stop()
         self._proxy_correlation.SetState(tango.DevState.OFF)
         self._proxy_pss.SetState(tango.DevState.OFF)
         self._proxy_pst.SetState(tango.DevState.OFF)
@@ -268,21 +328,71 @@ class Fsp(SKACapability):
     def read_jonesMatrix(self):
         # PROTECTED REGION ID(Fsp.jonesMatrix_read) ENABLED START #
         """Return the jonesMatrix attribute."""
-        return self._jones_matrix
+        return self._jones_matrix.active
         # PROTECTED REGION END #    //  Fsp.jonesMatrix_read
 
     def read_delayModel(self):
         # PROTECTED REGION ID(Fsp.delayModel_read) ENABLED START #
         """Return the delayModel attribute."""
-        return self._delay_model
+        return self._delay_model.active
         # PROTECTED REGION END #    //  Fsp.delayModel_read
     
     def read_timingBeamWeights(self):
         # PROTECTED REGION ID(Fsp.timingBeamWeights_read) ENABLED START #
         """Return the timingBeamWeights attribute."""
-        return self._timing_beam_weights
+        return self._timing_beam_weights.active
         # PROTECTED REGION END #    //  Fsp.timingBeamWeights_read
 
+    def _model_tables(self):
+        return [self._jones_matrix, self._delay_model, self._timing_beam_weights]
+
+    def read_activeModelEpochs(self):
+        # PROTECTED REGION ID(Fsp.activeModelEpochs_read) ENABLED START #
+        """Return the activeModelEpochs attribute."""
+        return [table.active_epoch for table in self._model_tables()]
+        # PROTECTED REGION END #    //  Fsp.activeModelEpochs_read
+
+    def read_pendingModelEpochs(self):
+        # PROTECTED REGION ID(Fsp.pendingModelEpochs_read) ENABLED START #
+        """Return the pendingModelEpochs attribute."""
+        return [table.pending_epoch for table in self._model_tables()]
+        # PROTECTED REGION END #    //  Fsp.pendingModelEpochs_read
+
+    def read_modelSwapJitter(self):
+        # PROTECTED REGION ID(Fsp.modelSwapJitter_read) ENABLED START #
+        """Return the modelSwapJitter attribute."""
+        return [table.last_jitter for table in self._model_tables()]
+        # PROTECTED REGION END #    //  Fsp.modelSwapJitter_read
+
+    def _record_delay_model(self, epoch, indices, values):
+        """Record activated delay model rows (index receptor - 1) in the history"""
+        self._delay_model_history.record(
+            epoch, [index + 1 for index in indices], self._fsp_id, values)
+
+    def _store_model_update(self, table, epoch, rows):
+        """
+        Apply the rows of a model update now, or stage them until the epoch.
+
+        :param rows: dict of row index:values
+        :raise tango.DevFailed: if the rows do not fit the table
+        """
+        if not rows:
+            return
+        indices = list(rows)
+        values = [rows[index] for index in indices]
+        try:
+            if epoch is None:
+                table.apply(indices, values)
+            else:
+                table.stage(epoch, indices, values)
+        except ValueError as e:
+            # e.g. a receptor ID beyond the rows of the table
+            msg = "Model update rejected: {}".format(e)
+            self.logger.error(msg)
+            tango.Except.throw_exception("Command failed", msg,
+                                         "Model update execution",
+                                         tango.ErrSeverity.ERR)
+
     # --------
     # Commands
     # --------
@@ -452,14 +562,17 @@ class Fsp(SKACapability):
 
     @command(
         dtype_in='str',
-        doc_in="Jones Matrix, given per frequency slice"
+        doc_in="Jones Matrix, given per frequency slice; either the matrix details, "
+               "applied now, or {\"epoch\": ..., \"matrixDetails\": ...}, staged "
+               "until the epoch"
     )
     def UpdateJonesMatrix(self, argin):
         # PROTECTED REGION ID(Fsp.UpdateJonesMatrix) ENABLED START #
         self.logger.debug("Fsp.UpdateJonesMatrix")
         """update FSP's Jones matrix (serialized JSON object)"""
         if self._function_mode in [2, 3]:
-            argin = json.loads(argin)
+            epoch, argin = split_epoch(json.loads(argin), "matrixDetails")
+            rows = {}
 
             for i in self._subarray_membership:
                 if self._function_mode == 2:
@@ -474,7 +587,7 @@ class Fsp(SKACapability):
                             matrix = frequency_slice["matrix"]
                             if fs_id == self._fsp_id:
                                 if len(matrix) == 4:
-                                    self._jones_matrix[rec_id - 1] = matrix.copy()
+                                    rows[rec_id - 1] = matrix
                                 else:
                                     log_msg = "'matrix' not valid length for frequency slice {} of " \
                                             "receptor {}".format(fs_id, rec_id)
@@ -484,6 +597,7 @@ class Fsp(SKACapability):
                                     fs_id, rec_id
                                 )
                                 self.logger.error(log_msg)
+            self._store_model_update(self._jones_matrix, epoch, rows)
         else:
             log_msg = "matrix not usable in function mode {}".format(self._function_mode)
             self.logger.error(log_msg)
@@ -498,7 +612,9 @@ class Fsp(SKACapability):
 
     @command(
         dtype_in='str',
-        doc_in="Delay Model, per receptor per polarization per timing beam"
+        doc_in="Delay Model, per receptor per polarization per timing beam; either "
+               "the delay details, applied now, or {\"epoch\": ..., \"delayDetails\": ...}, "
+               "staged until the epoch"
     )
     def UpdateDelayModel(self, argin):
         # PROTECTED REGION ID(Fsp.UpdateDelayModel) ENABLED START #
@@ -507,7 +623,8 @@ class Fsp(SKACapability):
 
         # update if current function mode is either PSS-BF or PST-BF
         if self._function_mode in [2, 3]:
-            argin = json.loads(argin)
+            epoch, argin = split_epoch(json.loads(argin), "delayDetails")
+            rows = {}
             for i in self._subarray_membership:
                 if self._function_mode == 2:
                     proxy = self._proxy_fsp_pss_subarray[i - 1]
@@ -521,7 +638,7 @@ class Fsp(SKACapability):
                             model = frequency_slice["delayCoeff"]
                             if fs_id == self._fsp_id:
                                 if len(model) == 6:
-                                    self._delay_model[rec_id - 1] = model.copy()
+                                    rows[rec_id - 1] = model
                                 else:
                                     log_msg = "'model' not valid length for frequency slice {} of " \
                                             "receptor {}".format(fs_id, rec_id)
@@ -531,11 +648,48 @@ class Fsp(SKACapability):
                                     fs_id, rec_id
                                 )
                                 self.logger.error(log_msg)
+            self._store_model_update(self._delay_model, epoch, rows)
         else:
             log_msg = "model not usable in function mode {}".format(self._function_mode)
             self.logger.error(log_msg)
         # PROTECTED REGION END #    // Fsp.UpdateDelayModel
 
+    def is_UpdateDelayModelBinary_allowed(self):
+        return self.is_UpdateDelayModel_allowed()
+
+    @command(
+        dtype_in=('double',),
+        doc_in="Delay Model, as rows of [receptor, fsid, 6 coefficients], "
+               "optionally preceded by the epoch to stage them until "
+               "(see delay_model_codec)"
+    )
+    def UpdateDelayModelBinary(self, argin):
+        # PROTECTED REGION ID(Fsp.UpdateDelayModelBinary) ENABLED START #
+        self.logger.debug("Fsp.UpdateDelayModelBinary")
+        """update FSP's delay model (array of doubles, no JSON)"""
+
+        # update if current function mode is either PSS-BF or PST-BF
+        if self._function_mode in [2, 3]:
+            epoch, rows = split_staged_rows(argin)
+            # only the frequency slice processed by this FSP is used
+            rows = rows[rows[:, 1] == self._fsp_id]
+            models = {}
+            for i in self._subarray_membership:
+                if self._function_mode == 2:
+                    proxy = self._proxy_fsp_pss_subarray[i - 1]
+                else:
+                    proxy = self._proxy_fsp_pst_subarray[i - 1]
+                receptors = proxy.receptors
+                for row in rows:
+                    rec_id = int(row[0])
+                    if rec_id in receptors:
+                        models[rec_id - 1] = row[2:]
+            self._store_model_update(self._delay_model, epoch, models)
+        else:
+            log_msg = "model not usable in function mode {}".format(self._function_mode)
+            self.logger.error(log_msg)
+        # PROTECTED REGION END #    // Fsp.UpdateDelayModelBinary
+
     def is_UpdateTimingBeamWeights_allowed(self):
         """allowed when Devstate is ON and ObsState is READY OR SCANNINNG"""
         #TODO implement obsstate in FSP
@@ -545,7 +699,9 @@ class Fsp(SKACapability):
 
     @command(
         dtype_in='str',
-        doc_in="Timing Beam Weights, per beam per receptor per group of 8 channels"
+        doc_in="Timing Beam Weights, per beam per receptor per group of 8 channels; "
+               "either the weights details, applied now, or {\"epoch\": ..., "
+               "\"beamWeightsDetails\": ...}, staged until the epoch"
     )
     def UpdateBeamWeights(self, argin):
         # PROTECTED REGION ID(Fsp.UpdateTimingBeamWeights) ENABLED START #
@@ -554,7 +710,8 @@ class Fsp(SKACapability):
 
         # update if current function mode is PST-BF
         if self._function_mode == 3:
-            argin = json.loads(argin)
+            epoch, argin = split_epoch(json.loads(argin), "beamWeightsDetails")
+            rows = {}
             for i in self._subarray_membership:
                 proxy = self._proxy_fsp_pst_subarray[i - 1]
                 for receptor in argin:
@@ -565,7 +722,7 @@ class Fsp(SKACapability):
                             weights = frequency_slice["weights"]
                             if fs_id == self._fsp_id:
                                 if len(weights) == 6:
-                                    self._timing_beam_weights[rec_id - 1] = weights.copy()
+                                    rows[rec_id - 1] = weights
                                 else:
                                     log_msg = "'weights' not valid length for frequency slice {} of " \
                                             "receptor {}".format(fs_id, rec_id)
@@ -575,11 +732,44 @@ class Fsp(SKACapability):
                                     fs_id, rec_id
                                 )
                                 self.logger.error(log_msg)
+            self._store_model_update(self._timing_beam_weights, epoch, rows)
         else:
             log_msg = "weights not usable in function mode {}".format(self._function_mode)
             self.logger.error(log_msg)
         # PROTECTED REGION END #    // Fsp.UpdateTimingBeamWeights
 
+    @command(
+        dtype_in='DevDouble',
+        doc_in="Timestamp, in seconds since the Unix epoch",
+        dtype_out=('double',),
+        doc_out="Delay model entries active at the timestamp, as rows of [epoch, receptor, fsid, 6 coefficients]"
+    )
+    def QueryDelayModel(self, argin):
+        # PROTECTED REGION ID(Fsp.QueryDelayModel) ENABLED START #
+        """Return the delay model active at a given time, from the delay model history"""
+        return self._delay_model_history.query_rows(argin)
+        # PROTECTED REGION END #    // Fsp.QueryDelayModel
+
+    @command(
+        dtype_in='str',
+        doc_in="Name of the .npy file to write, in DelayModelHistoryExportDir",
+        dtype_out='DevULong',
+        doc_out="Number of entries written"
+    )
+    def ExportDelayModelHistory(self, argin):
+        # PROTECTED REGION ID(Fsp.ExportDelayModelHistory) ENABLED START #
+        """Write the delay model history to a binary file (see delay_model_history)"""
+        try:
+            path = export_path(self.DelayModelHistoryExportDir, argin)
+            return self._delay_model_history.export(path)
+        except (ValueError, OSError) as e:
+            msg = "Delay model history could not be written to {}: {}".format(argin, e)
+            self.logger.error(msg)
+            tango.Except.throw_exception("Command failed", msg,
+                                         "ExportDelayModelHistory execution",
+                                         tango.ErrSeverity.ERR)
+        # PROTECTED REGION END #    // Fsp.ExportDelayModelHistory
+
 # ----------
 # Run server
 # ----------
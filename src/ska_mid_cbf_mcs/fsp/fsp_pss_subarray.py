@@ -37,6 +37,7 @@ from random import randint
 from ska_tango_base.control_model import HealthState, AdminMode, ObsState
 from ska_tango_base import CspSubElementObsDevice
 from ska_tango_base.commands import ResultCode
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import ControllerReplicas
 
 # PROTECTED REGION END #    //  FspPssSubarray.additionnal_import
 
@@ -179,6 +180,14 @@ class FspPssSubarray(CspSubElementObsDevice):
             device._fqdn_vcc = list(device.VCC)[:device._count_vcc]
             device._proxies_vcc = [*map(tango.DeviceProxy, device._fqdn_vcc)]
 
+            # local replicas of the controller receptor to VCC map and VCC
+            # subarray memberships, kept up to date by change events
+            device._controller_replicas = ControllerReplicas(
+                device._proxy_cbf_controller, device._proxies_vcc, logger=device.logger)
+            device._receptor_to_vcc = device._controller_replicas.receptor_to_vcc
+            device._vcc_membership = device._controller_replicas.vcc_membership
+            device._controller_replicas.subscribe()
+
             message = "FspPssSubarry Init command completed OK"
             self.logger.info(message)
             return (ResultCode.OK, message)
@@ -194,7 +203,8 @@ class FspPssSubarray(CspSubElementObsDevice):
     def delete_device(self):
         # PROTECTED REGION ID(FspPssSubarray.delete_device) ENABLED START #
         """Set Idle, remove all receptors, turn device OFF"""
-        pass
+        if hasattr(self, "_controller_replicas"):
+            self._controller_replicas.unsubscribe()
         # PROTECTED REGION END #    //  FspPssSubarray.delete_device
 
     # ------------------
@@ -239,12 +249,10 @@ class FspPssSubarray(CspSubElementObsDevice):
         """add specified receptors to the FSP subarray. Input is array of int."""
         self.logger.debug("_AddReceptors")
         errs = []  # list of error messages
-        receptor_to_vcc = dict([*map(int, pair.split(":"))] for pair in
-                               self._proxy_cbf_controller.receptorToVcc)
         for receptorID in receptorIDs:
             try:
-                vccID = receptor_to_vcc[receptorID]
-                subarrayID = self._proxies_vcc[vccID - 1].subarrayMembership
+                vccID = self._receptor_to_vcc.vcc_id(receptorID)
+                subarrayID = self._vcc_membership.subarray_id(vccID, self._subarray_id)
 
                 # only add receptor if it belongs to the CBF subarray
                 if subarrayID != self._subarray_id:
@@ -31,6 +31,7 @@ file_path = os.path.dirname(os.path.abspath(__file__))
 
 from ska_tango_base.control_model import HealthState, AdminMode, ObsState
 from ska_tango_base import SKASubarray
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import ControllerReplicas
 # PROTECTED REGION END #    //  FspPstSubarray.additionnal_import
 
 __all__ = ["FspPstSubarray", "main"]
@@ -134,6 +135,14 @@ class FspPstSubarray(SKASubarray):
         self._fqdn_vcc = list(self.VCC)[:self._count_vcc]
         self._proxies_vcc = [*map(tango.DeviceProxy, self._fqdn_vcc)]
 
+        # local replicas of the controller receptor to VCC map and VCC
+        # subarray memberships, kept up to date by change events
+        self._controller_replicas = ControllerReplicas(
+            self._proxy_cbf_controller, self._proxies_vcc, logger=self.logger)
+        self._receptor_to_vcc = self._controller_replicas.receptor_to_vcc
+        self._vcc_membership = self._controller_replicas.vcc_membership
+        self._controller_replicas.subscribe()
+
         # device proxy for easy reference to CBF Subarray
         self._proxy_cbf_subarray = tango.DeviceProxy(self.CbfSubarrayAddress)
 
@@ -149,6 +158,8 @@ class FspPstSubarray(SKASubarray):
     def delete_device(self):
         # PROTECTED REGION ID(FspPstSubarray.delete_device) ENABLED START #
         """Set Idle, remove all receptors, turn device OFF"""
+        if hasattr(self, "_controller_replicas"):
+            self._controller_replicas.unsubscribe()
         self.GoToIdle()
         self.RemoveAllReceptors()
         self.Off()
@@ -213,12 +224,10 @@ class FspPstSubarray(SKASubarray):
         # PROTECTED REGION ID(FspPstSubarray.AddReceptors) ENABLED START #
         """add specified receptors to the FSP subarray. Input is array of int."""
         errs = []  # list of error messages
-        receptor_to_vcc = dict([*map(int, pair.split(":"))] for pair in
-                               self._proxy_cbf_controller.receptorToVcc)
         for receptorID in argin:
             try:
-                vccID = receptor_to_vcc[receptorID]
-                subarrayID = self._proxies_vcc[vccID - 1].subarrayMembership
+                vccID = self._receptor_to_vcc.vcc_id(receptorID)
+                subarrayID = self._vcc_membership.subarray_id(vccID, self._subarray_id)
 
                 # only add receptor if it belongs to the CBF subarray
                 if subarrayID != self._subarray_id:
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the CbfSubarray project
+#
+#
+#
+# Distributed under the terms of the GPL license.
+# See LICENSE.txt for more info.
+
+"""
+Parsed scan configuration of a CbfSubarray.
+
+The ConfigureScan argin is parsed exactly once into a ScanConfiguration.
+The VCC-FSP common parameters and the defaults (band5Tuning, frequency band
+offsets, receptors) are folded into the search window and FSP entries at
+construction, and every payload sent downstream is serialized at most once.
+"""
+
+import json
+from types import MappingProxyType
+
+__all__ = ["ScanConfiguration"]
+
+
+class ScanConfiguration:
+    """
+    Immutable view of a scan configuration.
+
+    The sections, search windows and FSPs are exposed as read-only mappings;
+    the payloads for the VCCs and FSP Subarrays are serialized on first use
+    and cached.
+
+    :param argin: the scan configuration, as a JSON string
+    :param receptors: receptors assigned to the subarray, used for the FSPs
+        and beams that do not specify their own
+    :raise ValueError: if argin is not a valid JSON object or a required
+        section is missing
+    """
+
+    def __init__(self, argin, receptors=()):
+        try:
+            full_configuration = json.loads(argin)
+            common = full_configuration["common"]
+            cbf = full_configuration["cbf"]
+            fsps = cbf["fsp"]
+            common["config_id"], common["frequency_band"]  # required keys
+        except json.JSONDecodeError:  # argument not a valid JSON object
+            raise ValueError("Scan configuration object is not a valid JSON object.")
+        except (KeyError, TypeError) as e:
+            raise ValueError(
+                "Scan configuration is missing required key {}.".format(str(e)))
+
+        receptors = list(receptors)
+
+        # shallow copies only: the nested values are never modified
+        self._common = dict(common)
+        # set band5Tuning to [0,0] if not specified
+        self._common.setdefault("band_5_tuning", [0, 0])
+
+        self._cbf = dict(cbf)
+        self._cbf["frequency_band_offset_stream_1"] = \
+            int(cbf.get("frequency_band_offset_stream_1", 0))
+        self._cbf["frequency_band_offset_stream_2"] = \
+            int(cbf.get("frequency_band_offset_stream_2", 0))
+
+        # VCC-FSP common parameters, added to every search window and FSP
+        band_params = {
+            "frequency_band": self._common["frequency_band"],
+            "frequency_band_offset_stream_1": self._cbf["frequency_band_offset_stream_1"],
+            "frequency_band_offset_stream_2": self._cbf["frequency_band_offset_stream_2"],
+        }
+
+        if "search_window" in cbf:
+            search_windows = []
+            for search_window in cbf["search_window"]:
+                search_window = dict(search_window, **band_params)
+                if search_window["frequency_band"] in ["5a", "5b"]:
+                    search_window["band_5_tuning"] = self._common["band_5_tuning"]
+                search_windows.append(search_window)
+            self._cbf["search_window"] = search_windows
+
+        self._cbf["fsp"] = [
+            self._build_fsp(fsp, band_params, receptors) for fsp in fsps
+        ]
+
+        self._payloads = {}
+
+    def _build_fsp(self, fsp, band_params, receptors):
+        # configID and band5Tuning are not included in the "FSP" portion of the JSON
+        fsp = dict(
+            fsp,
+            config_id=self._common["config_id"],
+            band_5_tuning=self._common["band_5_tuning"],
+            **band_params
+        )
+        if not receptors:
+            return fsp
+
+        # In these cases by the ICD, all subarray allocated resources should be used.
+        if fsp["function_mode"] == "CORR":
+            if "receptor_ids" not in fsp:
+                # TODO add support for more than one receptor per fsp
+                fsp["receptor_ids"] = [receptors[0]]
+        elif fsp["function_mode"] == "PSS-BF":
+            fsp["search_beam"] = [
+                beam if "receptor_ids" in beam else dict(beam, receptor_ids=receptors)
+                for beam in fsp.get("search_beam", [])
+            ]
+        elif fsp["function_mode"] == "PST-BF":
+            fsp["timing_beam"] = [
+                beam if "receptor_ids" in beam else dict(beam, receptor_ids=receptors)
+                for beam in fsp.get("timing_beam", [])
+            ]
+        return fsp
+
+    def _payload(self, key, value, serialize=json.dumps):
+        # serialize on first use; concurrent first uses produce the same string
+        try:
+            return self._payloads[key]
+        except KeyError:
+            return self._payloads.setdefault(key, serialize(value))
+
+    @property
+    def common(self):
+        """The "common" section, with defaults applied."""
+        return MappingProxyType(self._common)
+
+    @property
+    def cbf(self):
+        """The "cbf" section, with defaults and common parameters applied."""
+        return MappingProxyType(self._cbf)
+
+    @property
+    def config_id(self):
+        return self._common["config_id"]
+
+    @property
+    def frequency_band(self):
+        return self._common["frequency_band"]
+
+    @property
+    def band_5_tuning(self):
+        return self._common["band_5_tuning"]
+
+    @property
+    def frequency_band_offset_stream_1(self):
+        return self._cbf["frequency_band_offset_stream_1"]
+
+    @property
+    def frequency_band_offset_stream_2(self):
+        return self._cbf["frequency_band_offset_stream_2"]
+
+    @property
+    def search_windows(self):
+        """The search windows, empty if none were given."""
+        return tuple(map(MappingProxyType, self._cbf.get("search_window", [])))
+
+    @property
+    def fsp(self):
+        """The FSP configurations, in the order they were given."""
+        return tuple(map(MappingProxyType, self._cbf["fsp"]))
+
+    @property
+    def vcc_payload(self):
+        """Argument of Vcc.ConfigureScan."""
+        return self._payload("vcc", {
+            "config_id": self.config_id,
+            "frequency_band": self.frequency_band
+        })
+
+    @property
+    def rfi_flagging_mask_payload(self):
+        """Value of Vcc.rfiFlaggingMask, or None if no mask was given."""
+        if "rfi_flagging_mask" not in self._cbf:
+            return None
+        return self._payload("rfi_flagging_mask", self._cbf["rfi_flagging_mask"])
+
+    @property
+    def search_window_payloads(self):
+        """Arguments of Vcc.ValidateSearchWindow/ConfigureSearchWindow."""
+        return tuple(
+            self._payload(("search_window", i), search_window)
+            for i, search_window in enumerate(self._cbf.get("search_window", []))
+        )
+
+    def fsp_payload(self, index):
+        """
+        Argument of the FSP Subarray ConfigureScan.
+
+        :param index: position of the FSP in the configuration
+        """
+        return self._payload(("fsp", index), self._cbf["fsp"][index])
+
+    def __str__(self):
+        return self._payload("str", self._cbf, str)
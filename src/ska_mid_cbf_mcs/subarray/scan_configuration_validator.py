@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the CbfSubarray project
+#
+#
+#
+# Distributed under the terms of the GPL license.
+# See LICENSE.txt for more info.
+
+"""
+Static validation of CbfSubarray scan configurations.
+
+The rules that only depend on the configuration itself are declared as a
+JSON schema, built from the subarray capabilities and compiled once when the
+device is initialized. The few cross-field rules that a schema cannot express
+(receptor membership, zoom window tuning, channel averaging map layout) are
+checked by the validator in the same pass, so that every violation is
+reported at once.
+"""
+
+from collections.abc import Mapping
+
+import jsonschema
+
+from ska_mid_cbf_mcs.commons.global_enum import const, freq_band_dict
+
+__all__ = ["ScanConfigurationValidator", "FUNCTION_MODES"]
+
+# indexed by functionMode - 1
+FUNCTION_MODES = ["CORR", "PSS-BF", "PST-BF", "VLBI"]
+
+# number of frequency slices of each frequency band
+# See for ex. Fig 8-2 in the Mid.CBF DDD
+NUM_FREQUENCY_SLICES = dict(zip(freq_band_dict().keys(), [4, 5, 7, 12, 26, 26]))
+
+AVERAGING_FACTORS = [0, 1, 2, 3, 4, 6, 8]
+
+MAX_SEARCH_WINDOWS = 2
+MAX_SEARCH_BEAMS = 192
+MAX_TIMING_BEAMS = 16
+
+# start of each (non band 5) frequency band, in Hz
+_FREQUENCY_BAND_START = dict(zip(["1", "2", "3", "4"], [
+    band_range[0] * 10 ** 9 for band_range in [
+        const.FREQUENCY_BAND_1_RANGE,
+        const.FREQUENCY_BAND_2_RANGE,
+        const.FREQUENCY_BAND_3_RANGE,
+        const.FREQUENCY_BAND_4_RANGE
+    ]
+]))
+
+# the configuration is exposed through read-only mappings
+_type_checker = jsonschema.Draft7Validator.TYPE_CHECKER.redefine(
+    "object", lambda checker, instance: isinstance(instance, Mapping)
+)
+_Validator = jsonschema.validators.extend(
+    jsonschema.Draft7Validator, type_checker=_type_checker
+)
+
+
+def _band_5_tuning_schema(band, bounds):
+    # band5Tuning is optional; [0,0] when not specified
+    return {
+        "if": {"properties": {"frequency_band": {"const": band}}},
+        "then": {"properties": {"band_5_tuning": {
+            "anyOf": [
+                {"const": [0, 0]},
+                {"items": {"minimum": bounds[0], "maximum": bounds[1]}}
+            ],
+            "message": "Elements in 'band5Tuning' must be floats between {} and {} "
+                       "for a 'frequencyBand' of {}.".format(bounds[0], bounds[1], band)
+        }}}
+    }
+
+
+def _frequency_slice_schema(band, num_slices):
+    return {
+        "if": {"properties": {"frequency_band": {"const": band}}},
+        "then": {"properties": {"frequency_slice_id": {
+            "maximum": num_slices,
+            "message": "'frequencySliceID' must be an integer in the range [1, {}] "
+                       "for a 'frequencyBand' of {}.".format(num_slices, band)
+        }}}
+    }
+
+
+def build_schema(count_fsp, min_int_time=const.MIN_INT_TIME):
+    """
+    Build the JSON schema of a scan configuration, as exposed by
+    ScanConfiguration (i.e. with the defaults and the VCC-FSP common
+    parameters already applied).
+
+    Subschemas may carry a "message" that replaces the generic message of the
+    errors they raise.
+
+    :param count_fsp: number of FSPs available to the subarray
+    :param min_int_time: minimum integration factor
+    """
+    max_offset = const.FREQUENCY_SLICE_BW * 10 ** 6 / 2
+    receptor_ids = {"type": "array", "items": {"type": "integer"}}
+    ip_address = {"type": "string", "format": "ipv4"}
+
+    corr = {
+        "required": [
+            "frequency_slice_id", "zoom_factor", "integration_factor",
+            "channel_offset", "output_link_map"
+        ],
+        "properties": {
+            "receptor_ids": receptor_ids,
+            "frequency_slice_id": {"type": "integer", "minimum": 1},
+            "zoom_factor": {
+                "type": "integer", "minimum": 0, "maximum": 6,
+                "message": "'zoom_factor' must be an integer in the range [0, 6]."
+            },
+            "integration_factor": {
+                "type": "integer",
+                "minimum": min_int_time,
+                "maximum": 10 * min_int_time,
+                "multipleOf": min_int_time,
+                "message": "'integrationTime' must be an integer in the range [1, 10] "
+                           "multiplied by {}.".format(min_int_time)
+            },
+            "channel_offset": {
+                "type": "integer", "minimum": 0,
+                "message": "fspChannelOffset must be an integer greater than or equal to zero"
+            },
+            "output_link_map": {
+                "type": "array",
+                "items": {
+                    "type": "array", "minItems": 2,
+                    "items": [{"type": "integer"}, {"type": "integer"}]
+                },
+                "message": "'outputLinkMap' format not correct."
+            },
+            "channel_averaging_map": {
+                "type": "array",
+                "items": {
+                    "type": "array", "minItems": 2, "maxItems": 2,
+                    "items": [{"type": "integer"}, {"enum": AVERAGING_FACTORS}]
+                },
+                "message": "'channelAveragingMap' entries must be pairs of a channel ID "
+                           "and an averaging factor in {}.".format(AVERAGING_FACTORS)
+            }
+        },
+        "allOf": [
+            {
+                # zoomWindowTuning is required
+                "if": {"properties": {"zoom_factor": {"exclusiveMinimum": 0}}},
+                "then": {
+                    "required": ["zoom_window_tuning"],
+                    "message": "FSP specified, but 'zoomWindowTuning' not given."
+                }
+            }
+        ] + [
+            _frequency_slice_schema(band, num_slices)
+            for band, num_slices in NUM_FREQUENCY_SLICES.items()
+        ]
+    }
+
+    pss = {
+        "required": ["search_window_id", "search_beam"],
+        "properties": {
+            "search_window_id": {
+                "enum": list(range(1, MAX_SEARCH_WINDOWS + 1)),
+                "message": "'searchWindowID' must be one of [1, 2]."
+            },
+            "search_beam": {
+                "type": "array",
+                "maxItems": MAX_SEARCH_BEAMS,
+                "items": {
+                    "type": "object",
+                    "required": [
+                        "search_beam_id", "enable_output", "averaging_interval",
+                        "search_beam_destination_address"
+                    ],
+                    "properties": {
+                        "search_beam_id": {
+                            "type": "integer", "minimum": 1, "maximum": 1500,
+                            "message": "'searchBeamID' must be within range 1-1500."
+                        },
+                        "receptor_ids": receptor_ids,
+                        "enable_output": {
+                            "type": "boolean",
+                            "message": "'outputEnabled' is not a valid boolean"
+                        },
+                        "averaging_interval": {
+                            "type": "integer",
+                            "message": "'averagingInterval' is not a valid integer"
+                        },
+                        "search_beam_destination_address": dict(
+                            ip_address,
+                            message="'searchBeamDestinationAddress' is not a valid IP address"
+                        )
+                    }
+                },
+                "message": "More than {} SearchBeams defined in PSS-BF config".format(
+                    MAX_SEARCH_BEAMS)
+            }
+        }
+    }
+
+    pst = {
+        "required": ["timing_beam"],
+        "properties": {
+            "timing_beam": {
+                "type": "array",
+                "maxItems": MAX_TIMING_BEAMS,
+                "items": {
+                    "type": "object",
+                    "required": [
+                        "timing_beam_id", "enable_output",
+                        "timing_beam_destination_address"
+                    ],
+                    "properties": {
+                        "timing_beam_id": {
+                            "type": "integer", "minimum": 1, "maximum": MAX_TIMING_BEAMS,
+                            "message": "'timingBeamID' must be within range 1-16."
+                        },
+                        "receptor_ids": receptor_ids,
+                        "enable_output": {
+                            "type": "boolean",
+                            "message": "'outputEnabled' is not a valid boolean"
+                        },
+                        "timing_beam_destination_address": dict(
+                            ip_address,
+                            message="'timingBeamDestinationAddress' is not a valid IP address"
+                        )
+                    }
+                },
+                "message": "More than {} TimingBeams defined in PST-BF config".format(
+                    MAX_TIMING_BEAMS)
+            }
+        }
+    }
+
+    fsp = {
+        "type": "object",
+        "required": ["fsp_id", "function_mode"],
+        "properties": {
+            "fsp_id": {
+                "type": "integer", "minimum": 1, "maximum": count_fsp,
+                "message": "'fspID' must be an integer in the range [1, {}].".format(count_fsp)
+            },
+            "function_mode": {
+                "enum": FUNCTION_MODES,
+                "message": "'functionMode' must be one of {}.".format(FUNCTION_MODES)
+            }
+        },
+        "allOf": [
+            {
+                "if": {"properties": {"function_mode": {"const": mode}}},
+                "then": schema
+            }
+            for mode, schema in [("CORR", corr), ("PSS-BF", pss), ("PST-BF", pst)]
+        ]
+    }
+
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "required": ["common", "cbf"],
+        "properties": {
+            "common": {
+                "type": "object",
+                "required": ["config_id", "frequency_band"],
+                "properties": {
+                    "frequency_band": {"enum": list(freq_band_dict().keys())},
+                    "band_5_tuning": {
+                        "type": "array",
+                        "minItems": 2,
+                        "maxItems": 2,
+                        "items": {"type": "number"},
+                        "message": "'band5Tuning' must be an array of length 2."
+                    }
+                },
+                "allOf": [
+                    _band_5_tuning_schema("5a", const.FREQUENCY_BAND_5a_TUNING_BOUNDS),
+                    _band_5_tuning_schema("5b", const.FREQUENCY_BAND_5b_TUNING_BOUNDS)
+                ]
+            },
+            "cbf": {
+                "type": "object",
+                "required": ["fsp"],
+                "properties": {
+                    "frequency_band_offset_stream_1": {
+                        "type": "integer", "minimum": -max_offset, "maximum": max_offset,
+                        "message": "Absolute value of 'frequencyBandOffsetStream1' must be "
+                                   "at most half of the frequency slice bandwidth."
+                    },
+                    "frequency_band_offset_stream_2": {
+                        "type": "integer", "minimum": -max_offset, "maximum": max_offset,
+                        "message": "Absolute value of 'frequencyBandOffsetStream2' must be "
+                                   "at most half of the frequency slice bandwidth."
+                    },
+                    "search_window": {
+                        "type": "array",
+                        "maxItems": MAX_SEARCH_WINDOWS,
+                        "message": "'searchWindow' must be an array of maximum length 2."
+                    },
+                    "fsp": {"type": "array", "items": fsp}
+                }
+            }
+        }
+    }
+
+
+class ScanConfigurationValidator:
+    """
+    Validator of scan configurations, compiled once per subarray.
+
+    :param count_fsp: number of FSPs available to the subarray
+    :param min_int_time: minimum integration factor
+    :param num_fine_channels: number of fine channels of an FSP
+    :param num_channel_groups: number of channel groups of an FSP
+    """
+
+    def __init__(
+        self,
+        count_fsp,
+        min_int_time=const.MIN_INT_TIME,
+        num_fine_channels=const.NUM_FINE_CHANNELS,
+        num_channel_groups=const.NUM_CHANNEL_GROUPS
+    ):
+        schema = build_schema(count_fsp, min_int_time)
+        _Validator.check_schema(schema)
+        self._validator = _Validator(schema, format_checker=jsonschema.FormatChecker())
+        self._channels_per_group = num_fine_channels // num_channel_groups
+
+    def validate(self, scan_config, receptors):
+        """
+        Validate a scan configuration.
+
+        :param scan_config: the ScanConfiguration to validate
+        :param receptors: receptors assigned to the subarray
+        :return: list of messages, one per violation; empty if valid
+        """
+        errors = [
+            self._format_error(error) for error in sorted(
+                self._validator.iter_errors(
+                    {"common": scan_config.common, "cbf": scan_config.cbf}),
+                key=lambda error: list(map(str, error.absolute_path))
+            )
+        ]
+        if errors:
+            # the cross-field rules below rely on the types checked by the schema
+            return errors
+
+        for i, fsp in enumerate(scan_config.fsp):
+            path = "cbf.fsp[{}]".format(i)
+            if fsp["function_mode"] == "CORR":
+                errors += self._check_receptors(
+                    path, fsp.get("receptor_ids", []), receptors)
+                errors += self._check_zoom_window_tuning(path, fsp)
+                errors += self._check_channel_averaging_map(path, fsp)
+            elif fsp["function_mode"] == "PSS-BF":
+                for j, beam in enumerate(fsp["search_beam"]):
+                    errors += self._check_receptors(
+                        "{}.search_beam[{}]".format(path, j),
+                        beam.get("receptor_ids", []), receptors)
+            elif fsp["function_mode"] == "PST-BF":
+                for j, beam in enumerate(fsp["timing_beam"]):
+                    errors += self._check_receptors(
+                        "{}.timing_beam[{}]".format(path, j),
+                        beam.get("receptor_ids", []), receptors)
+        return errors
+
+    @staticmethod
+    def _format_error(error):
+        path = ""
+        for item in error.absolute_path:
+            path += "[{}]".format(item) if isinstance(item, int) else ".{}".format(item)
+        message = error.schema.get("message", error.message) \
+            if isinstance(error.schema, Mapping) else error.message
+        return "{}: {}".format(path.lstrip(".") or "configuration", message)
+
+    @staticmethod
+    def _check_receptors(path, receptor_ids, receptors):
+        return [
+            "{}: Receptor {} does not belong to the subarray.".format(path, receptor_id)
+            for receptor_id in receptor_ids if receptor_id not in receptors
+        ]
+
+    def _check_channel_averaging_map(self, path, fsp):
+        errors = []
+        for i, (channel_id, _) in enumerate(fsp.get("channel_averaging_map", [])):
+            # channel ID of the first channel in the group
+            if channel_id != i * self._channels_per_group:
+                errors.append(
+                    "{}.channel_averaging_map[{}]: {} is not the channel ID of the "
+                    "first channel in a group.".format(path, i, channel_id)
+                )
+        return errors
+
+    @staticmethod
+    def _check_zoom_window_tuning(path, fsp):
+        if fsp["zoom_factor"] == 0:
+            return []
+        zoom_window_tuning = fsp["zoom_window_tuning"] * 10 ** 3  # Hz
+        slice_bw = const.FREQUENCY_SLICE_BW * 10 ** 6
+        slice_start = (fsp["frequency_slice_id"] - 1) * slice_bw
+
+        if fsp["frequency_band"] not in ["5a", "5b"]:
+            streams = [(_FREQUENCY_BAND_START[fsp["frequency_band"]],
+                        fsp["frequency_band_offset_stream_1"])]
+        elif fsp["band_5_tuning"] == [0, 0]:  # band5Tuning not specified
+            return []
+        else:  # two streams with bandwidth 2.5 GHz
+            half_stream_bw = const.BAND_5_STREAM_BANDWIDTH * 10 ** 9 / 2
+            streams = [
+                (fsp["band_5_tuning"][0] * 10 ** 9 - half_stream_bw,
+                 fsp["frequency_band_offset_stream_1"]),
+                (fsp["band_5_tuning"][1] * 10 ** 9 - half_stream_bw,
+                 fsp["frequency_band_offset_stream_2"])
+            ]
+
+        for stream_start, offset in streams:
+            start = stream_start + offset + slice_start
+            if start <= zoom_window_tuning <= start + slice_bw:
+                return []
+        return ["{}.zoom_window_tuning: 'zoomWindowTuning' must be within "
+                "observed frequency slice.".format(path)]
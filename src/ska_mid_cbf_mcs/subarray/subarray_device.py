@@ -28,16 +28,33 @@ from tango import AttrWriteType
 # Additional import
 # PROTECTED REGION ID(CbfSubarray.additionnal_import) ENABLED START #
 import os
-import sys
 import json
 from random import randint
-from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import time
-import copy
+
+import numpy
 
 file_path = os.path.dirname(os.path.abspath(__file__))
 
-from ska_mid_cbf_mcs.commons.global_enum import const, freq_band_dict
+from ska_mid_cbf_mcs.commons.global_enum import const
+from ska_mid_cbf_mcs.commons.epoch_scheduler import EpochScheduler
+from ska_mid_cbf_mcs.commons.subscription_pool import SubscriptionPool
+from ska_mid_cbf_mcs.commons.delay_model_codec import \
+    decode_delay_model, delay_details_to_rows, stage_rows
+from ska_mid_cbf_mcs.commons.delay_model_history import DelayModelHistory
+from ska_mid_cbf_mcs.commons.delay_polynomial import \
+    evaluate_entries, evaluation_rows, parse_evaluation_request
+from ska_mid_cbf_mcs.commons.stage_timer import StageTimer, StageTimingHistory
+from ska_mid_cbf_mcs.commons.delivery_telemetry import DeliveryTelemetry
+from ska_mid_cbf_mcs.commons.timed_lock import TimedLock
+from ska_mid_cbf_mcs.commons.group_command import group_command_inout
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import ReceptorVccMap
+from ska_mid_cbf_mcs.commons.event_dispatch import EventDispatchTable
+from ska_mid_cbf_mcs.subarray.scan_configuration import ScanConfiguration
+from ska_mid_cbf_mcs.subarray.scan_configuration_validator import \
+    ScanConfigurationValidator, FUNCTION_MODES
 from ska_tango_base.control_model import ObsState, AdminMode
 from ska_tango_base import SKASubarray
 from ska_tango_base.commands import ResultCode, BaseCommand, ResponseCommand, ActionCommand
@@ -47,19 +64,6 @@ from ska_tango_base.commands import ResultCode, BaseCommand, ResponseCommand, Ac
 __all__ = ["CbfSubarray", "main"]
 
 
-def validate_ip(ip):
-    splitip = ip.split('.')
-    if len(splitip) != 4:
-        return False
-    for ipparts in splitip:
-        if not ipparts.isdigit():
-            return False
-        ipval = int(ipparts)
-        if ipval < 0 or ipval > 255:
-            return False
-    return True
-
-
 class CbfSubarray(SKASubarray):
     """
     CBFSubarray TANGO device class for the CBFSubarray prototype
@@ -140,27 +144,50 @@ class CbfSubarray(SKASubarray):
                 self.logger.warn(log_msg)
                 return
             try:
+                arrived = time.time()
                 log_msg = "Received delay model update."
                 self.logger.warn(log_msg)
 
-                value = str(event.attr_value.value)
-                if value == self._last_received_delay_model:
+                # the subscription point is either a JSON string attribute or a
+                # binary one (an array of doubles, see delay_model_codec)
+                binary = not isinstance(event.attr_value.value, str)
+                if binary:
+                    value = numpy.asarray(event.attr_value.value, dtype=numpy.float64)
+                    received = value.tobytes()
+                else:
+                    value = str(event.attr_value.value)
+                    received = value
+                if received == self._last_received_delay_model:
                     log_msg = "Ignoring delay model (identical to previous)."
                     self.logger.warn(log_msg)
                     return
 
-                self._last_received_delay_model = value
+                self._last_received_delay_model = received
+                if binary:
+                    self._schedule_delay_model_binary(value, arrived)
+                    return
                 delay_model_all = json.loads(value)
 
                 for delay_model in delay_model_all["delayModel"]:
-                    t = Thread(
-                        target=self._update_delay_model,
-                        args=(delay_model["destinationType"], 
-                              int(delay_model["epoch"]), 
-                              json.dumps(delay_model["delayDetails"])
-                        )
+                    log_msg = "Delay model active at {} (currently {})...".format(
+                        delay_model["epoch"], int(time.time()))
+                    self.logger.warn(log_msg)
+                    if delay_model["destinationType"] == "vcc":
+                        self._record_delay_model(
+                            int(delay_model["epoch"]), delay_model["delayDetails"])
+                        # split by receptor now, so each VCC only receives its own entry
+                        model = self._split_delay_model_by_vcc(delay_model["delayDetails"])
+                    else:
+                        model = json.dumps(delay_model["delayDetails"])
+                    self._model_scheduler.schedule(
+                        self._delivery_time(int(delay_model["epoch"])),
+                        ("delay_model", delay_model["destinationType"]),
+                        self._update_delay_model,
+                        delay_model["destinationType"],
+                        int(delay_model["epoch"]),
+                        model,
+                        arrived
                     )
-                    t.start()
             except Exception as e:
                 self.logger.error(str(e))
         else:
@@ -168,27 +195,152 @@ class CbfSubarray(SKASubarray):
                 log_msg = item.reason + ": on attribute " + str(event.attr_name)
                 self.logger.error(log_msg)
 
-    def _update_delay_model(self, destination_type, epoch, model):
-        # This method is always called on a separate thread
-        log_msg = "Delay model active at {} (currently {})...".format(epoch, int(time.time()))
-        self.logger.warn(log_msg)
+    def _schedule_delay_model_binary(self, value, arrived):
+        for epoch, destination_type, rows in decode_delay_model(value):
+            log_msg = "Delay model active at {} (currently {})...".format(
+                int(epoch), int(time.time()))
+            self.logger.warn(log_msg)
+            if destination_type == "vcc":
+                self._record_delay_model(int(epoch), rows)
+                model = self._split_delay_model_rows_by_vcc(rows)
+            else:
+                model = rows.ravel()
+            self._model_scheduler.schedule(
+                self._delivery_time(int(epoch)),
+                ("delay_model", destination_type),
+                self._update_delay_model,
+                destination_type,
+                int(epoch),
+                model,
+                arrived
+            )
+
+    def _record_delay_model(self, epoch, model):
+        """
+        Record the VCC delay model of an epoch in the delay model history, for
+        EvaluateDelay. A model that cannot be recorded is still delivered.
+
+        :param model: delayDetails of a JSON delay model, or delay model rows
+            as decoded by decode_delay_model
+        """
+        try:
+            rows = model if isinstance(model, numpy.ndarray) else delay_details_to_rows(model)
+            self._delay_model_history.record(epoch, rows[:, 0], rows[:, 1], rows[:, 2:])
+        except (KeyError, TypeError, ValueError) as e:
+            log_msg = "Delay model of epoch {} not recorded: {}".format(epoch, e)
+            self.logger.warn(log_msg)
+
+    def _delivery_time(self, epoch):
+        """
+        Time at which to deliver a model update of an epoch: ModelStagingLead
+        before it, so that the VCCs and FSPs stage it and activate it
+        themselves at the epoch.
+        """
+        return epoch - self.ModelStagingLead
+
+    def _staged(self, epoch, model, entries_key):
+        """
+        Tag a model update (serialized entries, or flattened delay model
+        rows) with its epoch, for the VCCs and FSPs to stage it; returned as
+        it is if ModelStagingLead is 0.
+        """
+        if not self.ModelStagingLead:
+            return model
+        if isinstance(model, str):
+            return '{{"epoch": {}, "{}": {}}}'.format(epoch, entries_key, model)
+        return stage_rows(epoch, model)
+
+    def _split_delay_model_rows_by_vcc(self, rows):
+        """
+        Binary counterpart of _split_delay_model_by_vcc.
 
-        if epoch > time.time():
-            time.sleep(epoch - time.time())
+        :param rows: delay model rows, as decoded by decode_delay_model
+        :return: dict of vccID:flattened rows of the receptor of that VCC
+        """
+        vcc_rows = {}
+        for receptorID in numpy.unique(rows[:, 0]):
+            vccID = self._assigned_vcc_id.get(int(receptorID))
+            if vccID is None:
+                continue
+            vcc_rows[vccID] = rows[rows[:, 0] == receptorID].ravel()
+        return vcc_rows
+
+    def _split_delay_model_by_vcc(self, delay_details):
+        """
+        Split the delayDetails of a delay model by destination VCC, using the
+        receptor to VCC map of this subarray. Entries for receptors that are
+        not assigned to this subarray are dropped.
 
+        :return: dict of vccID:serialized delayDetails (a single-entry list)
+        """
+        vcc_details = {}
+        for receptor_details in delay_details:
+            vccID = self._assigned_vcc_id.get(int(receptor_details["receptor"]))
+            if vccID is None:
+                continue
+            vcc_details.setdefault(vccID, []).append(receptor_details)
+        return {vccID: json.dumps(details) for vccID, details in vcc_details.items()}
+
+    def _send_delay_model_to_vccs(self, vcc_models):
+        """
+        Send each VCC its own slice of the delay model. The commands are issued
+        asynchronously to all VCCs before the replies are collected, and the
+        delivery latency of each VCC is recorded.
+
+        :param vcc_models: dict of vccID:serialized delayDetails, or
+            vccID:flattened rows for a binary delay model
+        """
+        requests = []
+        for vccID, model in vcc_models.items():
+            proxy = self._proxies_vcc[vccID - 1]
+            if isinstance(model, str):
+                command_name = "UpdateDelayModel"
+            else:
+                command_name = "UpdateDelayModelBinary"
+            try:
+                asynch_id = proxy.command_inout_asynch(command_name, model)
+                requests.append((vccID, proxy, time.time(), asynch_id))
+            except tango.DevFailed as df:
+                log_msg = "Failed to send delay model to VCC {}: {}".format(
+                    vccID, df.args[0].desc)
+                self.logger.error(log_msg)
+
+        for vccID, proxy, start_time, asynch_id in requests:
+            try:
+                proxy.command_inout_reply(asynch_id, proxy.get_timeout_millis())
+                self._vcc_delay_model_latency[vccID] = time.time() - start_time
+            except tango.DevFailed as df:
+                log_msg = "Delay model update failed on VCC {}: {}".format(
+                    vccID, df.args[0].desc)
+                self.logger.error(log_msg)
+
+    def _update_delay_model(self, destination_type, epoch, model, arrived):
+        # This method is always called by a _model_scheduler worker, at the
+        # epoch (minus ModelStagingLead)
         log_msg = "Updating delay model at specified epoch {}...".format(epoch)
         self.logger.warn(log_msg)
 
-        data = tango.DeviceData()
-        data.insert(tango.DevString, model)
-
-        # we lock the mutex, forward the configuration, then immediately unlock it
-        self._mutex_delay_model_config.acquire()
         if destination_type == "vcc":
-            self._group_vcc.command_inout("UpdateDelayModel", data)
-        elif destination_type == "fsp":
-            self._group_fsp.command_inout("UpdateDelayModel", data)
-        self._mutex_delay_model_config.release()
+            model = {
+                vccID: self._staged(epoch, vcc_model, "delayDetails")
+                for vccID, vcc_model in model.items()
+            }
+        else:
+            model = self._staged(epoch, model, "delayDetails")
+
+        # we lock the lane, forward the configuration, then immediately unlock it
+        with self._delivery_lane("delay_model", destination_type), \
+                self._recording_delivery("delay_model", arrived, epoch):
+            if destination_type == "vcc":
+                self._send_delay_model_to_vccs(model)
+            elif destination_type == "fsp":
+                data = tango.DeviceData()
+                if isinstance(model, str):
+                    data.insert(tango.DevString, model)
+                    self._group_fsp.command_inout("UpdateDelayModel", data)
+                else:
+                    data.insert(tango.DevVarDoubleArray, model)
+                    self._group_fsp.command_inout("UpdateDelayModelBinary", data)
 
     def _jones_matrix_event_callback(self, event):
         self.logger.debug("CbfSubarray._jones_matrix_event_callback")
@@ -198,6 +350,7 @@ class CbfSubarray(SKASubarray):
                 self.logger.warn(log_msg)
                 return
             try:
+                arrived = time.time()
                 log_msg = "Received Jones Matrix update."
                 self.logger.warn(log_msg)
 
@@ -211,14 +364,18 @@ class CbfSubarray(SKASubarray):
                 jones_matrix_all = json.loads(value)
 
                 for jones_matrix in jones_matrix_all["jonesMatrix"]:
-                    t = Thread(
-                        target=self._update_jones_matrix,
-                        args=(jones_matrix["destinationType"], 
-                              int(jones_matrix["epoch"]), 
-                              json.dumps(jones_matrix["matrixDetails"])
-                        )
+                    log_msg = "Jones matrix active at {} (currently {})...".format(
+                        jones_matrix["epoch"], int(time.time()))
+                    self.logger.warn(log_msg)
+                    self._model_scheduler.schedule(
+                        self._delivery_time(int(jones_matrix["epoch"])),
+                        ("jones_matrix", jones_matrix["destinationType"]),
+                        self._update_jones_matrix,
+                        jones_matrix["destinationType"],
+                        int(jones_matrix["epoch"]),
+                        json.dumps(jones_matrix["matrixDetails"]),
+                        arrived
                     )
-                    t.start()
             except Exception as e:
                 self.logger.error(str(e))
         else:
@@ -226,28 +383,23 @@ class CbfSubarray(SKASubarray):
                 log_msg = item.reason + ": on attribute " + str(event.attr_name)
                 self.logger.error(log_msg)
 
-    def _update_jones_matrix(self, destination_type, epoch, matrix_details):
-        #This method is always called on a separate thread
+    def _update_jones_matrix(self, destination_type, epoch, matrix_details, arrived):
+        # This method is always called by a _model_scheduler worker, at the
+        # epoch (minus ModelStagingLead)
         self.logger.debug("CbfSubarray._update_jones_matrix")
-        log_msg = "Jones matrix active at {} (currently {})...".format(epoch, int(time.time()))
-        self.logger.warn(log_msg)
-
-        if epoch > time.time():
-            time.sleep(epoch - time.time())
-
         log_msg = "Updating Jones Matrix at specified epoch {}, destination ".format(epoch) + destination_type
         self.logger.warn(log_msg)
 
         data = tango.DeviceData()
-        data.insert(tango.DevString, matrix_details)
+        data.insert(tango.DevString, self._staged(epoch, matrix_details, "matrixDetails"))
 
-        # we lock the mutex, forward the configuration, then immediately unlock it
-        self._mutex_jones_matrix_config.acquire()
-        if destination_type == "vcc":
-            self._group_vcc.command_inout("UpdateJonesMatrix", data)
-        elif destination_type == "fsp":
-            self._group_fsp.command_inout("UpdateJonesMatrix", data)
-        self._mutex_jones_matrix_config.release()
+        # we lock the lane, forward the configuration, then immediately unlock it
+        with self._delivery_lane("jones_matrix", destination_type), \
+                self._recording_delivery("jones_matrix", arrived, epoch):
+            if destination_type == "vcc":
+                self._group_vcc.command_inout("UpdateJonesMatrix", data)
+            elif destination_type == "fsp":
+                self._group_fsp.command_inout("UpdateJonesMatrix", data)
 
     def _beam_weights_event_callback(self, event):
         self.logger.debug("CbfSubarray._beam_weights_event_callback")
@@ -257,6 +409,7 @@ class CbfSubarray(SKASubarray):
                 self.logger.warn(log_msg)
                 return
             try:
+                arrived = time.time()
                 log_msg = "Received beam weights update."
                 self.logger.warn(log_msg)
 
@@ -270,13 +423,17 @@ class CbfSubarray(SKASubarray):
                 beam_weights_all = json.loads(value)
 
                 for beam_weights in beam_weights_all["beamWeights"]:
-                    t = Thread(
-                        target=self._update_beam_weights,
-                        args=(int(beam_weights["epoch"]), 
-                              json.dumps(beam_weights["beamWeightsDetails"])
-                        )
+                    log_msg = "Beam weights active at {} (currently {})...".format(
+                        beam_weights["epoch"], int(time.time()))
+                    self.logger.warn(log_msg)
+                    self._model_scheduler.schedule(
+                        self._delivery_time(int(beam_weights["epoch"])),
+                        ("beam_weights", "fsp"),
+                        self._update_beam_weights,
+                        int(beam_weights["epoch"]),
+                        json.dumps(beam_weights["beamWeightsDetails"]),
+                        arrived
                     )
-                    t.start()
             except Exception as e:
                 self.logger.error(str(e))
         else:
@@ -284,51 +441,63 @@ class CbfSubarray(SKASubarray):
                 log_msg = item.reason + ": on attribute " + str(event.attr_name)
                 self.logger.error(log_msg)
 
-    def _update_beam_weights(self, epoch, weights_details):
-        #This method is always called on a separate thread
+    def _update_beam_weights(self, epoch, weights_details, arrived):
+        # This method is always called by a _model_scheduler worker, at the
+        # epoch (minus ModelStagingLead)
         self.logger.debug("CbfSubarray._update_beam_weights")
-        log_msg = "Beam weights active at {} (currently {})...".format(epoch, int(time.time()))
-        self.logger.warn(log_msg)
-
-        if epoch > time.time():
-            time.sleep(epoch - time.time())
-
         log_msg = "Updating beam weights at specified epoch {}".format(epoch)
         self.logger.warn(log_msg)
 
         data = tango.DeviceData()
-        data.insert(tango.DevString, weights_details)
+        data.insert(tango.DevString, self._staged(epoch, weights_details, "beamWeightsDetails"))
 
-        # we lock the mutex, forward the configuration, then immediately unlock it
-        self._mutex_beam_weights_config.acquire()
-        self._group_fsp.command_inout("UpdateBeamWeights", data)
-        self._mutex_beam_weights_config.release()
+        # we lock the lane, forward the configuration, then immediately unlock it
+        with self._delivery_lane("beam_weights", "fsp"), \
+                self._recording_delivery("beam_weights", arrived, epoch):
+            self._group_fsp.command_inout("UpdateBeamWeights", data)
+
+    def _delivery_lane(self, model_type, destination_type):
+        """
+        Return the lock of the delivery lane of a model type and destination
+        type. Lanes are independent, so e.g. the VCC and FSP deliveries of
+        the same delay model do not wait for each other.
+
+        :raise ValueError: if the destination type is not valid for the model
+        """
+        try:
+            return self._delivery_locks[(model_type, destination_type)]
+        except KeyError:
+            raise ValueError("Invalid destination type {} for {}".format(
+                destination_type, model_type))
+
+    @contextmanager
+    def _recording_delivery(self, model_type, arrived, epoch):
+        """
+        Record the delivery of a model update done in the with block, even
+        if it fails. Its lateness is measured against the delivery time,
+        ModelStagingLead before the epoch. The telemetry attributes are
+        polled, so their change events are not pushed from the delivery
+        workers.
+        """
+        issued = time.time()
+        try:
+            yield
+        finally:
+            lateness = self._delivery_telemetry.record(
+                model_type, arrived, epoch, issued, time.time(),
+                deadline=self._delivery_time(epoch))
+            self.logger.debug("{} for epoch {} delivered {:.3f} s after its deadline".format(
+                model_type, epoch, lateness))
 
     def _state_change_event_callback(self, event):
         if not event.err:
             try:
                 device_name = event.device.dev_name()
-                if "healthstate" in event.attr_name:
-                    if "vcc" in device_name:
-                        self._vcc_health_state[device_name] = event.attr_value.value
-                    elif "fsp" in device_name:
-                        self._fsp_health_state[device_name] = event.attr_value.value
-                    else:
-                        # should NOT happen!
-                        log_msg = "Received health state change for unknown device " + str(
-                            event.attr_name)
-                        self.logger.warn(log_msg)
-                        return
-                elif "state" in event.attr_name:
-                    if "vcc" in device_name:
-                        self._vcc_state[device_name] = event.attr_value.value
-                    elif "fsp" in device_name:
-                        self._fsp_state[device_name] = event.attr_value.value
-                    else:
-                        # should NOT happen!
-                        log_msg = "Received state change for unknown device " + str(event.attr_name)
-                        self.logger.warn(log_msg)
-                        return
+                if not self._event_dispatch.dispatch(event):
+                    # should NOT happen!
+                    log_msg = "Received state change for unknown device " + str(event.attr_name)
+                    self.logger.warn(log_msg)
+                    return
 
                 log_msg = "New value for " + str(event.attr_name) + " of device " + device_name + \
                           " is " + str(event.attr_value.value)
@@ -342,626 +511,302 @@ class CbfSubarray(SKASubarray):
                 self.logger.error(log_msg)
 
 
-    def _validate_scan_configuration(self, argin):
-        # try to deserialize input string to a JSON object
-        try:
-            full_configuration = json.loads(argin)
-            common_configuration = copy.deepcopy(full_configuration["common"])
-            configuration = copy.deepcopy(full_configuration["cbf"])
-        except json.JSONDecodeError:  # argument not a valid JSON object
-            msg = "Scan configuration object is not a valid JSON object. Aborting configuration."
-            self._raise_configure_scan_fatal_error(msg)
-
-        for proxy in self._proxies_assigned_vcc:
-            if proxy.State() != tango.DevState.ON:
-                msg = "VCC {} is not ON. Aborting configuration.".format(
-                    self._proxies_vcc.index(proxy) + 1
-                )
-                self._raise_configure_scan_fatal_error(msg)
-        
-        # Validate frequencyBandOffsetStream1.
-        if "frequency_band_offset_stream_1" not in configuration:
-            configuration["frequency_band_offset_stream_1"] = 0
-        if abs(int(configuration["frequency_band_offset_stream_1"])) <= const.FREQUENCY_SLICE_BW * 10 ** 6 / 2:
-            pass
-        else:
-            msg = "Absolute value of 'frequencyBandOffsetStream1' must be at most half " \
-                    "of the frequency slice bandwidth. Aborting configuration."
-            self._raise_configure_scan_fatal_error(msg)
-
-        # Validate frequencyBandOffsetStream2.
-        if "frequency_band_offset_stream_2" not in configuration:
-            configuration["frequency_band_offset_stream_2"] = 0
-        if abs(int(configuration["frequency_band_offset_stream_2"])) <= const.FREQUENCY_SLICE_BW * 10 ** 6 / 2:
-            pass
-        else:
-            msg = "Absolute value of 'frequencyBandOffsetStream2' must be at most " \
-                    "half of the frequency slice bandwidth. Aborting configuration."
-            self._raise_configure_scan_fatal_error(msg)
-
-        # Validate band5Tuning, frequencyBandOffsetStream2 if frequencyBand is 5a or 5b.
-        if common_configuration["frequency_band"] in ["5a", "5b"]:
-            # band5Tuning is optional
-            if "band_5_tuning" in common_configuration:
-                pass
-                # check if streamTuning is an array of length 2
-                try:
-                    assert len(common_configuration["band_5_tuning"]) == 2
-                except (TypeError, AssertionError):
-                    msg = "'band5Tuning' must be an array of length 2. Aborting configuration."
-                    self._raise_configure_scan_fatal_error(msg)
-
-                stream_tuning = [*map(float, common_configuration["band_5_tuning"])]
-                if common_configuration["frequency_band"] == "5a":
-                    if all(
-                            [const.FREQUENCY_BAND_5a_TUNING_BOUNDS[0] <= stream_tuning[i]
-                             <= const.FREQUENCY_BAND_5a_TUNING_BOUNDS[1] for i in [0, 1]]
-                    ):
-                        pass
-                    else:
-                        msg = "Elements in 'band5Tuning must be floats between {} and {} " \
-                              "(received {} and {}) for a 'frequencyBand' of 5a. " \
-                              "Aborting configuration.".format(
-                            const.FREQUENCY_BAND_5a_TUNING_BOUNDS[0],
-                            const.FREQUENCY_BAND_5a_TUNING_BOUNDS[1],
-                            stream_tuning[0],
-                            stream_tuning[1]
-                        )
-                        self._raise_configure_scan_fatal_error(msg)
-                else:  # configuration["frequency_band"] == "5b"
-                    if all(
-                            [const.FREQUENCY_BAND_5b_TUNING_BOUNDS[0] <= stream_tuning[i]
-                             <= const.FREQUENCY_BAND_5b_TUNING_BOUNDS[1] for i in [0, 1]]
-                    ):
-                        pass
-                    else:
-                        msg = "Elements in 'band5Tuning must be floats between {} and {} " \
-                              "(received {} and {}) for a 'frequencyBand' of 5b. " \
-                              "Aborting configuration.".format(
-                            const.FREQUENCY_BAND_5b_TUNING_BOUNDS[0],
-                            const.FREQUENCY_BAND_5b_TUNING_BOUNDS[1],
-                            stream_tuning[0],
-                            stream_tuning[1]
-                        )
-                        self._raise_configure_scan_fatal_error(msg)
-            else:
-                # set band5Tuning to zero for the rest of the test. This won't 
-                # change the argin in function "configureScan(argin)"
-                common_configuration["band_5_tuning"] = [0, 0]
+    def _read_attributes_snapshot(self, requests):
+        """
+        Read attributes of many devices at once. The requests are issued
+        asynchronously to every device before the replies are collected, so
+        the whole snapshot costs about one round-trip.
 
-        # Validate dopplerPhaseCorrSubscriptionPoint.
-        if "doppler_phase_corr_subscription_point" in configuration:
+        :param requests: list of (proxy, [attribute names])
+        :return: dict of device name:{attribute name:value}; the value is None
+            if the attribute could not be read
+        """
+        snapshot = {}
+        pending = []
+        for proxy, attr_names in requests:
+            snapshot[proxy.dev_name()] = dict.fromkeys(attr_names)
             try:
-                attribute_proxy = tango.AttributeProxy(configuration["doppler_phase_corr_subscription_point"])
-                attribute_proxy.ping()
-                # TODO is this unsubscribe needed for validation?
-                # attribute_proxy.unsubscribe_event(
-                #     attribute_proxy.subscribe_event(
-                #         tango.EventType.CHANGE_EVENT,
-                #         self._void_callback
-                #     )
-                # )
-            except tango.DevFailed:  # attribute doesn't exist or is not set up correctly
-                msg = "Attribute {} not found or not set up correctly for " \
-                        "'dopplerPhaseCorrSubscriptionPoint'. Aborting configuration.".format(
-                    configuration["doppler_phase_corr_subscription_point"]
-                )
-                self._raise_configure_scan_fatal_error(msg)
+                pending.append((proxy, attr_names, proxy.read_attributes_asynch(attr_names)))
+            except tango.DevFailed as df:
+                log_msg = "Failed to read {} from {}: {}".format(
+                    attr_names, proxy.dev_name(), df.args[0].desc)
+                self.logger.error(log_msg)
 
-        # Validate delayModelSubscriptionPoint.
-        if "delay_model_subscription_point" in configuration:
+        for proxy, attr_names, asynch_id in pending:
             try:
-                attribute_proxy = tango.AttributeProxy(configuration["delay_model_subscription_point"])
-                attribute_proxy.ping()
-                # TODO is this unsubscribe needed for validation?
-                # attribute_proxy.unsubscribe_event(
-                #     attribute_proxy.subscribe_event(
-                #         tango.EventType.CHANGE_EVENT,
-                #         self._void_callback
-                #     )
-                # )
-            except tango.DevFailed:  # attribute doesn't exist or is not set up correctly
-                msg = "Attribute {} not found or not set up correctly for " \
-                        "'delayModelSubscriptionPoint'. Aborting configuration.".format(
-                    configuration["delay_model_subscription_point"]
-                )
-                self._raise_configure_scan_fatal_error(msg)
+                attrs = proxy.read_attributes_reply(asynch_id, proxy.get_timeout_millis())
+                snapshot[proxy.dev_name()] = {
+                    attr_name: None if attr.has_failed else attr.value
+                    for attr_name, attr in zip(attr_names, attrs)
+                }
+            except tango.DevFailed as df:
+                log_msg = "Failed to read {} from {}: {}".format(
+                    attr_names, proxy.dev_name(), df.args[0].desc)
+                self.logger.error(log_msg)
+        return snapshot
 
-        # Validate jonesMatrixSubscriptionPoint.
-        if "jones_matrix_subscription_point" in configuration:
-            try:
-                attribute_proxy = tango.AttributeProxy(configuration["jones_matrix_subscription_point"])
-                attribute_proxy.ping()
-                # TODO is this unsubscribe needed for validation?
-                # attribute_proxy.unsubscribe_event(
-                #     attribute_proxy.subscribe_event(
-                #         tango.EventType.CHANGE_EVENT,
-                #         self._void_callback
-                #     )
-                # )
-            except tango.DevFailed:  # attribute doesn't exist or is not set up correctly
-                msg = "Attribute {} not found or not set up correctly for " \
-                        "'jonesMatrixSubscriptionPoint'. Aborting configuration.".format(
-                    configuration["jones_matrix_subscription_point"]
-                )
-                self._raise_configure_scan_fatal_error(msg)
-        
-        # Validate beamWeightsSubscriptionPoint.
-        if "timing_beam_weights_subscription_point" in configuration:
-            try:
-                attribute_proxy = tango.AttributeProxy(configuration["timing_beam_weights_subscription_point"])
-                attribute_proxy.ping()
-                # TODO is this unsubscribe needed for validation?
-                # attribute_proxy.unsubscribe_event(
-                #     attribute_proxy.subscribe_event(
-                #         tango.EventType.CHANGE_EVENT,
-                #         self._void_callback
-                #     )
-                # )
-            except tango.DevFailed:  # attribute doesn't exist or is not set up correctly
-                msg = "Attribute {} not found or not set up correctly for " \
-                        "'beamWeightsSubscriptionPoint'. Aborting configuration.".format(
-                    configuration["timing_beam_weights_subscription_point"]
-                )
-                self._raise_configure_scan_fatal_error(msg)
+    def _read_validation_snapshot(self, scan_config):
+        """
+        Read the state of every device ConfigureScan validation depends on:
+        the assigned VCCs, the requested FSPs and all the FSP subarrays.
+        """
+        requests = [(proxy, ["State"]) for proxy in self._proxies_assigned_vcc]
+        for fsp in scan_config.fsp:
+            if fsp.get("fsp_id") in range(1, self._count_fsp + 1):
+                requests.append((self._proxies_fsp[fsp["fsp_id"] - 1], ["State", "functionMode"]))
+        requests += [
+            (proxy, ["State", "obsState"]) for proxy in self._proxies_fsp_corr_subarray
+        ] + [
+            (proxy, ["State", "obsState", "searchBeamID"]) for proxy in self._proxies_fsp_pss_subarray
+        ] + [
+            (proxy, ["State", "obsState", "timingBeamID"]) for proxy in self._proxies_fsp_pst_subarray
+        ]
+        return self._read_attributes_snapshot(requests)
+
+    def _validate_scan_configuration(self, scan_config):
+        # static checks first: all the violations are collected in one pass
+        errors = self._scan_config_validator.validate(scan_config, self._receptors)
+        configuration = scan_config.cbf
+
+        # the device state checks below only look at this snapshot
+        snapshot = self._read_validation_snapshot(scan_config)
 
+        for proxy in self._proxies_assigned_vcc:
+            if snapshot[proxy.dev_name()]["State"] != tango.DevState.ON:
+                errors.append("VCC {} is not ON.".format(
+                    self._proxies_vcc.index(proxy) + 1
+                ))
+
+        # Validate the subscription points.
+        for key, name in [
+            ("doppler_phase_corr_subscription_point", "dopplerPhaseCorrSubscriptionPoint"),
+            ("delay_model_subscription_point", "delayModelSubscriptionPoint"),
+            ("jones_matrix_subscription_point", "jonesMatrixSubscriptionPoint"),
+            ("timing_beam_weights_subscription_point", "beamWeightsSubscriptionPoint")
+        ]:
+            if key in configuration:
+                try:
+                    attribute_proxy = tango.AttributeProxy(configuration[key])
+                    attribute_proxy.ping()
+                except tango.DevFailed:  # attribute doesn't exist or is not set up correctly
+                    errors.append("Attribute {} not found or not set up correctly for "
+                                  "'{}'.".format(configuration[key], name))
 
         # Validate searchWindow.
-        if "search_window" in configuration:
-            # check if searchWindow is an array of maximum length 2
-            if len(configuration["search_window"]) > 2:
-                msg = "'searchWindow' must be an array of maximum length 2. " \
-                        "Aborting configuration."
-                self._raise_configure_scan_fatal_error(msg)
-            #TODO consider moving the search_window object validation to Vcc
-            for search_window in configuration["search_window"]:
-                for vcc in self._proxies_assigned_vcc:
-                    try:
-                        search_window["frequency_band"] = common_configuration["frequency_band"]
-                        search_window["frequency_band_offset_stream_1"] = \
-                            configuration["frequency_band_offset_stream_1"]
-                        search_window["frequency_band_offset_stream_2"] = \
-                            configuration["frequency_band_offset_stream_2"]
-                        if search_window["frequency_band"] in ["5a", "5b"]:
-                            search_window["band_5_tuning"] = common_configuration["band_5_tuning"]
-
-                        # pass on configuration to VCC
-                        vcc.ValidateSearchWindow(json.dumps(search_window))
-
-                    except tango.DevFailed:  # exception in Vcc.ValidateSearchWindow
-                        msg = "An exception occurred while configuring VCC search " \
-                                "windows:\n{}\n. Aborting configuration.".format(
-                            str(sys.exc_info()[1].args[0].desc)
-                        )
-                        self._raise_configure_scan_fatal_error(msg)
-        else:
-            pass
-
-        # Validate fsp.
-        for fsp in configuration["fsp"]:
-            try:
-                # Validate fspID.
-                if int(fsp["fsp_id"]) in list(range(1, self._count_fsp + 1)):
-                    fspID = int(fsp["fsp_id"])
-                    proxy_fsp = self._proxies_fsp[fspID - 1]
-                    if fsp["function_mode"] == "CORR":
-                        proxy_fsp_subarray = self._proxies_fsp_corr_subarray[fspID - 1]
-                    elif fsp["function_mode"] == "PSS-BF":
-                        proxy_fsp_subarray = self._proxies_fsp_pss_subarray[fspID - 1]
-                    elif fsp["function_mode"] == "PST-BF":
-                        proxy_fsp_subarray = self._proxies_fsp_pst_subarray[fspID - 1]
-                else:
-                    msg = "'fspID' must be an integer in the range [1, {}]. " \
-                            "Aborting configuration.".format(str(self._count_fsp))
-                    self._raise_configure_scan_fatal_error(msg)
-
-                if proxy_fsp.State() != tango.DevState.ON:
-                    msg = "FSP {} is not ON. Aborting configuration.".format(fspID)
-                    self._raise_configure_scan_fatal_error(msg)
-
-                if proxy_fsp_subarray.State() != tango.DevState.ON:
-                    msg = "Subarray {} of FSP {} is not ON. Aborting configuration.".format(
+        #TODO consider moving the search_window object validation to Vcc
+        for search_window in scan_config.search_window_payloads:
+            for vcc in self._proxies_assigned_vcc:
+                try:
+                    # pass on configuration to VCC
+                    vcc.ValidateSearchWindow(search_window)
+                except tango.DevFailed as df:  # exception in Vcc.ValidateSearchWindow
+                    errors.append("An exception occurred while validating VCC search "
+                                  "windows:\n{}".format(str(df.args[0].desc)))
+
+        # Validate the state of the FSPs.
+        fsp_subarray_proxies = {
+            "CORR": self._proxies_fsp_corr_subarray,
+            "PSS-BF": self._proxies_fsp_pss_subarray,
+            "PST-BF": self._proxies_fsp_pst_subarray
+        }
+        # an FSP subarray that is not IDLE holds its FSP in its function mode
+        #TODO need to add this check for VLBI once implemented
+        fsp_subarrays_busy = any(
+            snapshot[proxy.dev_name()]["obsState"] != ObsState.IDLE
+            for proxies in fsp_subarray_proxies.values() for proxy in proxies
+        )
+        for fsp in scan_config.fsp:
+            fspID = fsp.get("fsp_id")
+            if fspID not in range(1, self._count_fsp + 1) or \
+                    fsp.get("function_mode") not in FUNCTION_MODES:
+                continue  # already reported by the validator
+            fsp_state = snapshot[self._proxies_fsp[fspID - 1].dev_name()]
+            if fsp_state["State"] != tango.DevState.ON:
+                errors.append("FSP {} is not ON.".format(fspID))
+
+            if fsp["function_mode"] in fsp_subarray_proxies:
+                proxy_fsp_subarray = fsp_subarray_proxies[fsp["function_mode"]][fspID - 1]
+                if snapshot[proxy_fsp_subarray.dev_name()]["State"] != tango.DevState.ON:
+                    errors.append("Subarray {} of FSP {} is not ON.".format(
                         self._subarray_id, fspID
-                    )
-                    self._raise_configure_scan_fatal_error(msg)
-
-                # Validate functionMode.
-                function_modes = ["CORR", "PSS-BF", "PST-BF", "VLBI"]
-                if fsp["function_mode"] in function_modes:
-                    if function_modes.index(fsp["function_mode"]) + 1 == \
-                            proxy_fsp.functionMode or \
-                            proxy_fsp.functionMode == 0:
-                        pass
-                    else:
-                        #TODO need to add this check for VLBI once implemented
-                        for fsp_corr_subarray_proxy in self._proxies_fsp_corr_subarray:
-                            if fsp_corr_subarray_proxy.obsState != ObsState.IDLE:
-                                msg = "A different subarray is using FSP {} for a " \
-                                        "different function mode. Aborting configuration.".format(
-                                        fsp["fsp_id"]
-                                        )
-                                self._raise_configure_scan_fatal_error(msg)
-                        for fsp_pss_subarray_proxy in self._proxies_fsp_pss_subarray:
-                            if fsp_pss_subarray_proxy.obsState != ObsState.IDLE:
-                                msg = "A different subarray is using FSP {} for a " \
-                                        "different function mode. Aborting configuration.".format(
-                                        fsp["fsp_id"]
-                                        )
-                                self._raise_configure_scan_fatal_error(msg)
-                        for fsp_pst_subarray_proxy in self._proxies_fsp_pst_subarray:
-                            if fsp_pst_subarray_proxy.obsState != ObsState.IDLE:
-                                msg = "A different subarray is using FSP {} for a " \
-                                        "different function mode. Aborting configuration.".format(
-                                        fsp["fsp_id"]
-                                        )
-                                self._raise_configure_scan_fatal_error(msg)
-                else:
-                    msg = "'functionMode' must be one of {} (received {}). " \
-                            "Aborting configuration.".format(
-                        function_modes, fsp["function_mode"]
-                    )
-                    self._raise_configure_scan_fatal_error(msg)
+                    ))
+
+            # Validate functionMode.
+            if fsp_state["functionMode"] not in [0, FUNCTION_MODES.index(fsp["function_mode"]) + 1] \
+                    and fsp_subarrays_busy:
+                errors.append("A different subarray is using FSP {} for a "
+                              "different function mode.".format(fspID))
+
+            # Validate that the beams are not used by another fspSubarray.
+            if fsp["function_mode"] == "PSS-BF":
+                errors += self._find_beams_in_use(
+                    [beam["search_beam_id"] for beam in fsp["search_beam"]],
+                    self._proxies_fsp_pss_subarray, "searchBeamID", snapshot)
+            elif fsp["function_mode"] == "PST-BF":
+                errors += self._find_beams_in_use(
+                    [beam["timing_beam_id"] for beam in fsp["timing_beam"]],
+                    self._proxies_fsp_pst_subarray, "timingBeamID", snapshot)
+
+        if errors:
+            msg = "Invalid scan configuration:\n{}\nAborting configuration.".format(
+                "\n".join(errors))
+            self._raise_configure_scan_fatal_error(msg)
 
-                # TODO - why add these keys to the fsp dict - not good practice!
-                # TODO - create a new dict from a deep copy of the fsp dict.
-                fsp["frequency_band"] = common_configuration["frequency_band"]
-                fsp["frequency_band_offset_stream_1"] = configuration["frequency_band_offset_stream_1"]
-                fsp["frequency_band_offset_stream_2"] = configuration["frequency_band_offset_stream_2"]
-                if fsp["frequency_band"] in ["5a", "5b"]:
-                    fsp["band_5_tuning"] = common_configuration["band_5_tuning"]
+        # At this point, everything has been validated.
 
-                # --------------------------------------------------------
+    def _find_beams_in_use(self, beam_ids, proxies_fsp_subarray, attr_name, snapshot):
+        errors = []
+        for proxy in proxies_fsp_subarray:
+            fsp_subarray_state = snapshot[proxy.dev_name()]
+            beams_in_use = fsp_subarray_state[attr_name]
+            if beams_in_use is None or fsp_subarray_state["obsState"] == ObsState.IDLE:
+                continue
+            for beam_id in set(beam_ids).intersection(beams_in_use):
+                errors.append("'{}' {} is already being used on another "
+                              "fspSubarray.".format(attr_name, beam_id))
+        return errors
 
-                ########## CORR ##########
+    def _raise_configure_scan_fatal_error(self, msg):
+        self.logger.error(msg)
+        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
+                                     tango.ErrSeverity.ERR)
 
-                if fsp["function_mode"] == "CORR":
+    def _fsp_subarray_proxy(self, fspID, function_mode):
+        """Return the FSP Subarray proxy of the function mode, or None (VLBI)."""
+        proxies = {
+            "CORR": self._proxies_fsp_corr_subarray,
+            "PSS-BF": self._proxies_fsp_pss_subarray,
+            "PST-BF": self._proxies_fsp_pst_subarray
+        }.get(function_mode)
+        return proxies[fspID - 1] if proxies is not None else None
 
-                    if "receptor_ids" in fsp:
-                        for this_rec in fsp["receptor_ids"]:
-                            if this_rec not in self._receptors:
-                                msg = ("Receptor {} does not belong to subarray {}.".format(
-                                    str(self._receptors[this_rec]), str(self._subarray_id)))
-                                self.logger.error(msg)
-                                self._raise_configure_scan_fatal_error(msg)
-                    else:
-                        msg = "'receptors' not specified for Fsp CORR config"
-                        # TODO - In this case by the ICD, all subarray allocated resources should be used.
-                        # TODO add support for more than one receptor per fsp
-                        # fsp["receptor_ids"] = self._receptors
-                        fsp["receptor_ids"] = self._receptors[0]
-
-                    frequencyBand = freq_band_dict()[fsp["frequency_band"]]
-                    # Validate frequencySliceID.
-                    # TODO: move these to consts
-                    # See for ex. Fig 8-2 in the Mid.CBF DDD 
-                    num_frequency_slices = [4, 5, 7, 12, 26, 26]
-                    if int(fsp["frequency_slice_id"]) in list(
-                            range(1, num_frequency_slices[frequencyBand] + 1)):
-                        pass
-                    else:
-                        msg = "'frequencySliceID' must be an integer in the range [1, {}] " \
-                                "for a 'frequencyBand' of {}.".format(
-                            str(num_frequency_slices[frequencyBand]),
-                            str(fsp["frequency_band"])
-                        )
-                        self.logger.error(msg)
-                        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                        tango.ErrSeverity.ERR)
-
-                    # Validate zoom_factor.
-                    if int(fsp["zoom_factor"]) in list(range(0, 7)):
-                        pass
-                    else:
-                        msg = "'zoom_factor' must be an integer in the range [0, 6]."
-                        # this is a fatal error
-                        self.logger.error(msg)
-                        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                        tango.ErrSeverity.ERR)
-
-                    # Validate zoomWindowTuning.
-                    if int(fsp["zoom_factor"]) > 0:  # zoomWindowTuning is required
-                        if "zoom_window_tuning" in fsp:
-
-                            if fsp["frequency_band"] not in ["5a", "5b"]:  # frequency band is not band 5
-                                frequencyBand = ["1", "2", "3", "4", "5a", "5b"].index(fsp["frequency_band"])
-                                frequency_band_start = [*map(lambda j: j[0] * 10 ** 9, [
-                                    const.FREQUENCY_BAND_1_RANGE,
-                                    const.FREQUENCY_BAND_2_RANGE,
-                                    const.FREQUENCY_BAND_3_RANGE,
-                                    const.FREQUENCY_BAND_4_RANGE
-                                ])][frequencyBand] + fsp["frequency_band_offset_stream_1"]
-                                
-                                frequency_slice_range = (
-                                    frequency_band_start + \
-                                    (fsp["frequency_slice_id"] - 1) * const.FREQUENCY_SLICE_BW * 10 ** 6,
-                                    frequency_band_start +
-                                    fsp["frequency_slice_id"] * const.FREQUENCY_SLICE_BW * 10 ** 6
-                                )
-
-                                if frequency_slice_range[0] <= \
-                                        int(fsp["zoom_window_tuning"]) * 10 ** 3 <= \
-                                        frequency_slice_range[1]:
-                                    pass
-                                else:
-                                    msg = "'zoomWindowTuning' must be within observed frequency slice."
-                                    self.logger.error(msg)
-                                    tango.Except.throw_exception("Command failed", msg,
-                                                                    "ConfigureScan execution",
-                                                                    tango.ErrSeverity.ERR)
-                            else:  # frequency band 5a or 5b (two streams with bandwidth 2.5 GHz)
-                                if common_configuration["band_5_tuning"] == [0,0]: # band5Tuning not specified
-                                    pass
-                                else:
-
-                                    # TODO: these validations of BW range are done many times
-                                    # in many places - use a commom function; also may be possible
-                                    # to do them only once (ex. for band5Tuning)
-
-                                    frequency_slice_range_1 = (
-                                        fsp["band_5_tuning"][0] * 10 ** 9 + fsp["frequency_band_offset_stream_1"] - \
-                                        const.BAND_5_STREAM_BANDWIDTH * 10 ** 9 / 2 + \
-                                        (fsp["frequency_slice_id"] - 1) * const.FREQUENCY_SLICE_BW * 10 ** 6,
-                                        fsp["band_5_tuning"][0] * 10 ** 9 + fsp["frequency_band_offset_stream_1"] - \
-                                        const.BAND_5_STREAM_BANDWIDTH * 10 ** 9 / 2 + \
-                                        fsp["frequency_slice_id"] * const.FREQUENCY_SLICE_BW * 10 ** 6
-                                    )
-
-                                    frequency_slice_range_2 = (
-                                        fsp["band_5_tuning"][1] * 10 ** 9 + fsp["frequency_band_offset_stream_2"] - \
-                                        const.BAND_5_STREAM_BANDWIDTH * 10 ** 9 / 2 + \
-                                        (fsp["frequency_slice_id"] - 1) * const.FREQUENCY_SLICE_BW * 10 ** 6,
-                                        fsp["band_5_tuning"][1] * 10 ** 9 + fsp["frequency_band_offset_stream_2"] - \
-                                        const.BAND_5_STREAM_BANDWIDTH * 10 ** 9 / 2 + \
-                                        fsp["frequency_slice_id"] * const.FREQUENCY_SLICE_BW * 10 ** 6
-                                    )
-
-                                    if (frequency_slice_range_1[0] <= int(fsp["zoom_window_tuning"]) * 10 ** 3 <=
-                                        frequency_slice_range_1[1]) or \
-                                            (frequency_slice_range_2[0] <=
-                                            int(fsp["zoom_window_tuning"]) * 10 ** 3 <=
-                                            frequency_slice_range_2[1]):
-                                        pass
-                                    else:
-                                        msg = "'zoomWindowTuning' must be within observed frequency slice."
-                                        self.logger.error(msg)
-                                        tango.Except.throw_exception("Command failed", msg,
-                                                                    "ConfigureScan execution",
-                                                                    tango.ErrSeverity.ERR)
-                        else:
-                            msg = "FSP specified, but 'zoomWindowTuning' not given."
-                            self.logger.error(msg)
-                            tango.Except.throw_exception("Command failed", msg,
-                                                            "ConfigureScan execution",
-                                                            tango.ErrSeverity.ERR)
-
-                    # Validate integrationTime.
-                    if int(fsp["integration_factor"]) in list(
-                            range (self.MIN_INT_TIME, 10 * self.MIN_INT_TIME + 1, self.MIN_INT_TIME)
-                    ):
-                        pass
-                    else:
-                        msg = "'integrationTime' must be an integer in the range [1, 10] multiplied " \
-                                "by {}.".format(self.MIN_INT_TIME)
-                        self.logger.error(msg)
-                        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                        tango.ErrSeverity.ERR)
-
-                    # Validate fspChannelOffset
-                    try: 
-                        if int(fsp["channel_offset"])>=0: 
-                            pass
-                        #TODO has to be a multiple of 14880
-                        else:
-                            msg="fspChannelOffset must be greater than or equal to zero"
-                            self.logger.error(msg)
-                            tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                        tango.ErrSeverity.ERR)
-                    except:
-                        msg="fspChannelOffset must be an integer"
-                        self.logger.error(msg)
-                        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                        tango.ErrSeverity.ERR)
-
-                    # validate outputlink
-                    # check the format
-                    try:
-                        for element in fsp["output_link_map"]:
-                            a, b = (int(element[0]), int(element[1]))
-                    except:
-                        msg = "'outputLinkMap' format not correct."
-                        self.logger.error(msg)
-                        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                    tango.ErrSeverity.ERR)
-
-                    # Validate channelAveragingMap.
-                    if "channel_averaging_map" in fsp:
-                        try:
-                            # validate dimensions
-                            for i in range(0,len(fsp["channel_averaging_map"])):
-                                assert len(fsp["channel_averaging_map"][i]) == 2
-
-                            # validate averaging factor
-                            for i in range(0,len(fsp["channel_averaging_map"])):
-                                # validate channel ID of first channel in group
-                                if int(fsp["channel_averaging_map"][i][0]) == \
-                                        i * self.NUM_FINE_CHANNELS / self.NUM_CHANNEL_GROUPS:
-                                    pass  # the default value is already correct
-                                else:
-                                    msg = "'channelAveragingMap'[{0}][0] is not the channel ID of the " \
-                                          "first channel in a group (received {1}).".format(
-                                        i,
-                                        fsp["channel_averaging_map"][i][0]
-                                    )
-                                    self.logger.error(msg)
-                                    tango.Except.throw_exception("Command failed", msg,
-                                                                 "ConfigureScan execution",
-                                                                 tango.ErrSeverity.ERR)
-
-                                # validate averaging factor
-                                if int(fsp["channel_averaging_map"][i][1]) in [0, 1, 2, 3, 4, 6, 8]:
-                                    pass
-                                else:
-                                    msg = "'channelAveragingMap'[{0}][1] must be one of " \
-                                            "[0, 1, 2, 3, 4, 6, 8] (received {1}).".format(
-                                        i,
-                                        fsp["channel_averaging_map"][i][1]
-                                    )
-                                    self.logger.error(msg)
-                                    tango.Except.throw_exception("Command failed", msg,
-                                                                    "ConfigureScan execution",
-                                                                    tango.ErrSeverity.ERR)
-                        except (TypeError, AssertionError):  # dimensions not correct
-                            msg = "channel Averaging Map dimensions not correct"
-                            self.logger.error(msg)
-                            tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                                            tango.ErrSeverity.ERR)
-
-                    # TODO: validate destination addresses: outputHost, outputMac, outputPort?
-
-                # --------------------------------------------------------
-
-                ########## PSS-BF ##########
-                # TODO currently only CORR function mode is supported outside of Mid.CBF MCS
-                if fsp["function_mode"] == "PSS-BF":
-                    if int(fsp["search_window_id"]) in [1, 2]:
-                        pass
-                    else:  # searchWindowID not in valid range
-                        msg = "'searchWindowID' must be one of [1, 2] (received {}).".format(
-                            str(fsp["search_window_id"])
-                        )
-                        self._raise_configure_scan_fatal_error(msg)
-                    if len(fsp["search_beam"]) <= 192:
-                        for searchBeam in fsp["search_beam"]:
-                            if 1 > int(searchBeam["search_beam_id"]) > 1500:
-                                # searchbeamID not in valid range
-                                msg = "'searchBeamID' must be within range 1-1500 (received {}).".format(
-                                    str(searchBeam["search_beam_id"])
-                                )
-                                self._raise_configure_scan_fatal_error(msg)
-                            
-                            for fsp_pss_subarray_proxy in self._proxies_fsp_pss_subarray:
-                                searchBeamID = fsp_pss_subarray_proxy.searchBeamID
-                                if searchBeamID is None:
-                                    pass
-                                else:
-                                    for search_beam_ID in searchBeamID:
-                                        if int(searchBeam["search_beam_id"]) != search_beam_ID:
-                                            pass
-                                        elif fsp_pss_subarray_proxy.obsState == ObsState.IDLE:
-                                            pass
-                                        else:
-                                            msg = "'searchBeamID' {} is already being used on another fspSubarray.".format(
-                                                str(searchBeam["search_beam_id"])
-                                            )
-                                            self._raise_configure_scan_fatal_error(msg)
-                            
-                                # Validate receptors.
-                                # This is always given, due to implementation details.
-                                #TODO assume always given, as there is currently only support for 1 receptor/beam
-                            if "receptor_ids" not in searchBeam:
-                                searchBeam["receptor_ids"] = self._receptors
-
-                            # Sanity check:
-                            for this_rec in searchBeam["receptor_ids"]:
-                                if this_rec not in self._receptors:
-                                    msg = ("Receptor {} does not belong to subarray {}.".format(
-                                        str(self._receptors[this_rec]), str(self._subarray_id)))
-                                    self.logger.error(msg)
-                                    tango.Except.throw_exception("Command failed", msg, 
-                                    "ConfigureScan execution", tango.ErrSeverity.ERR)
-
-                            if searchBeam["enable_output"] is False or searchBeam["enable_output"] is True:
-                                pass
-                            else:
-                                msg = "'outputEnabled' is not a valid boolean"
-                                self._raise_configure_scan_fatal_error(msg)
-
-                            if isinstance(searchBeam["averaging_interval"], int):
-                                pass
-                            else:
-                                msg = "'averagingInterval' is not a valid integer"
-                                self._raise_configure_scan_fatal_error(msg)
-
-                            if validate_ip(searchBeam["search_beam_destination_address"]):
-                                pass
-                            else:
-                                msg = "'searchBeamDestinationAddress' is not a valid IP address"
-                                self._raise_configure_scan_fatal_error(msg)
+    def _configure_fsp(self, fsp, payload, setup=True):
+        """
+        Set up one FSP for this subarray and configure its FSP Subarray
+        device. Runs on a ConfigureScan worker thread, so it never raises;
+        failures are returned to the caller instead.
+
+        :param fsp: the (augmented) fsp configuration
+        :param payload: the fsp configuration, serialized
+        :param setup: False if the FSP is already set up for this subarray
+            in the same function mode; only ConfigureScan is called then
+        :return: tuple of (state change event IDs, step timings in s, error
+            message or None)
+        """
+        fspID = int(fsp["fsp_id"])
+        proxy_fsp = self._proxies_fsp[fspID - 1]
+        proxy_fsp_subarray = self._fsp_subarray_proxy(fspID, fsp["function_mode"])
 
-                    else:
-                        msg = "More than 192 SearchBeams defined in PSS-BF config"
-                        self._raise_configure_scan_fatal_error(msg)
-                
-                # --------------------------------------------------------
+        event_ids = []
+        timings = {}
+        step = "AddSubarrayMembership"
+        try:
+            if setup:
+                start_time = time.time()
+                # change FSP subarray membership
+                proxy_fsp.AddSubarrayMembership(self._subarray_id)
+                timings[step] = time.time() - start_time
 
-                ########## PST-BF ##########
-                # TODO currently only CORR function mode is supported outside of Mid.CBF MCS
-                if fsp["function_mode"] == "PST-BF":
-                    if len(fsp["timing_beam"]) <= 16:
-                        for timingBeam in fsp["timing_beam"]:
-                            if 1 <= int(timingBeam["timing_beam_id"]) <= 16:
-                                pass
-                            else:  # timingBeamID not in valid range
-                                msg = "'timingBeamID' must be within range 1-16 (received {}).".format(
-                                    str(timingBeam["timing_beam_id"])
-                                )
-                                self._raise_configure_scan_fatal_error(msg)
-                            for fsp_pst_subarray_proxy in self._proxies_fsp_pst_subarray:
-                                timingBeamID = fsp_pst_subarray_proxy.timingBeamID
-                                if timingBeamID is None:
-                                    pass
-                                else:
-                                    for timing_beam_ID in timingBeamID:
-                                        if int(timingBeam["timing_beam_id"]) != timing_beam_ID:
-                                            pass
-                                        elif fsp_pst_subarray_proxy.obsState == ObsState.IDLE:
-                                            pass
-                                        else:
-                                            msg = "'timingBeamID' {} is already being used on another fspSubarray.".format(
-                                                str(timingBeam["timing_beam_id"])
-                                            )
-                                            self._raise_configure_scan_fatal_error(msg)
-
-                            # Validate receptors.
-                            # This is always given, due to implementation details.
-                            if "receptor_ids" in timingBeam:
-                                for this_rec in timingBeam["receptor_ids"]:
-                                    if this_rec not in self._receptors:
-                                        msg = ("Receptor {} does not belong to subarray {}.".format(
-                                            str(self._receptors[this_rec]), str(self._subarray_id)))
-                                        self.logger.error(msg)
-                                        self._raise_configure_scan_fatal_error(msg)
-                            else:
-                                timingBeam["receptor_ids"] = self._receptors
-
-                            if timingBeam["enable_output"] is False or timingBeam["enable_output"] is True:
-                                pass
-                            else:
-                                msg = "'outputEnabled' is not a valid boolean"
-                                self._raise_configure_scan_fatal_error(msg)
-
-                            if validate_ip(timingBeam["timing_beam_destination_address"]):
-                                pass
-                            else:
-                                msg = "'timingBeamDestinationAddress' is not a valid IP address"
-                                self._raise_configure_scan_fatal_error(msg)
+                # Configure functionMode.
+                step = "SetFunctionMode"
+                start_time = time.time()
+                proxy_fsp.SetFunctionMode(fsp["function_mode"])
+                timings[step] = time.time() - start_time
 
-                    else:
-                        msg = "More than 16 TimingBeams defined in PST-BF config"
-                        self._raise_configure_scan_fatal_error(msg)
+                # subscribe to FSP state and healthState changes
+                step = "subscribe_event"
+                start_time = time.time()
+                for attr_name in ["State", "healthState"]:
+                    event_ids.append(proxy_fsp.subscribe_event(
+                        attr_name,
+                        tango.EventType.CHANGE_EVENT,
+                        self._state_change_event_callback
+                    ))
+                timings[step] = time.time() - start_time
+
+            if proxy_fsp_subarray is not None:
+                step = "ConfigureScan"
+                start_time = time.time()
+                proxy_fsp_subarray.ConfigureScan(payload)
+                timings[step] = time.time() - start_time
+        except tango.DevFailed as df:
+            msg = "FSP {} ({}) failed in {}: {}".format(
+                fspID, fsp["function_mode"], step, str(df.args[0].desc))
+            return event_ids, timings, msg
+
+        return event_ids, timings, None
+
+    def _read_vcc_memberships(self, vccIDs):
+        """
+        Read the subarrayMembership of several VCCs with one grouped read.
 
-            except tango.DevFailed:  # exception in ConfigureScan
-                msg = "An exception occurred while configuring FSPs:\n{}\n" \
-                        "Aborting configuration".format(sys.exc_info()[1].args[0].desc)
+        :return: tuple of (dict of vccID:subarrayID, list of error messages)
+        """
+        vcc_ids_by_fqdn = {self._fqdn_vcc[vccID - 1].lower(): vccID for vccID in vccIDs}
+        group = tango.Group("VCC membership")
+        for fqdn in vcc_ids_by_fqdn:
+            group.add(fqdn)
+
+        memberships = {}
+        errs = []
+        for reply in group.read_attribute("subarrayMembership"):
+            vccID = vcc_ids_by_fqdn[reply.dev_name().lower()]
+            if reply.has_failed():
+                errs.append("Failed to read subarray membership of VCC {}: {}".format(
+                    vccID, reply.get_err_stack()[0].desc))
+            else:
+                memberships[vccID] = reply.get_data().value
+        return memberships, errs
 
-                self._raise_configure_scan_fatal_error(msg)
+    def _assign_vcc(self, receptorID, vccID):
+        """
+        Assign the VCC of a receptor to this subarray and subscribe to its
+        state. Runs on a worker thread; on failure, whatever was done is
+        undone before raising.
 
-        # At this point, everything has been validated.
+        :return: the state change event IDs
+        :raise tango.DevFailed: if the VCC could not be assigned
+        """
+        vccProxy = self._proxies_vcc[vccID - 1]
+        event_ids = []
+        try:
+            vccProxy.receptorID = receptorID  # TODO - may not be needed?
+            vccProxy.subarrayMembership = self._subarray_id
 
-    def _raise_configure_scan_fatal_error(self, msg):
-        self.logger.error(msg)
-        tango.Except.throw_exception("Command failed", msg, "ConfigureScan execution",
-                                     tango.ErrSeverity.ERR)
+            # subscribe to VCC state and healthState changes
+            for attr_name in ["State", "healthState"]:
+                event_ids.append(vccProxy.subscribe_event(
+                    attr_name,
+                    tango.EventType.CHANGE_EVENT,
+                    self._state_change_event_callback
+                ))
+        except tango.DevFailed:
+            self._release_vcc(vccID, event_ids)
+            raise
+        return event_ids
+
+    def _release_vcc(self, vccID, event_ids):
+        """
+        Unsubscribe from the state of a VCC and reset its receptorID and
+        subarrayMembership. Runs on a worker thread, so it never raises.
+        """
+        vccProxy = self._proxies_vcc[vccID - 1]
+        try:
+            for event_id in event_ids:
+                vccProxy.unsubscribe_event(event_id)
+
+            # reset receptorID and subarrayMembership Vcc attribute:
+            vccProxy.receptorID = 0
+            vccProxy.subarrayMembership = 0
+        except tango.DevFailed as df:
+            log_msg = "Failed to release VCC {}: {}".format(vccID, df.args[0].desc)
+            self.logger.error(log_msg)
+        self._vcc_state.pop(self._fqdn_vcc[vccID - 1], None)
+        self._vcc_health_state.pop(self._fqdn_vcc[vccID - 1], None)
+
+    def _set_receptor_command_progress(self, done, total):
+        self._receptor_command_progress = int(100 * done / total) if total else 100
+        self.push_change_event("receptorCommandProgress", self._receptor_command_progress)
 
     # PROTECTED REGION END #    //  CbfSubarray.class_variable
 
@@ -976,27 +821,29 @@ class CbfSubarray(SKASubarray):
         self._scan_ID = 0
         self._frequency_band = 0
 
-        # unsubscribe from TMC events
-        for event_id in list(self._events_telstate.keys()):
-            self._events_telstate[event_id].unsubscribe_event(event_id)
-        self._events_telstate = {}
+        self._reset_model_state()
+
+        # the next configuration is built from scratch
+        self._scan_config = None
+
+        # ignore TMC events from now on; the subscriptions are kept for reuse
+        self._telstate_pool.begin_generation()
 
         # unsubscribe from FSP state change events
         for fspID in list(self._events_state_change_fsp.keys()):
             proxy_fsp = self._proxies_fsp[fspID - 1]
-            proxy_fsp.unsubscribe_event(self._events_state_change_fsp[fspID][0])  # state
-            proxy_fsp.unsubscribe_event(self._events_state_change_fsp[fspID][1])  # healthState
+            # state and healthState; may be partial if the FSP failed to configure
+            for event_id in self._events_state_change_fsp[fspID]:
+                proxy_fsp.unsubscribe_event(event_id)
             del self._events_state_change_fsp[fspID]
-            del self._fsp_state[self._fqdn_fsp[fspID - 1]]
-            del self._fsp_health_state[self._fqdn_fsp[fspID - 1]]
+            self._fsp_state.pop(self._fqdn_fsp[fspID - 1], None)
+            self._fsp_health_state.pop(self._fqdn_fsp[fspID - 1], None)
 
-        # send assigned VCCs and FSP subarrays to IDLE state
+        # send assigned VCCs and FSP subarrays (CORR, PSS and PST) to IDLE
+        # state, all at once
         # TODO: check if vcc fsp is in scanning state (subarray 
         # could be aborted in scanning state) - is this needed?
-        self._group_vcc.command_inout("GoToIdle")
-        self._group_fsp_corr_subarray.command_inout("GoToIdle")
-        self._group_fsp_pss_subarray.command_inout("GoToIdle")
-        self._group_fsp_pst_subarray.command_inout("GoToIdle")
+        self._command_vcc_and_fsp_subarrays("GoToIdle")
 
         # change FSP subarray membership
         data = tango.DeviceData()
@@ -1015,53 +862,125 @@ class CbfSubarray(SKASubarray):
         # reset all private dat to their initialization values:
         self._scan_ID = 0       
         self._config_ID = ""
-        self._last_received_delay_model  = "{}"
+
+    def _reset_model_state(self):
+        """
+        Drop the delay models, Jones matrices and beam weights of the
+        previous configuration: the ones still waiting for their delivery
+        time, and the last received ones, so that the same models received
+        again are not ignored. The VCCs drop the ones they staged on
+        GoToIdle or ConfigureScan.
+        """
+        self._model_scheduler.cancel_pending()
+        self._last_received_delay_model = "{}"
         self._last_received_jones_matrix = "{}"
         self._last_received_beam_weights = "{}"
 
-        # TODO: need to add 'GoToIdle' for VLBI and PST once implemented:
-        # TODO: what happens if 
-        # #     sp_corr_subarray_proxy.State() == tango.DevState.OFF ??
-        #       that should not happen
-        for fsp_corr_subarray_proxy in self._proxies_fsp_corr_subarray:
-            if fsp_corr_subarray_proxy.State() == tango.DevState.ON:
-                fsp_corr_subarray_proxy.GoToIdle()
-        for fsp_pss_subarray_proxy in self._proxies_fsp_pss_subarray:
-            if fsp_pss_subarray_proxy.State() == tango.DevState.ON:
-                fsp_pss_subarray_proxy.GoToIdle()
-        for fsp_pst_subarray_proxy in self._proxies_fsp_pst_subarray:
-            if fsp_pst_subarray_proxy.State() == tango.DevState.ON:
-                fsp_pst_subarray_proxy.GoToIdle()
+    def _command_vcc_and_fsp_subarrays(self, command_name, data=None):
+        """
+        Send a command to the assigned VCCs and the FSP Subarrays (CORR, PSS
+        and PST) at once, and collect the replies within GroupCommandTimeout.
+        The report is kept for the lastGroupCommandReport attribute.
+
+        :return: the GroupCommandReport
+        """
+        report = group_command_inout(
+            [
+                self._group_vcc,
+                self._group_fsp_corr_subarray,
+                self._group_fsp_pss_subarray,
+                self._group_fsp_pst_subarray
+            ],
+            command_name,
+            data,
+            deadline=self.GroupCommandTimeout,
+            logger=self.logger
+        )
+        self._last_group_command_report = report
+        return report
+
+    def _release_fsp(self, fspID, function_mode):
+        """
+        Release a single FSP from this subarray: unsubscribe from its events,
+        send its FSP Subarray to IDLE, and remove its membership and group
+        entries.
+        """
+        proxy_fsp = self._proxies_fsp[fspID - 1]
+        for event_id in self._events_state_change_fsp.pop(fspID, []):
+            proxy_fsp.unsubscribe_event(event_id)
+        self._fsp_state.pop(self._fqdn_fsp[fspID - 1], None)
+        self._fsp_health_state.pop(self._fqdn_fsp[fspID - 1], None)
+
+        proxy_fsp_subarray = self._fsp_subarray_proxy(fspID, function_mode)
+        if proxy_fsp_subarray is not None:
+            proxy_fsp_subarray.GoToIdle()
+        proxy_fsp.RemoveSubarrayMembership(self._subarray_id)
+
+        self._group_fsp.remove(self._fqdn_fsp[fspID - 1])
+        self._group_fsp_corr_subarray.remove(self._fqdn_fsp_corr_subarray[fspID - 1])
+        self._group_fsp_pss_subarray.remove(self._fqdn_fsp_pss_subarray[fspID - 1])
+        self._group_fsp_pst_subarray.remove(self._fqdn_fsp_pst_subarray[fspID - 1])
+
+    def _deconfigure_changes(self, active_config, scan_config):
+        """
+        Helper function for incremental reconfiguration: release only what
+        differs between the active and the new scan configuration. FSPs that
+        did not change are kept.
+
+        :return: dict of fspID:"added"|"changed" for the FSPs that need to be
+            configured; "changed" FSPs only need a new ConfigureScan
+        """
+        active_fsps = {fsp["fsp_id"]: fsp for fsp in active_config.fsp}
+        new_fsps = {fsp["fsp_id"]: fsp for fsp in scan_config.fsp}
+
+        fsp_changes = {}
+        for fspID, fsp in active_fsps.items():
+            new_fsp = new_fsps.get(fspID)
+            if new_fsp is None or new_fsp["function_mode"] != fsp["function_mode"]:
+                self._release_fsp(fspID, fsp["function_mode"])
+            elif new_fsp != fsp:
+                fsp_changes[fspID] = "changed"
+        for fspID in new_fsps:
+            if fspID not in active_fsps or \
+                    new_fsps[fspID]["function_mode"] != active_fsps[fspID]["function_mode"]:
+                fsp_changes[fspID] = "added"
+
+        log_msg = "Incremental reconfiguration: {} of {} FSP(s) to configure".format(
+            len(fsp_changes), len(new_fsps))
+        self.logger.info(log_msg)
+        return fsp_changes
 
     def _remove_receptors_helper(self, argin):
         """Helper function to remove receptors for removeAllReceptors. 
         Takes in a list of integers.
         """
-        receptor_to_vcc = dict([*map(int, pair.split(":"))] for pair in
-                               self._proxy_cbf_controller.receptorToVcc)
+        removed = []  # receptorID, in the order given
         for receptorID in argin:
-            if receptorID in self._receptors:
-                vccID = receptor_to_vcc[receptorID]
-                vccProxy = self._proxies_vcc[vccID - 1]
-
-                # unsubscribe from events
-                vccProxy.unsubscribe_event(self._events_state_change_vcc[vccID][0])  # state
-                vccProxy.unsubscribe_event(self._events_state_change_vcc[vccID][1])  # healthState
-                del self._events_state_change_vcc[vccID]
-                del self._vcc_state[self._fqdn_vcc[vccID - 1]]
-                del self._vcc_health_state[self._fqdn_vcc[vccID - 1]]
-
-                # reset receptorID and subarrayMembership Vcc attribute:
-                vccProxy.receptorID = 0
-                vccProxy.subarrayMembership = 0
-
-                self._receptors.remove(receptorID)
-                self._proxies_assigned_vcc.remove(vccProxy)
-                self._group_vcc.remove(self._fqdn_vcc[vccID - 1])
+            if receptorID in self._receptors and receptorID not in removed:
+                removed.append(receptorID)
             else:
                 log_msg = "Receptor {} not assigned to subarray. Skipping.".format(str(receptorID))
                 self.logger.warn(log_msg)
 
+        # release the VCCs concurrently
+        vcc_ids = [self._assigned_vcc_id[receptorID] for receptorID in removed]
+        self._set_receptor_command_progress(0, len(vcc_ids))
+        with ThreadPoolExecutor(max_workers=max(1, self.ReceptorCommandWorkers)) as executor:
+            futures = [
+                executor.submit(self._release_vcc, vccID, self._events_state_change_vcc[vccID])
+                for vccID in vcc_ids
+            ]
+            for done, _ in enumerate(as_completed(futures), 1):
+                self._set_receptor_command_progress(done, len(vcc_ids))
+
+        for receptorID, vccID in zip(removed, vcc_ids):
+            del self._events_state_change_vcc[vccID]
+            self._receptors.remove(receptorID)
+            self._proxies_assigned_vcc.remove(self._proxies_vcc[vccID - 1])
+            del self._assigned_vcc_id[receptorID]
+            self._vcc_delay_model_latency.pop(vccID, None)
+            self._group_vcc.remove(self._fqdn_vcc[vccID - 1])
+
         # transitions to EMPTY if not assigned any receptors
         if not self._receptors:
             self._update_obs_state(ObsState.EMPTY)
@@ -1137,6 +1056,64 @@ class CbfSubarray(SKASubarray):
         dtype=('str',)
     )
 
+    ModelStagingLead = device_property(
+        dtype='double',
+        doc="Time (in s) before their epoch at which delay models, Jones matrices and "
+            "beam weights are sent to the VCCs and FSPs, which stage them and activate "
+            "them at the epoch; 0 to send them at the epoch, to be applied on receipt. "
+            "When not 0, the updates are sent wrapped with their epoch, as "
+            "{\"epoch\": ..., \"delayDetails\": ...} (\"matrixDetails\", "
+            "\"beamWeightsDetails\") or, for binary delay models, as rows preceded by "
+            "the epoch",
+        default_value=2.0
+    )
+
+    DelayModelHistoryLength = device_property(
+        dtype='DevULong',
+        doc="Number of VCC delay model entries (one per receptor and frequency slice) "
+            "received and kept in the delay model history",
+        default_value=16384
+    )
+
+    ModelDeliveryWorkers = device_property(
+        dtype='uint16',
+        doc="Number of worker threads delivering delay models, Jones matrices and beam weights; "
+            "there are 5 delivery lanes, so more workers are never used",
+        default_value=5
+    )
+
+    ConfigureScanWorkers = device_property(
+        dtype='uint16',
+        doc="Maximum number of FSPs configured concurrently by ConfigureScan",
+        default_value=8
+    )
+
+    IncrementalReconfiguration = device_property(
+        dtype='bool',
+        doc="If True, ConfigureScan in READY only reconfigures the FSPs and "
+            "subscriptions that differ from the active configuration",
+        default_value=False
+    )
+
+    ReceptorCommandWorkers = device_property(
+        dtype='uint16',
+        doc="Maximum number of VCCs updated concurrently by AddReceptors and RemoveReceptors",
+        default_value=16
+    )
+
+    GroupCommandTimeout = device_property(
+        dtype='double',
+        doc="Time (in s) to wait for the replies of the VCCs and FSP Subarrays to "
+            "Scan, EndScan, GoToIdle and Abort",
+        default_value=3.0
+    )
+
+    ConfigureScanTimingsHistory = device_property(
+        dtype='uint16',
+        doc="Number of ConfigureScan stage breakdowns kept in configureScanTimings",
+        default_value=20
+    )
+
     # ----------
     # Attributes
     # ----------
@@ -1220,6 +1197,111 @@ class CbfSubarray(SKASubarray):
         doc="for storing lastest scan configuration",
     )
 
+    modelQueueDepth = attribute(
+        dtype='uint',
+        label="Model queue depth",
+        doc="Number of delay models, Jones matrices and beam weights waiting for their epoch",
+    )
+
+    modelNextEpoch = attribute(
+        dtype='double',
+        label="Next model epoch",
+        unit="s",
+        doc="Epoch of the next queued model update; 0 if the queue is empty",
+    )
+
+    vccDelayModelLatency = attribute(
+        dtype=('double',),
+        max_dim_x=197,
+        label="VCC delay model latency",
+        unit="s",
+        doc="Latency of the last delay model delivery to the VCC of each assigned receptor, "
+            "in the same order as the receptors attribute",
+    )
+
+    modelLateDeliveries = attribute(
+        dtype='uint',
+        label="Late model deliveries",
+        doc="Number of model updates whose delivery started more than 0.1 s after their "
+            "delivery deadline (epoch minus ModelStagingLead)",
+    )
+
+    modelLatenessHistogram = attribute(
+        dtype=('uint',),
+        max_dim_x=16,
+        label="Model lateness histogram",
+        polling_period=1000,
+        abs_change=1,
+        doc="Number of model updates per lateness bucket, the lateness being the "
+            "completion time of the delivery minus its deadline (epoch minus "
+            "ModelStagingLead); the first bucket counts the deliveries completed ahead "
+            "of their deadline, and the bucket upper edges are in modelDeliveryTelemetry",
+    )
+
+    modelArrivedLate = attribute(
+        dtype='uint',
+        label="Models arrived late",
+        polling_period=1000,
+        abs_change=1,
+        doc="Number of model updates received after their epoch had already passed",
+    )
+
+    modelLaneLockTimes = attribute(
+        dtype='str',
+        label="Model delivery lane lock times",
+        doc="Per delivery lane (model type/destination type): number of deliveries "
+            "and lock hold and wait times (in s), as JSON",
+    )
+
+    modelDeliveryTelemetry = attribute(
+        dtype='str',
+        label="Model delivery telemetry",
+        polling_period=1000,
+        doc="Per model type: arrival, epoch, deadline, issue and completion time of "
+            "the last update, lateness histogram and late arrivals, as JSON",
+    )
+
+    telstateSubscribeCount = attribute(
+        dtype='uint',
+        label="Telstate subscriptions created",
+        doc="Number of subscriptions to telstate attributes created",
+    )
+
+    telstateReuseCount = attribute(
+        dtype='uint',
+        label="Telstate subscriptions reused",
+        doc="Number of times an existing telstate subscription was reused by a configuration",
+    )
+
+    fspConfigureTimings = attribute(
+        dtype='str',
+        label="FSP configure timings",
+        doc="Per-FSP duration (in s) of each step of the last ConfigureScan, as JSON",
+    )
+
+    receptorCommandProgress = attribute(
+        dtype='uint16',
+        label="Receptor command progress",
+        max_value=100,
+        min_value=0,
+        doc="Percentage of the VCCs updated by the running (or last) AddReceptors, "
+            "RemoveReceptors or RemoveAllReceptors command",
+    )
+
+    lastGroupCommandReport = attribute(
+        dtype='str',
+        label="Last group command report",
+        doc="Success, latency (in s) and error of every VCC and FSP Subarray for the "
+            "last Scan, EndScan or GoToIdle sent to them, as JSON",
+    )
+
+    configureScanTimings = attribute(
+        dtype='str',
+        label="ConfigureScan timings",
+        doc="Duration (in s) of each stage of the last ConfigureScan commands, "
+            "with the rolling p50/p95/max per stage, as JSON",
+    )
+
 
     # ---------------
     # General methods
@@ -1281,10 +1363,30 @@ class CbfSubarray(SKASubarray):
             device._last_received_delay_model = "{}"
             device._last_received_jones_matrix = "{}"
             device._last_received_beam_weights = "{}"
-
-            device._mutex_delay_model_config = Lock()
-            device._mutex_jones_matrix_config = Lock()
-            device._mutex_beam_weights_config = Lock()
+            # every VCC delay model received, for EvaluateDelay
+            device._delay_model_history = DelayModelHistory(device.DelayModelHistoryLength)
+
+            # one delivery lane per (model type, destination type); the
+            # scheduler keys are the same, so each lane delivers in epoch order
+            device._delivery_locks = {
+                lane: TimedLock("/".join(lane)) for lane in [
+                    ("delay_model", "vcc"),
+                    ("delay_model", "fsp"),
+                    ("jones_matrix", "vcc"),
+                    ("jones_matrix", "fsp"),
+                    ("beam_weights", "fsp"),
+                ]
+            }
+
+            # delay models, Jones matrices and beam weights are queued by epoch
+            # and delivered by a small pool of workers
+            device._model_scheduler = EpochScheduler(
+                "CbfSubarray{}-models".format(device._subarray_id),
+                num_workers=device.ModelDeliveryWorkers,
+                logger=device.logger
+            )
+            # timeline and lateness of the model deliveries
+            device._delivery_telemetry = DeliveryTelemetry()
 
             # for easy device-reference
             device._frequency_band_offset_stream_1 = 0
@@ -1294,6 +1396,18 @@ class CbfSubarray(SKASubarray):
             # device proxy for easy reference to CBF controller
             device._proxy_cbf_controller = tango.DeviceProxy(device.CbfControllerAddress)
 
+            # local replica of the controller receptor to VCC map
+            device._receptor_to_vcc = ReceptorVccMap(
+                read=lambda: device._proxy_cbf_controller.receptorToVccMap,
+                logger=device.logger
+            )
+            device._event_receptor_to_vcc = device._proxy_cbf_controller.subscribe_event(
+                "receptorToVccMap",
+                tango.EventType.CHANGE_EVENT,
+                device._receptor_to_vcc.on_change_event,
+                stateless=True
+            )
+
             device.MIN_INT_TIME = const.MIN_INT_TIME
             device.NUM_CHANNEL_GROUPS = const.NUM_CHANNEL_GROUPS
             device.NUM_FINE_CHANNELS = const.NUM_FINE_CHANNELS
@@ -1305,12 +1419,30 @@ class CbfSubarray(SKASubarray):
 
             device._count_vcc = int(device._controller_max_capabilities["VCC"])
             device._count_fsp = int(device._controller_max_capabilities["FSP"])
+
+            # compiled once; used by every ConfigureScan
+            device._scan_config_validator = ScanConfigurationValidator(
+                device._count_fsp,
+                device.MIN_INT_TIME,
+                device.NUM_FINE_CHANNELS,
+                device.NUM_CHANNEL_GROUPS
+            )
             device._fqdn_vcc = list(device.VCC)[:device._count_vcc]
             device._fqdn_fsp = list(device.FSP)[:device._count_fsp]
             device._fqdn_fsp_corr_subarray = list(device.FspCorrSubarray)
             device._fqdn_fsp_pss_subarray = list(device.FspPssSubarray)
             device._fqdn_fsp_pst_subarray = list(device.FspPstSubarray)
 
+            # (device, attribute) -> state dict entry, for _state_change_event_callback
+            device._event_dispatch = EventDispatchTable()
+            for fqdns, states, health_states in [
+                (device._fqdn_vcc, device._vcc_state, device._vcc_health_state),
+                (device._fqdn_fsp, device._fsp_state, device._fsp_health_state),
+            ]:
+                for fqdn in fqdns:
+                    device._event_dispatch.register(fqdn, "State", states, fqdn)
+                    device._event_dispatch.register(fqdn, "healthState", health_states, fqdn)
+
             device._proxies_vcc = [*map(tango.DeviceProxy, device._fqdn_vcc)]
             device._proxies_fsp = [*map(tango.DeviceProxy, device._fqdn_fsp)]
             device._proxies_fsp_corr_subarray = [*map(tango.DeviceProxy, device._fqdn_fsp_corr_subarray)]
@@ -1319,10 +1451,22 @@ class CbfSubarray(SKASubarray):
 
             # Note vcc connected both individual and in group
             device._proxies_assigned_vcc = [] 
+            # maps the assigned receptors to their VCC, as receptorID:vccID
+            device._assigned_vcc_id = {}
+            # latency (in s) of the last delay model delivery, as vccID:latency
+            device._vcc_delay_model_latency = {}
             device._proxies_assigned_fsp = []
 
-            # store the subscribed telstate events as event_ID:attribute_proxy key:value pairs
-            device._events_telstate = {}
+            # telstate subscriptions, kept across configurations for reuse
+            device._telstate_pool = SubscriptionPool(
+                "CbfSubarray{}-telstate".format(device._subarray_id),
+                logger=device.logger
+            )
+            # points acquired by the last configuration, released by the next
+            device._telstate_points = []
+
+            # the active scan configuration (a ScanConfiguration), None if not configured
+            device._scan_config = None
 
             # store the subscribed state change events as vcc_ID:[event_ID, event_ID] key:value pairs
             device._events_state_change_vcc = {}
@@ -1330,6 +1474,20 @@ class CbfSubarray(SKASubarray):
             # store the subscribed state change events as fsp_ID:[event_ID, event_ID] key:value pairs
             device._events_state_change_fsp = {}
 
+            # duration of each step of the last FSP configuration, as fsp_ID:{step:seconds}
+            device._fsp_configure_timings = {}
+
+            # progress of AddReceptors/RemoveReceptors, pushed as change events
+            device._receptor_command_progress = 100
+            device.set_change_event("receptorCommandProgress", True, False)
+
+            # outcome of the last command fanned out to the VCCs and FSP Subarrays
+            device._last_group_command_report = None
+
+            # stage breakdowns of the last ConfigureScan commands
+            device._configure_scan_timings = StageTimingHistory(
+                device.ConfigureScanTimingsHistory)
+
             # initialize groups
             device._group_vcc = tango.Group("VCC")
             device._group_fsp = tango.Group("FSP")
@@ -1349,7 +1507,12 @@ class CbfSubarray(SKASubarray):
         # PROTECTED REGION ID(CbfSubarray.delete_device) ENABLED START #
         """hook to delete device. Set State to DISABLE, romove all receptors, go to OBsState IDLE"""
 
-        pass
+        if hasattr(self, "_model_scheduler"):
+            self._model_scheduler.stop()
+        if hasattr(self, "_telstate_pool"):
+            self._telstate_pool.close()
+        if hasattr(self, "_event_receptor_to_vcc"):
+            self._proxy_cbf_controller.unsubscribe_event(self._event_receptor_to_vcc)
         # PROTECTED REGION END #    //  CbfSubarray.delete_device
 
     # ------------------
@@ -1424,6 +1587,97 @@ class CbfSubarray(SKASubarray):
         return self._latest_scan_config
         # PROTECTED REGION END #    //  CbfSubarray.latestScanConfig_read
 
+    def read_modelQueueDepth(self):
+        # PROTECTED REGION ID(CbfSubarray.modelQueueDepth_read) ENABLED START #
+        """Return the number of model updates waiting for their epoch."""
+        return self._model_scheduler.queue_depth
+        # PROTECTED REGION END #    //  CbfSubarray.modelQueueDepth_read
+
+    def read_modelNextEpoch(self):
+        # PROTECTED REGION ID(CbfSubarray.modelNextEpoch_read) ENABLED START #
+        """Return the epoch of the next queued model update (0 if none)."""
+        return self._model_scheduler.next_epoch
+        # PROTECTED REGION END #    //  CbfSubarray.modelNextEpoch_read
+
+    def read_vccDelayModelLatency(self):
+        # PROTECTED REGION ID(CbfSubarray.vccDelayModelLatency_read) ENABLED START #
+        """Return the last delay model delivery latency of each assigned VCC."""
+        return [
+            self._vcc_delay_model_latency.get(self._assigned_vcc_id[receptorID], 0.0)
+            for receptorID in self._receptors
+        ]
+        # PROTECTED REGION END #    //  CbfSubarray.vccDelayModelLatency_read
+
+    def read_modelLateDeliveries(self):
+        # PROTECTED REGION ID(CbfSubarray.modelLateDeliveries_read) ENABLED START #
+        """Return the number of model updates delivered late for their deadline."""
+        return self._model_scheduler.late_count
+        # PROTECTED REGION END #    //  CbfSubarray.modelLateDeliveries_read
+
+    def read_modelLatenessHistogram(self):
+        # PROTECTED REGION ID(CbfSubarray.modelLatenessHistogram_read) ENABLED START #
+        """Return the number of model updates per lateness bucket."""
+        return self._delivery_telemetry.histogram()
+        # PROTECTED REGION END #    //  CbfSubarray.modelLatenessHistogram_read
+
+    def read_modelArrivedLate(self):
+        # PROTECTED REGION ID(CbfSubarray.modelArrivedLate_read) ENABLED START #
+        """Return the number of model updates received after their epoch."""
+        return self._delivery_telemetry.arrived_late_count()
+        # PROTECTED REGION END #    //  CbfSubarray.modelArrivedLate_read
+
+    def read_modelLaneLockTimes(self):
+        # PROTECTED REGION ID(CbfSubarray.modelLaneLockTimes_read) ENABLED START #
+        """Return the lock hold and wait times of each delivery lane, as JSON."""
+        return json.dumps({
+            lock.name: lock.statistics() for lock in self._delivery_locks.values()
+        })
+        # PROTECTED REGION END #    //  CbfSubarray.modelLaneLockTimes_read
+
+    def read_modelDeliveryTelemetry(self):
+        # PROTECTED REGION ID(CbfSubarray.modelDeliveryTelemetry_read) ENABLED START #
+        """Return the model delivery telemetry, as JSON."""
+        return json.dumps(self._delivery_telemetry.to_dict())
+        # PROTECTED REGION END #    //  CbfSubarray.modelDeliveryTelemetry_read
+
+    def read_telstateSubscribeCount(self):
+        # PROTECTED REGION ID(CbfSubarray.telstateSubscribeCount_read) ENABLED START #
+        """Return the number of telstate subscriptions created."""
+        return self._telstate_pool.subscribe_count
+        # PROTECTED REGION END #    //  CbfSubarray.telstateSubscribeCount_read
+
+    def read_telstateReuseCount(self):
+        # PROTECTED REGION ID(CbfSubarray.telstateReuseCount_read) ENABLED START #
+        """Return the number of times a telstate subscription was reused."""
+        return self._telstate_pool.reuse_count
+        # PROTECTED REGION END #    //  CbfSubarray.telstateReuseCount_read
+
+    def read_fspConfigureTimings(self):
+        # PROTECTED REGION ID(CbfSubarray.fspConfigureTimings_read) ENABLED START #
+        """Return the per-FSP step timings of the last ConfigureScan, as JSON."""
+        return json.dumps(self._fsp_configure_timings)
+        # PROTECTED REGION END #    //  CbfSubarray.fspConfigureTimings_read
+
+    def read_receptorCommandProgress(self):
+        # PROTECTED REGION ID(CbfSubarray.receptorCommandProgress_read) ENABLED START #
+        """Return the progress of the last receptor command, as a percentage."""
+        return self._receptor_command_progress
+        # PROTECTED REGION END #    //  CbfSubarray.receptorCommandProgress_read
+
+    def read_lastGroupCommandReport(self):
+        # PROTECTED REGION ID(CbfSubarray.lastGroupCommandReport_read) ENABLED START #
+        """Return the per-device report of the last group command, as JSON."""
+        if self._last_group_command_report is None:
+            return "{}"
+        return json.dumps(self._last_group_command_report.to_dict())
+        # PROTECTED REGION END #    //  CbfSubarray.lastGroupCommandReport_read
+
+    def read_configureScanTimings(self):
+        # PROTECTED REGION ID(CbfSubarray.configureScanTimings_read) ENABLED START #
+        """Return the stage timings of the last ConfigureScan commands, as JSON."""
+        return json.dumps(self._configure_scan_timings.to_dict())
+        # PROTECTED REGION END #    //  CbfSubarray.configureScanTimings_read
+
     # --------
     # Commands
     # --------
@@ -1596,68 +1850,31 @@ class CbfSubarray(SKASubarray):
             device=self.target
             # Code here
             errs = []  # list of error messages
-            receptor_to_vcc = dict([*map(int, pair.split(":"))] for pair in
-                                device._proxy_cbf_controller.receptorToVcc)
+            requested = {}  # receptorID:vccID, in the order given
             for receptorID in argin:
+                receptorID = int(receptorID)
                 try:
-                    vccID = receptor_to_vcc[receptorID]
-                    vccProxy = device._proxies_vcc[vccID - 1]
-
-                    # Update the VCC receptorID attribute:
-
-                    self.logger.debug( ("receptorID = {}, vccProxy.receptorID = {}"
-                    .format(receptorID, vccProxy.receptorID)))
-
-                    vccProxy.receptorID = receptorID  # TODO - may not be needed?
-
-                    self.logger.debug( ("receptorID = {}, vccProxy.receptorID = {}"
-                    .format(receptorID, vccProxy.receptorID)))
-
-                    subarrayID = vccProxy.subarrayMembership
-
-                    # only add receptor if it does not already belong to a different subarray
+                    vccID = device._receptor_to_vcc.vcc_id(receptorID)
+                except KeyError:  # invalid receptor ID
+                    errs.append("Invalid receptor ID: {}".format(receptorID))
+                    continue
+                if receptorID in device._receptors:
+                    log_msg = "Receptor {} already assigned to current subarray.".format(
+                        str(receptorID))
+                    self.logger.warn(log_msg)
+                else:
+                    requested[receptorID] = vccID
+
+            # only add receptors that do not already belong to a different
+            # subarray; all the memberships are read at once
+            if requested:
+                memberships, read_errs = device._read_vcc_memberships(requested.values())
+                errs += read_errs
+                for receptorID, vccID in requested.items():
+                    subarrayID = memberships.get(vccID, 0)
                     if subarrayID not in [0, device._subarray_id]:
                         errs.append("Receptor {} already in use by subarray {}.".format(
                             str(receptorID), str(subarrayID)))
-                    else:
-                        if receptorID not in device._receptors:
-                            # change subarray membership of vcc
-                            vccProxy.subarrayMembership = device._subarray_id
-
-                            # TODO: is this note still relevant? 
-                            # Note:json does not recognize NumPy data types. 
-                            # Convert the number to a Python int 
-                            # before serializing the object.
-                            # The list of receptors is serialized when the FSPs are 
-                            # configured for a scan.
-
-                            device._receptors.append(int(receptorID))
-                            device._proxies_assigned_vcc.append(vccProxy)
-                            device._group_vcc.add(device._fqdn_vcc[vccID - 1])
-
-                            # subscribe to VCC state and healthState changes
-                            event_id_state = vccProxy.subscribe_event(
-                                "State",
-                                tango.EventType.CHANGE_EVENT,
-                                device._state_change_event_callback
-                            )
-
-                            event_id_health_state = vccProxy.subscribe_event(
-                                "healthState",
-                                tango.EventType.CHANGE_EVENT,
-                                device._state_change_event_callback
-                            )
-
-                            device._events_state_change_vcc[vccID] = [event_id_state,
-                                                                    event_id_health_state]
-                        else:
-                            log_msg = "Receptor {} already assigned to current subarray.".format(
-                                str(receptorID))
-                            self.logger.warn(log_msg)
-
-                except KeyError:  # invalid receptor ID
-                    errs.append("Invalid receptor ID: {}".format(receptorID))
-
 
             if errs:
                 msg = "\n".join(errs)
@@ -1667,6 +1884,47 @@ class CbfSubarray(SKASubarray):
                 
                 return (ResultCode.FAILED, msg)
 
+            # assign the VCCs concurrently; either all of them are assigned or
+            # the ones that were are released again
+            event_ids = {}  # receptorID:[event_ID, event_ID]
+            device._set_receptor_command_progress(0, len(requested))
+            with ThreadPoolExecutor(max_workers=max(1, device.ReceptorCommandWorkers)) as executor:
+                futures = {
+                    executor.submit(device._assign_vcc, receptorID, vccID): receptorID
+                    for receptorID, vccID in requested.items()
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    receptorID = futures[future]
+                    try:
+                        event_ids[receptorID] = future.result()
+                    except tango.DevFailed as df:
+                        errs.append("Failed to assign receptor {}: {}".format(
+                            receptorID, str(df.args[0].desc)))
+                    device._set_receptor_command_progress(done, len(requested))
+
+                if errs:
+                    for receptorID, ids in event_ids.items():
+                        executor.submit(device._release_vcc, requested[receptorID], ids)
+
+            if errs:
+                msg = "\n".join(errs + ["Assignment of receptors {} rolled back.".format(
+                    list(requested))])
+                self.logger.error(msg)
+                return (ResultCode.FAILED, msg)
+
+            for receptorID, vccID in requested.items():
+                # TODO: is this note still relevant? 
+                # Note:json does not recognize NumPy data types. 
+                # Convert the number to a Python int 
+                # before serializing the object.
+                # The list of receptors is serialized when the FSPs are 
+                # configured for a scan.
+                device._receptors.append(receptorID)
+                device._proxies_assigned_vcc.append(device._proxies_vcc[vccID - 1])
+                device._assigned_vcc_id[receptorID] = vccID
+                device._group_vcc.add(device._fqdn_vcc[vccID - 1])
+                device._events_state_change_vcc[vccID] = event_ids[receptorID]
+
             message = "CBFSubarray AddReceptors command completed OK"
             self.logger.info(message)
             return (ResultCode.OK, message)
@@ -1689,6 +1947,31 @@ class CbfSubarray(SKASubarray):
             :rtype: (ResultCode, str)
             """
 
+            device = self.target
+            timer = StageTimer()
+            run_info = {"config_id": None}
+
+            # every run is recorded in configureScanTimings, failed ones
+            # included; the stage that failed is closed as "failed"
+            try:
+                result = self._configure_scan(argin, timer, run_info)
+            except Exception as e:
+                timer.mark("failed")
+                error = e.args[0].desc if isinstance(e, tango.DevFailed) else str(e)
+                device._configure_scan_timings.add(
+                    timer, config_id=run_info["config_id"], result="failed", error=error)
+                raise
+            device._configure_scan_timings.add(
+                timer, config_id=run_info["config_id"], result="ok")
+            return result
+
+        def _configure_scan(self, argin, timer, run_info):
+            """
+            Configure the subarray, marking the stages of the configuration
+            on the timer.
+
+            :param run_info: dict in which the config ID is set once known
+            """
             device = self.target
 
             # Code here
@@ -1700,31 +1983,54 @@ class CbfSubarray(SKASubarray):
             device._pst_fsp_list = []
             device._fsp_list = [[], [], [], []]
 
+            # parse the scan configuration once; everything below works on it
+            try:
+                scan_config = ScanConfiguration(argin, device._receptors)
+            except ValueError as e:
+                msg = "{} Aborting configuration.".format(str(e))
+                device._raise_configure_scan_fatal_error(msg)
+            run_info["config_id"] = scan_config.config_id
+            common_configuration = scan_config.common
+            configuration = scan_config.cbf
+            timer.mark("parse")
+
             # validate scan configuration first 
             try:
-                device._validate_scan_configuration(argin)
+                device._validate_scan_configuration(scan_config)
             except tango.DevFailed as df:
                 self.logger.error(str(df.args[0].desc))
                 self.logger.warn("validate scan configuration error")
                 # device._raise_configure_scan_fatal_error(msg)
-
-            # Call this just to release all FSPs and unsubscribe to events. 
-            # Can't call GoToIdle, otherwise there will be state transition problem. 
-            # TODO - to clarify why can't call GoToIdle
-            device._deconfigure()
+            timer.mark("validate")
+
+            # In incremental mode, only release what changed since the active
+            # configuration; FSPs that are not in fsp_changes are kept as is.
+            active_config = device._scan_config if device.IncrementalReconfiguration else None
+            fsp_changes = None
+            if active_config is not None:
+                # only set again once the new configuration is fully applied
+                device._scan_config = None
+                try:
+                    fsp_changes = device._deconfigure_changes(active_config, scan_config)
+                    device._reset_model_state()
+                except Exception as e:
+                    log_msg = "Incremental reconfiguration failed ({}); " \
+                              "deconfiguring fully".format(e)
+                    self.logger.error(log_msg)
+                    fsp_changes = None
+            if fsp_changes is None:
+                # Call this just to release all FSPs and unsubscribe to events. 
+                # Can't call GoToIdle, otherwise there will be state transition problem. 
+                # TODO - to clarify why can't call GoToIdle
+                device._deconfigure()
+                fsp_changes = {fsp["fsp_id"]: "added" for fsp in scan_config.fsp}
+            timer.mark("deconfigure")
 
             # TODO - to remove
             # data = tango.DeviceData()
             # data.insert(tango.DevUShort, ObsState.CONFIGURING)
             # device._group_vcc.command_inout("SetObservingState", data)
 
-            full_configuration = json.loads(argin)
-            common_configuration = copy.deepcopy(full_configuration["common"])
-            configuration = copy.deepcopy(full_configuration["cbf"])
-            # set band5Tuning to [0,0] if not specified
-            if "band_5_tuning" not in common_configuration: 
-                common_configuration["band_5_tuning"] = [0,0]
-
             # Configure configID.
             device._config_ID = str(common_configuration["config_id"])
 
@@ -1732,11 +2038,8 @@ class CbfSubarray(SKASubarray):
             frequency_bands = ["1", "2", "3", "4", "5a", "5b"]
             device._frequency_band = frequency_bands.index(common_configuration["frequency_band"])
 
-            config_dict = { "config_id": common_configuration["config_id"], 
-                            "frequency_band": common_configuration["frequency_band"] }
-            json_str = json.dumps(config_dict)
             data = tango.DeviceData()
-            data.insert(tango.DevString, json_str)
+            data.insert(tango.DevString, scan_config.vcc_payload)
             device._group_vcc.command_inout("ConfigureScan", data)
 
             # TODO: all these VCC params should be passed in via ConfigureScan()
@@ -1746,74 +2049,41 @@ class CbfSubarray(SKASubarray):
                 device._stream_tuning = stream_tuning
                 device._group_vcc.write_attribute("band5Tuning", stream_tuning)
 
-            # Configure frequencyBandOffsetStream1.
-            if "frequency_band_offset_stream_1" in configuration:
-                device._frequency_band_offset_stream_1 = int(configuration["frequency_band_offset_stream_1"])
-            else:
-                device._frequency_band_offset_stream_1 = 0
-                log_msg = "'frequencyBandOffsetStream1' not specified. Defaulting to 0."
-                self.logger.warn(log_msg)
+            # Configure frequencyBandOffsetStream1 and frequencyBandOffsetStream2.
+            # If not given, they default to 0.
+            device._frequency_band_offset_stream_1 = scan_config.frequency_band_offset_stream_1
             device._group_vcc.write_attribute("frequencyBandOffsetStream1", device._frequency_band_offset_stream_1)
-
-            # Validate frequencyBandOffsetStream2.
-            # If not given, use a default value.
-            # If malformed, use a default value, but append an error.
-            if "frequency_band_offset_stream_2" in configuration:
-                device._frequency_band_offset_stream_2 = int(configuration["frequency_band_offset_stream_2"])
-            else:
-                device._frequency_band_offset_stream_2 = 0
-                log_msg = "'frequencyBandOffsetStream2' not specified. Defaulting to 0."
-                self.logger.warn(log_msg)
+            device._frequency_band_offset_stream_2 = scan_config.frequency_band_offset_stream_2
             device._group_vcc.write_attribute("frequencyBandOffsetStream2", device._frequency_band_offset_stream_2)
-
-            # Configure dopplerPhaseCorrSubscriptionPoint.
-            if "doppler_phase_corr_subscription_point" in configuration:
-                attribute_proxy = tango.AttributeProxy(configuration["doppler_phase_corr_subscription_point"])
-                attribute_proxy.ping()
-                event_id = attribute_proxy.subscribe_event(
-                    tango.EventType.CHANGE_EVENT,
-                    device._doppler_phase_correction_event_callback
-                )
-                device._events_telstate[event_id] = attribute_proxy
-
-            # Configure delayModelSubscriptionPoint.
-            if "delay_model_subscription_point" in configuration:
-                device._last_received_delay_model = "{}"
-                attribute_proxy = tango.AttributeProxy(configuration["delay_model_subscription_point"])
-                attribute_proxy.ping() #To be sure the connection is good(don't know if the device is running)
-                event_id = attribute_proxy.subscribe_event(
-                    tango.EventType.CHANGE_EVENT,
-                    device._delay_model_event_callback
-                )
-                device._events_telstate[event_id] = attribute_proxy
-
-            # Configure jonesMatrixSubscriptionPoint
-            if "jones_matrix_subscription_point" in configuration:
-                device._last_received_jones_matrix = "{}"
-                attribute_proxy = tango.AttributeProxy(configuration["jones_matrix_subscription_point"])
-                attribute_proxy.ping()
-                event_id = attribute_proxy.subscribe_event(
-                    tango.EventType.CHANGE_EVENT,
-                    device._jones_matrix_event_callback
-                )
-                device._events_telstate[event_id] = attribute_proxy
-
-            # Configure beamWeightsSubscriptionPoint
-            if "timing_beam_weights_subscription_point" in configuration:
-                device._last_received_beam_weights= "{}"
-                attribute_proxy = tango.AttributeProxy(configuration["timing_beam_weights_subscription_point"])
-                attribute_proxy.ping()
-                event_id = attribute_proxy.subscribe_event(
-                    tango.EventType.CHANGE_EVENT,
-                    device._beam_weights_event_callback
-                )
-                device._events_telstate[event_id] = attribute_proxy
+            timer.mark("vcc_configure")
+
+            # Configure the telstate subscription points. Subscriptions to
+            # points used by the previous configuration are reused, and only
+            # events for the points of this configuration are passed on; the
+            # points it no longer uses are released afterwards.
+            previous_points = device._telstate_points
+            device._telstate_points = []
+            device._telstate_pool.begin_generation()
+            try:
+                for key, callback in [
+                    ("doppler_phase_corr_subscription_point", device._doppler_phase_correction_event_callback),
+                    ("delay_model_subscription_point", device._delay_model_event_callback),
+                    ("jones_matrix_subscription_point", device._jones_matrix_event_callback),
+                    ("timing_beam_weights_subscription_point", device._beam_weights_event_callback)
+                ]:
+                    if key in configuration:
+                        device._telstate_pool.acquire(configuration[key], callback)
+                        device._telstate_points.append(configuration[key])
+            finally:
+                for fqdn in previous_points:
+                    device._telstate_pool.release(fqdn)
+            timer.mark("telstate_subscribe")
 
             # Configure rfiFlaggingMask.
-            if "rfi_flagging_mask" in configuration:
+            if scan_config.rfi_flagging_mask_payload is not None:
                 device._group_vcc.write_attribute(
                     "rfiFlaggingMask",
-                    json.dumps(configuration["rfi_flagging_mask"])
+                    scan_config.rfi_flagging_mask_payload
                 )
             else:
                 log_msg = "'rfiFlaggingMask' not given. Proceeding."
@@ -1821,21 +2091,15 @@ class CbfSubarray(SKASubarray):
 
             # Configure searchWindow.
             if "search_window" in configuration:
-                for search_window in configuration["search_window"]:
-                    search_window["frequency_band"] = common_configuration["frequency_band"]
-                    search_window["frequency_band_offset_stream_1"] = \
-                        device._frequency_band_offset_stream_1
-                    search_window["frequency_band_offset_stream_2"] = \
-                        device._frequency_band_offset_stream_2
-                    if search_window["frequency_band"] in ["5a", "5b"]:
-                        search_window["band_5_tuning"] = common_configuration["band_5_tuning"]
+                for search_window in scan_config.search_window_payloads:
                     # pass on configuration to VCC
                     data = tango.DeviceData()
-                    data.insert(tango.DevString, json.dumps(search_window))
+                    data.insert(tango.DevString, search_window)
                     device._group_vcc.command_inout("ConfigureSearchWindow", data)
             else:
                 log_msg = "'searchWindow' not given."
                 self.logger.warn(log_msg)
+            timer.mark("search_window")
 
             # TODO: the entire vcc configuration should move to Vcc
             # for now, run ConfigScan only wih the following data, so that
@@ -1844,104 +2108,62 @@ class CbfSubarray(SKASubarray):
 
             ######## FSP #######
             # Configure FSP.
-            for fsp in configuration["fsp"]:
+            # NOTE: the fsp configs already carry configID and the vcc-fsp
+            #       common parameters, and default receptors (see ScanConfiguration)
+            for fsp in scan_config.fsp:
                 # Configure fspID.
                 fspID = int(fsp["fsp_id"])
-                proxy_fsp = device._proxies_fsp[fspID - 1]
 
-                device._group_fsp.add(device._fqdn_fsp[fspID - 1])
-                device._group_fsp_corr_subarray.add(device._fqdn_fsp_corr_subarray[fspID - 1])
-                device._group_fsp_pss_subarray.add(device._fqdn_fsp_pss_subarray[fspID - 1])
-                device._group_fsp_pss_subarray.add(device._fqdn_fsp_pst_subarray[fspID - 1])
-
-                # change FSP subarray membership
-                proxy_fsp.AddSubarrayMembership(device._subarray_id)
-
-                # Configure functionMode.
-                proxy_fsp.SetFunctionMode(fsp["function_mode"])
-
-                # subscribe to FSP state and healthState changes
-                event_id_state, event_id_health_state = proxy_fsp.subscribe_event(
-                    "State",
-                    tango.EventType.CHANGE_EVENT,
-                    device._state_change_event_callback
-                ), proxy_fsp.subscribe_event(
-                    "healthState",
-                    tango.EventType.CHANGE_EVENT,
-                    device._state_change_event_callback
-                )
-                device._events_state_change_fsp[int(fsp["fsp_id"])] = [event_id_state,
-                                                                    event_id_health_state]
-                
-                # Add configID to fsp. It is not included in the "FSP" portion in configScan JSON
-                fsp["config_id"] = common_configuration["config_id"]
-                fsp["frequency_band"] = common_configuration["frequency_band"]
-                fsp["band_5_tuning"] = common_configuration["band_5_tuning"]
-                fsp["frequency_band_offset_stream_1"] = device._frequency_band_offset_stream_1
-                fsp["frequency_band_offset_stream_2"] = device._frequency_band_offset_stream_2
+                if fsp_changes.get(fspID) == "added":
+                    device._group_fsp.add(device._fqdn_fsp[fspID - 1])
+                    device._group_fsp_corr_subarray.add(device._fqdn_fsp_corr_subarray[fspID - 1])
+                    device._group_fsp_pss_subarray.add(device._fqdn_fsp_pss_subarray[fspID - 1])
+                    device._group_fsp_pst_subarray.add(device._fqdn_fsp_pst_subarray[fspID - 1])
 
                 if fsp["function_mode"] == "CORR":
-                    if "receptor_ids" not in fsp:
-                        # TODO In this case by the ICD, all subarray allocated resources should be used.
-                        fsp["receptor_ids"] = [device._receptors[0]]
                     device._corr_config.append(fsp)
                     device._corr_fsp_list.append(fsp["fsp_id"])
                 
                 # TODO currently only CORR function mode is supported outside of Mid.CBF MCS
                 elif fsp["function_mode"] == "PSS-BF":
-                    for searchBeam in fsp["search_beam"]:
-                        if "receptor_ids" not in searchBeam:
-                            # In this case by the ICD, all subarray allocated resources should be used.
-                            searchBeam["receptor_ids"] = device._receptors
                     device._pss_config.append(fsp)
                     device._pss_fsp_list.append(fsp["fsp_id"])
                 elif fsp["function_mode"] == "PST-BF":
-                    for timingBeam in fsp["timing_beam"]:
-                        if "receptor_ids" not in timingBeam:
-                            # In this case by the ICD, all subarray allocated resources should be used.
-                            timingBeam["receptor_ids"] = device._receptors
                     device._pst_config.append(fsp)
                     device._pst_fsp_list.append(fsp["fsp_id"])
 
-            # Call ConfigureScan for all FSP Subarray devices (CORR/PSS/PST)
-
-            # NOTE:_corr_config is a list of fsp config JSON objects, each 
-            #      augmented by a number of vcc-fsp common parameters 
-            #      created by the function _validate_scan_configuration()
-            if len(device._corr_config) != 0: 
-                #device._proxy_corr_config.ConfigureFSP(json.dumps(device._corr_config))
-                # Michelle - WIP - TODO - this is to replace the call to 
-                #  _proxy_corr_config.ConfigureFSP()
-                for this_fsp in device._corr_config:
-                    try:                      
-                        this_proxy = device._proxies_fsp_corr_subarray[int(this_fsp["fsp_id"])-1]
-                        this_proxy.ConfigureScan(json.dumps(this_fsp))
-                    except tango.DevFailed:
-                        msg = "An exception occurred while configuring " \
-                        "FspCorrSubarray; Aborting configuration"
-                        device._raise_configure_scan_fatal_error(msg)
-
-            # NOTE: _pss_config is costructed similarly to _corr_config
-            if len(device._pss_config) != 0:
-                for this_fsp in device._pss_config:
-                    try:
-                        this_proxy = device._proxies_fsp_pss_subarray[int(this_fsp["fsp_id"])-1]
-                        this_proxy.ConfigureScan(json.dumps(this_fsp))
-                    except tango.DevFailed:
-                        msg = "An exception occurred while configuring  " \
-                        "FspPssSubarray; Aborting configuration"
-                        device._raise_configure_scan_fatal_error(msg)
-
-            # NOTE: _pst_config is costructed similarly to _corr_config
-            if len(device._pst_config) != 0:
-                for this_fsp in device._pst_config:
-                    try:
-                        this_proxy = device._proxies_fsp_pst_subarray[int(this_fsp["fsp_id"])-1]
-                        this_proxy.ConfigureScan(json.dumps(this_fsp))
-                    except tango.DevFailed:
-                        msg = "An exception occurred while configuring  " \
-                        "FspPstSubarray; Aborting configuration"
-                        device._raise_configure_scan_fatal_error(msg)
+            # Set up every added FSP (subarray membership, function mode, state 
+            # subscriptions) and call ConfigureScan on the FSP Subarray device
+            # (CORR/PSS/PST) of every added or changed FSP concurrently, on a
+            # bounded pool of workers.
+            all_fsps = scan_config.fsp
+            indexes = [
+                i for i, fsp in enumerate(all_fsps) if fsp["fsp_id"] in fsp_changes
+            ]
+            fsps = [all_fsps[i] for i in indexes]
+            payloads = [scan_config.fsp_payload(i) for i in indexes]
+            setups = [fsp_changes[fsp["fsp_id"]] == "added" for fsp in fsps]
+
+            device._fsp_configure_timings = {}
+            errs = []
+            with ThreadPoolExecutor(max_workers=max(1, device.ConfigureScanWorkers)) as executor:
+                results = executor.map(device._configure_fsp, fsps, payloads, setups)
+                for fsp, (event_ids, timings, err) in zip(fsps, results):
+                    fspID = int(fsp["fsp_id"])
+                    device._fsp_configure_timings[fspID] = timings
+                    if event_ids:
+                        device._events_state_change_fsp[fspID] = event_ids
+                    if err:
+                        errs.append(err)
+            timer.mark("fsp_configure")
+
+            if errs:
+                # release whatever was set up before reporting the failures
+                device._deconfigure()
+                timer.mark("rollback")
+                msg = "An exception occurred while configuring FSPs:\n{}\n" \
+                      "Aborting configuration".format("\n".join(errs))
+                device._raise_configure_scan_fatal_error(msg)
 
             # TODO add VLBI to this once they are implemented
             # what are these for?
@@ -1950,7 +2172,8 @@ class CbfSubarray(SKASubarray):
             device._fsp_list[2].append(device._pst_fsp_list)
 
             #save configuration into latestScanConfig
-            device._latest_scan_config = str(configuration)
+            device._scan_config = scan_config
+            device._latest_scan_config = str(scan_config)
             message = "CBFSubarray Configure command completed OK"
             self.logger.info(message)
             return (ResultCode.OK, message)
@@ -2000,11 +2223,7 @@ class CbfSubarray(SKASubarray):
 
             data = tango.DeviceData()
             data.insert(tango.DevString, str(device._scan_ID))
-            device._group_vcc.command_inout("Scan", data)
-
-            device._group_fsp_corr_subarray.command_inout("Scan", data)
-            device._group_fsp_pss_subarray.command_inout("Scan", data)
-            device._group_fsp_pst_subarray.command_inout("Scan", data)
+            device._command_vcc_and_fsp_subarrays("Scan", data)
 
             # return message
             message = "Scan command successful"
@@ -2027,10 +2246,7 @@ class CbfSubarray(SKASubarray):
             device=self.target
 
             # EndScan for all subordinate devices:
-            device._group_vcc.command_inout("EndScan")
-            device._group_fsp_corr_subarray.command_inout("EndScan")
-            device._group_fsp_pss_subarray.command_inout("EndScan")
-            device._group_fsp_pst_subarray.command_inout("EndScan")
+            device._command_vcc_and_fsp_subarrays("EndScan")
 
             device._scan_ID = 0
             device._frequency_band = 0
@@ -2052,6 +2268,33 @@ class CbfSubarray(SKASubarray):
         (return_code, message) = command()
         return [[return_code], [message]]
 
+    @command(
+        dtype_in=('double',),
+        doc_in="[t0, dt, n] or [t0, dt, n, derivative]: first timestamp (in seconds since the "
+               "Unix epoch), time step (in s), number of timestamps and order of the derivative",
+        dtype_out=('double',),
+        doc_out="Rows of [receptor, fsid, n values], NaN where no delay model was received"
+    )
+    def EvaluateDelay(self, argin):
+        # PROTECTED REGION ID(CbfSubarray.EvaluateDelay) ENABLED START #
+        """
+        Evaluate the delay (or a derivative of it) of every receptor and
+        frequency slice at n timestamps, each with the VCC delay model of the
+        latest epoch at or before it, to check the continuity between
+        consecutive models.
+        """
+        try:
+            times, derivative = parse_evaluation_request(argin)
+        except ValueError as e:
+            msg = "EvaluateDelay argument not valid: {}".format(e)
+            self.logger.error(msg)
+            tango.Except.throw_exception("Command failed", msg,
+                                         "EvaluateDelay execution",
+                                         tango.ErrSeverity.ERR)
+        keys, values = evaluate_entries(self._delay_model_history.entries(), times, derivative)
+        return evaluation_rows(keys, values)
+        # PROTECTED REGION END #    // CbfSubarray.EvaluateDelay
+
     class GoToIdleCommand(SKASubarray.EndCommand):
         """
         A class for SKASubarray's GoToIdle() command.
@@ -2092,14 +2335,14 @@ class CbfSubarray(SKASubarray):
             """
             device = self.target
 
+            # pending models must not be delivered after an abort
+            device._model_scheduler.cancel_pending()
+
             # if aborted from SCANNING, needs to set VCC and PSS subarray 
             # to READY state otherwise when 
             if device.scanID != 0:
                 self.logger.info("scanning")
-                device._group_vcc.command_inout("EndScan")
-                device._group_fsp_corr_subarray.command_inout("EndScan")
-                device._group_fsp_pss_subarray.command_inout("EndScan")
-                device._group_fsp_pst_subarray.command_inout("EndScan")
+                device._command_vcc_and_fsp_subarrays("EndScan")
             
             (result_code,message)=super().do()
             
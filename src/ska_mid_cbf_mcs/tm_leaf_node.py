@@ -33,10 +33,13 @@ import os
 import sys
 import json
 from random import randint
+
+import numpy
 file_path = os.path.dirname(os.path.abspath(__file__))
 
 from ska_tango_base import SKABaseDevice
 from ska_tango_base.control_model import HealthState, AdminMode
+from ska_mid_cbf_mcs.commons.delay_model_codec import encode_delay_model
 
 # PROTECTED REGION END #    //  TmCspSubarrayLeafNodeTest.additionnal_import
 
@@ -160,6 +163,15 @@ class TmCspSubarrayLeafNodeTest(SKABaseDevice):
         doc="Delay model coefficients"
     )
 
+    delayModelBinary = attribute(
+        dtype=('double',),
+        access=AttrWriteType.READ_WRITE,
+        max_dim_x=200000,
+        label="Delay model coefficients (binary)",
+        doc="Delay model coefficients, encoded as an array of doubles "
+            "(see ska_mid_cbf_mcs.commons.delay_model_codec)"
+    )
+
     beamWeights = attribute(
         dtype='str',
         access=AttrWriteType.READ_WRITE,
@@ -194,6 +206,7 @@ class TmCspSubarrayLeafNodeTest(SKABaseDevice):
         self._doppler_phase_correction = [0.0, 0.0, 0.0, 0.0]
         self._jones_matrix = {}  # this is interpreted as a JSON object
         self._delay_model = {}  # this is interpreted as a JSON object
+        self._delay_model_binary = numpy.zeros(0)
         self._beam_weights = {}  # this is interpreted as a JSON object
         self._vis_destination_address = {}  # this is interpreted as a JSON object
         self._received_output_links = False
@@ -215,6 +228,9 @@ class TmCspSubarrayLeafNodeTest(SKABaseDevice):
             stateless=True
         )
 
+        # the binary delay model is pushed on write rather than polled
+        self.set_change_event("delayModelBinary", True, False)
+
         self.set_state(DevState.STANDBY)
         # PROTECTED REGION END #    //  TmCspSubarrayLeafNodeTest.init_device
 
@@ -276,8 +292,27 @@ class TmCspSubarrayLeafNodeTest(SKABaseDevice):
         # PROTECTED REGION ID(TmCspSubarrayLeafNodeTest.delayModel_write) ENABLED START #
         # since this is just a test device, assume that the JSON schema is always what we expect
         self._delay_model = json.loads(str(value))
+        # publish the same coefficients on the binary path
+        try:
+            self._publish_delay_model_binary(encode_delay_model(self._delay_model))
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warn("Delay model not published as binary: {}".format(e))
         # PROTECTED REGION END #    //  TmCspSubarrayLeafNodeTest.delayModel_write
 
+    def read_delayModelBinary(self):
+        # PROTECTED REGION ID(TmCspSubarrayLeafNodeTest.delayModelBinary_read) ENABLED START #
+        return self._delay_model_binary
+        # PROTECTED REGION END #    //  TmCspSubarrayLeafNodeTest.delayModelBinary_read
+
+    def write_delayModelBinary(self, value):
+        # PROTECTED REGION ID(TmCspSubarrayLeafNodeTest.delayModelBinary_write) ENABLED START #
+        self._publish_delay_model_binary(numpy.asarray(value, dtype=numpy.float64))
+        # PROTECTED REGION END #    //  TmCspSubarrayLeafNodeTest.delayModelBinary_write
+
+    def _publish_delay_model_binary(self, value):
+        self._delay_model_binary = value
+        self.push_change_event("delayModelBinary", self._delay_model_binary)
+
     def read_beamWeights(self):
         # PROTECTED REGION ID(TmCspSubarrayLeafNodeTest.beamWeights_read) ENABLED START #
         return json.dumps(self._beam_weights)
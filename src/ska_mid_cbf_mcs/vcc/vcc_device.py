@@ -21,6 +21,8 @@ import os
 import sys
 import json
 
+import numpy
+
 # tango imports
 import tango
 from tango.server import Device, run
@@ -33,6 +35,13 @@ from tango.test_context import MultiDeviceTestContext
 
 from ska_mid_cbf_mcs.commons.global_enum import const, freq_band_dict
 from ska_mid_cbf_mcs.dev_factory import DevFactory
+from ska_mid_cbf_mcs.commons.delay_model_codec import ROW_LENGTH, split_staged_rows
+from ska_mid_cbf_mcs.commons.delay_model_history import DelayModelHistory, export_path
+from ska_mid_cbf_mcs.commons.delay_polynomial import \
+    evaluate_entries, evaluation_rows, parse_evaluation_request
+from ska_mid_cbf_mcs.commons.epoch_buffer import EpochBufferedArray
+from ska_mid_cbf_mcs.commons.model_ingest import \
+    find_receptor_entry, frequency_slice_rows, split_epoch
 
 from ska_tango_base.control_model import ObsState
 from ska_tango_base import SKAObsDevice, CspSubElementObsDevice
@@ -84,6 +93,19 @@ class Vcc(CspSubElementObsDevice):
         dtype='str'
     )
 
+    DelayModelHistoryLength = device_property(
+        dtype='DevULong',
+        doc="Number of delay model entries (one per frequency slice) kept in the "
+            "delay model history",
+        default_value=4096
+    )
+
+    DelayModelHistoryExportDir = device_property(
+        dtype='str',
+        doc="Directory to which ExportDelayModelHistory writes its files",
+        default_value="/tmp"
+    )
+
     # ----------
     # Attributes
     # ----------
@@ -221,6 +243,41 @@ class Vcc(CspSubElementObsDevice):
         doc="config ID",
     )
 
+    activeModelEpochs = attribute(
+        dtype=('double',),
+        max_dim_x=2,
+        access=AttrWriteType.READ,
+        label="Active model epochs",
+        doc="Epoch of the active delay model and Jones matrix (0 if not activated "
+            "at an epoch)",
+    )
+
+    pendingModelEpochs = attribute(
+        dtype=('double',),
+        max_dim_x=2,
+        access=AttrWriteType.READ,
+        label="Pending model epochs",
+        doc="Epoch of the next staged delay model and Jones matrix (0 if none)",
+    )
+
+    modelSwapJitter = attribute(
+        dtype=('double',),
+        max_dim_x=2,
+        access=AttrWriteType.READ,
+        unit="s",
+        label="Model swap jitter",
+        doc="Activation time minus epoch of the last staged delay model and Jones "
+            "matrix",
+    )
+
+    modelUpdateCounts = attribute(
+        dtype='DevString',
+        access=AttrWriteType.READ,
+        label="Model update counts",
+        doc="Number of delay model and Jones matrix updates applied, rejected and "
+            "ignored (no entry for the receptor of the VCC), as JSON",
+    )
+
     # ---------------
     # General methods
     # ---------------
@@ -285,8 +342,24 @@ class Vcc(CspSubElementObsDevice):
             device._scfo_band_4 = 0
             device._scfo_band_5a = 0
             device._scfo_band_5b = 0
-            device._delay_model = [[0] * 6 for i in range(26)]
-            device._jones_matrix = [[0] * 16 for i in range(26)]
+            # double-buffered: updates are either applied in place, or staged
+            # and swapped in at their epoch; the active table is returned as
+            # it is on read
+            for table in [getattr(device, "_delay_model", None),
+                          getattr(device, "_jones_matrix", None)]:
+                if table is not None:
+                    table.stop()
+            # every delay model entry activated, for QueryDelayModel
+            device._delay_model_history = DelayModelHistory(device.DelayModelHistoryLength)
+            device._delay_model = EpochBufferedArray(
+                (26, 6), name="delay_model", on_activate=device._record_delay_model,
+                logger=device.logger)
+            device._jones_matrix = EpochBufferedArray(
+                (26, 16), name="jones_matrix", logger=device.logger)
+            device._model_update_counts = {
+                model_type: {"applied": 0, "rejected": 0, "ignored": 0}
+                for model_type in ["delay_model", "jones_matrix"]
+            }
 
             device._scan_id = ""
             device._config_id = ""
@@ -381,7 +454,8 @@ class Vcc(CspSubElementObsDevice):
         released. This method is called by the device destructor, and by
         the Init command when the Tango device server is re-initialised.
         """
-        pass
+        self._delay_model.stop()
+        self._jones_matrix.stop()
 
     # ------------------
     # Attributes methods
@@ -557,15 +631,39 @@ class Vcc(CspSubElementObsDevice):
     def read_delayModel(self):
         # PROTECTED REGION ID(Vcc.delayModel_read) ENABLED START #
         """Return delayModel attribute(2 dim, max=6*26 array): Delay model coefficients, given per frequency slice"""
-        return self._delay_model
+        return self._delay_model.active
         # PROTECTED REGION END #    //  Vcc.delayModel_read
 
     def read_jonesMatrix(self):
         # PROTECTED REGION ID(Vcc.jonesMatrix_read) ENABLED START #
         """Return jonesMatrix attribute(max=16 array): Jones Matrix, given per frequency slice"""
-        return self._jones_matrix
+        return self._jones_matrix.active
         # PROTECTED REGION END #    //  Vcc.jonesMatrix_read
 
+    def read_activeModelEpochs(self):
+        # PROTECTED REGION ID(Vcc.activeModelEpochs_read) ENABLED START #
+        """Return activeModelEpochs attribute: epochs of the active delay model and Jones matrix"""
+        return [self._delay_model.active_epoch, self._jones_matrix.active_epoch]
+        # PROTECTED REGION END #    //  Vcc.activeModelEpochs_read
+
+    def read_pendingModelEpochs(self):
+        # PROTECTED REGION ID(Vcc.pendingModelEpochs_read) ENABLED START #
+        """Return pendingModelEpochs attribute: epochs of the staged delay model and Jones matrix"""
+        return [self._delay_model.pending_epoch, self._jones_matrix.pending_epoch]
+        # PROTECTED REGION END #    //  Vcc.pendingModelEpochs_read
+
+    def read_modelSwapJitter(self):
+        # PROTECTED REGION ID(Vcc.modelSwapJitter_read) ENABLED START #
+        """Return modelSwapJitter attribute: last swap jitter of the delay model and Jones matrix"""
+        return [self._delay_model.last_jitter, self._jones_matrix.last_jitter]
+        # PROTECTED REGION END #    //  Vcc.modelSwapJitter_read
+
+    def read_modelUpdateCounts(self):
+        # PROTECTED REGION ID(Vcc.modelUpdateCounts_read) ENABLED START #
+        """Return modelUpdateCounts attribute: applied, rejected and ignored updates, as JSON"""
+        return json.dumps(self._model_update_counts)
+        # PROTECTED REGION END #    //  Vcc.modelUpdateCounts_read
+
     def read_scanID(self):
         # PROTECTED REGION ID(Vcc.scanID_read) ENABLED START #
         """Return the scanID attribute."""
@@ -629,6 +727,10 @@ class Vcc(CspSubElementObsDevice):
                 #       via a separate command
                 if Vcc.TEST_CONTEXT is False:
                     self.turn_on_band_device(device._freq_band_name)
+                # models staged for the previous configuration must not
+                # activate in this one
+                device._delay_model.clear()
+                device._jones_matrix.clear()
                 # store the configuration on command success
                 device._last_scan_configuration = argin
                 msg = "Configure command completed OK"
@@ -768,8 +870,8 @@ class Vcc(CspSubElementObsDevice):
             device._scfo_band_4 = 0
             device._scfo_band_5a = 0
             device._scfo_band_5b = 0
-            device._delay_model = [[0] * 6 for i in range(26)]
-            device._jones_matrix = [[0] * 16 for i in range(26)]
+            device._delay_model.clear()
+            device._jones_matrix.clear()
 
             device._scan_id = 0
             device._config_id = ""
@@ -780,6 +882,29 @@ class Vcc(CspSubElementObsDevice):
 
             return (ResultCode.OK, "GoToIdle command completed OK")
 
+    def _reject_model_update(self, model_type, command_name, error):
+        """Count a rejected model update and fail the command; nothing of the
+        update is applied"""
+        self._model_update_counts[model_type]["rejected"] += 1
+        msg = "{} rejected for receptor {}: {}".format(command_name, self._receptor_ID, error)
+        self.logger.error(msg)
+        tango.Except.throw_exception("Command failed", msg,
+                                     command_name + " execution",
+                                     tango.ErrSeverity.ERR)
+
+    def _record_delay_model(self, epoch, indices, values):
+        """Record activated delay model rows (index fsid - 1) in the history"""
+        self._delay_model_history.record(
+            epoch, self._receptor_ID, numpy.asarray(indices) + 1, values)
+
+    def _store_model_update(self, model_type, table, epoch, indices, values):
+        """Apply a validated model update now, or stage it until its epoch"""
+        if epoch is None:
+            table.apply(indices, values)
+        else:
+            table.stage(epoch, indices, values)
+        self._model_update_counts[model_type]["applied"] += 1
+
     def is_UpdateDelayModel_allowed(self):
         """allowed when Devstate is ON and ObsState is READY OR SCANNIGN"""
         self.logger.debug("Entering is_UpdateDelayModel_allowed()")
@@ -791,39 +916,62 @@ class Vcc(CspSubElementObsDevice):
 
     @command(
         dtype_in='str',
-        doc_in="Delay model, given per frequency slice"
+        doc_in="Delay model, given per frequency slice; either the delay details, "
+               "applied now, or {\"epoch\": ..., \"delayDetails\": ...}, staged "
+               "until the epoch"
     )
     def UpdateDelayModel(self, argin):
         # PROTECTED REGION ID(Vcc.UpdateDelayModel) ENABLED START #
         """update VCC's delay model(serialized JSON object)"""
 
-        self.logger.debug("Entering UpdateDelayModel()")
-        argin = json.loads(argin)
+        try:
+            epoch, delay_details = split_epoch(json.loads(argin), "delayDetails")
+            entry = find_receptor_entry(delay_details, self._receptor_ID)
+            if entry is None:
+                self._model_update_counts["delay_model"]["ignored"] += 1
+                return
+            indices, coefficients = frequency_slice_rows(
+                entry["receptorDelayDetails"], "delayCoeff", 6)
+        except (ValueError, KeyError, TypeError) as e:
+            self._reject_model_update("delay_model", "UpdateDelayModel", e)
+
+        self._store_model_update("delay_model", self._delay_model, epoch, indices, coefficients)
+        # PROTECTED REGION END #    // Vcc.UpdateDelayModel
 
-        self.logger.debug(("self._receptor_ID = {}".
-            format(self._receptor_ID)))
+    def is_UpdateDelayModelBinary_allowed(self):
+        return self.is_UpdateDelayModel_allowed()
 
-        for delayDetails in argin:
-            self.logger.debug(("delayDetails[receptor] = {}".
-            format(delayDetails["receptor"])))
+    @command(
+        dtype_in=('double',),
+        doc_in="Delay model, as rows of [receptor, fsid, 6 coefficients], "
+               "optionally preceded by the epoch to stage them until "
+               "(see delay_model_codec)"
+    )
+    def UpdateDelayModelBinary(self, argin):
+        # PROTECTED REGION ID(Vcc.UpdateDelayModelBinary) ENABLED START #
+        """update VCC's delay model (array of doubles, no JSON)"""
 
-            if delayDetails["receptor"] != self._receptor_ID:
-                continue
-            for frequency_slice in delayDetails["receptorDelayDetails"]:
-                if 1 <= frequency_slice["fsid"] <= 26:
-                    if len(frequency_slice["delayCoeff"]) == 6:
-                        self._delay_model[frequency_slice["fsid"] - 1] = \
-                            frequency_slice["delayCoeff"]
-                    else:
-                        log_msg = "'delayCoeff' not valid for frequency slice {} of " \
-                                    "receptor {}".format(frequency_slice["fsid"], self._receptor_ID)
-                        self.logger.error(log_msg)
-                else:
-                    log_msg = "'fsid' {} not valid for receptor {}".format(
-                        frequency_slice["fsid"], self._receptor_ID
-                    )
-                    self.logger.error(log_msg)
-        # PROTECTED REGION END #    // Vcc.UpdateDelayModel
+        self.logger.debug("Entering UpdateDelayModelBinary()")
+        try:
+            epoch, rows = split_staged_rows(argin)
+        except ValueError:
+            self._reject_model_update(
+                "delay_model", "UpdateDelayModelBinary",
+                "length {} is not a multiple of {}".format(len(argin), ROW_LENGTH))
+
+        rows = rows[rows[:, 0] == self._receptor_ID]
+        if not len(rows):
+            self._model_update_counts["delay_model"]["ignored"] += 1
+            return
+        fsids = rows[:, 1].astype(int)
+        invalid_fsids = fsids[(fsids < 1) | (fsids > 26)]
+        if invalid_fsids.size:
+            self._reject_model_update(
+                "delay_model", "UpdateDelayModelBinary",
+                "'fsid' {} not valid".format(invalid_fsids.tolist()))
+
+        self._store_model_update("delay_model", self._delay_model, epoch, fsids - 1, rows[:, 2:])
+        # PROTECTED REGION END #    // Vcc.UpdateDelayModelBinary
 
     def is_UpdateJonesMatrix_allowed(self):
         """allowed when Devstate is ON and ObsState is READY OR SCANNINNG"""
@@ -834,33 +982,83 @@ class Vcc(CspSubElementObsDevice):
 
     @command(
         dtype_in='str',
-        doc_in="Jones Matrix, given per frequency slice"
+        doc_in="Jones Matrix, given per frequency slice; either the matrix details, "
+               "applied now, or {\"epoch\": ..., \"matrixDetails\": ...}, staged "
+               "until the epoch"
     )
     def UpdateJonesMatrix(self, argin):
         # PROTECTED REGION ID(Vcc.UpdateJonesMatrix) ENABLED START #
-        self.logger.debug("Vcc.UpdateJonesMatrix")
-        """update FSP's Jones matrix (serialized JSON object)"""
+        """update VCC's Jones matrix (serialized JSON object)"""
+        try:
+            epoch, matrix_details = split_epoch(json.loads(argin), "matrixDetails")
+            entry = find_receptor_entry(matrix_details, self._receptor_ID)
+            if entry is None:
+                self._model_update_counts["jones_matrix"]["ignored"] += 1
+                return
+            indices, matrices = frequency_slice_rows(entry["receptorMatrix"], "matrix", 16)
+        except (ValueError, KeyError, TypeError) as e:
+            self._reject_model_update("jones_matrix", "UpdateJonesMatrix", e)
+
+        self._store_model_update("jones_matrix", self._jones_matrix, epoch, indices, matrices)
+        # PROTECTED REGION END #    // Vcc.UpdateJonesMatrix
 
-        argin = json.loads(argin)
+    @command(
+        dtype_in='DevDouble',
+        doc_in="Timestamp, in seconds since the Unix epoch",
+        dtype_out=('double',),
+        doc_out="Delay model entries active at the timestamp, as rows of [epoch, receptor, fsid, 6 coefficients]"
+    )
+    def QueryDelayModel(self, argin):
+        # PROTECTED REGION ID(Vcc.QueryDelayModel) ENABLED START #
+        """Return the delay model active at a given time, from the delay model history"""
+        return self._delay_model_history.query_rows(argin)
+        # PROTECTED REGION END #    // Vcc.QueryDelayModel
 
-        for receptor in argin:
-            if receptor["receptor"] == self._receptor_ID:
-                for frequency_slice in receptor["receptorMatrix"]:
-                    fs_id = frequency_slice["fsid"]
-                    matrix = frequency_slice["matrix"]
-                    if 1 <= fs_id <= 26:
-                        if len(matrix) == 16:
-                            self._jones_matrix[fs_id-1] = matrix.copy()
-                        else:
-                            log_msg = "'matrix' not valid for frequency slice {} of " \
-                                      "receptor {}".format(fs_id, self._receptor_ID)
-                            self.logger.error(log_msg)
-                    else:
-                        log_msg = "'fsid' {} not valid for receptor {}".format(
-                            fs_id, self._receptor_ID
-                        )
-                        self.logger.error(log_msg)
-        # PROTECTED REGION END #    // Vcc.UpdateJonesMatrix
+    @command(
+        dtype_in='str',
+        doc_in="Name of the .npy file to write, in DelayModelHistoryExportDir",
+        dtype_out='DevULong',
+        doc_out="Number of entries written"
+    )
+    def ExportDelayModelHistory(self, argin):
+        # PROTECTED REGION ID(Vcc.ExportDelayModelHistory) ENABLED START #
+        """Write the delay model history to a binary file (see delay_model_history)"""
+        try:
+            path = export_path(self.DelayModelHistoryExportDir, argin)
+            return self._delay_model_history.export(path)
+        except (ValueError, OSError) as e:
+            msg = "Delay model history could not be written to {}: {}".format(argin, e)
+            self.logger.error(msg)
+            tango.Except.throw_exception("Command failed", msg,
+                                         "ExportDelayModelHistory execution",
+                                         tango.ErrSeverity.ERR)
+        # PROTECTED REGION END #    // Vcc.ExportDelayModelHistory
+
+    @command(
+        dtype_in=('double',),
+        doc_in="[t0, dt, n] or [t0, dt, n, derivative]: first timestamp (in seconds since the "
+               "Unix epoch), time step (in s), number of timestamps and order of the derivative",
+        dtype_out=('double',),
+        doc_out="Rows of [receptor, fsid, n values], NaN where no delay model was active"
+    )
+    def EvaluateDelay(self, argin):
+        # PROTECTED REGION ID(Vcc.EvaluateDelay) ENABLED START #
+        """
+        Evaluate the delay (or a derivative of it) of every frequency slice at
+        n timestamps, each with the delay model active at it in the delay
+        model history, to check the continuity between consecutive models.
+        """
+        try:
+            times, derivative = parse_evaluation_request(argin)
+        except ValueError as e:
+            msg = "EvaluateDelay argument not valid: {}".format(e)
+            self.logger.error(msg)
+            tango.Except.throw_exception("Command failed", msg,
+                                         "EvaluateDelay execution",
+                                         tango.ErrSeverity.ERR)
+        keys, values = evaluate_entries(self._delay_model_history.entries(), times, derivative)
+        return evaluation_rows(keys, values)
+        # PROTECTED REGION END #    // Vcc.EvaluateDelay
 
     def is_ValidateSearchWindow_allowed(self):
         # This command has no constraints:
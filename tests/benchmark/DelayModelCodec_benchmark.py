@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""
+Benchmark of the JSON and binary delay model transport paths, against the
+number of receptors.
+
+For each path, the payload size is the size of the leaf node attribute value,
+and the latency is the processing time from the leaf node to the VCC storage:
+encoding at the leaf node, decoding and splitting by VCC at the subarray, and
+decoding and storing at every VCC. Tango transport time is not included.
+
+Run with: python tests/benchmark/DelayModelCodec_benchmark.py
+"""
+
+# Standard imports
+import json
+import timeit
+
+import numpy
+
+#Local imports
+from ska_mid_cbf_mcs.commons.delay_model_codec import \
+    ROW_LENGTH, encode_delay_model, decode_delay_model
+
+NUM_FREQUENCY_SLICES = 26
+
+
+def make_delay_model(num_receptors):
+    """Return a delay model for every receptor and frequency slice."""
+    return {"delayModel": [{
+        "epoch": "1600000000",
+        "destinationType": "vcc",
+        "delayDetails": [{
+            "receptor": receptor,
+            "receptorDelayDetails": [{
+                "fsid": fsid,
+                "delayCoeff": list(numpy.random.random(6))
+            } for fsid in range(1, NUM_FREQUENCY_SLICES + 1)]
+        } for receptor in range(1, num_receptors + 1)]
+    }]}
+
+
+def json_path(delay_model_all):
+    # leaf node
+    value = json.dumps(delay_model_all)
+    # subarray
+    vcc_models = {}
+    for delay_model in json.loads(value)["delayModel"]:
+        for receptor_details in delay_model["delayDetails"]:
+            vcc_models[receptor_details["receptor"]] = json.dumps([receptor_details])
+    # VCCs
+    for receptor, model in vcc_models.items():
+        storage = [[0] * 6 for _ in range(NUM_FREQUENCY_SLICES)]
+        for delay_details in json.loads(model):
+            for frequency_slice in delay_details["receptorDelayDetails"]:
+                storage[frequency_slice["fsid"] - 1] = frequency_slice["delayCoeff"]
+
+
+def binary_path(delay_model_all):
+    # leaf node
+    value = encode_delay_model(delay_model_all)
+    # subarray
+    vcc_models = {}
+    for _, _, rows in decode_delay_model(value):
+        for receptor in numpy.unique(rows[:, 0]):
+            vcc_models[receptor] = rows[rows[:, 0] == receptor].ravel()
+    # VCCs
+    for receptor, model in vcc_models.items():
+        storage = [[0] * 6 for _ in range(NUM_FREQUENCY_SLICES)]
+        for row in numpy.reshape(model, (-1, ROW_LENGTH)):
+            storage[int(row[1]) - 1] = row[2:].tolist()
+
+
+def main(number=20):
+    print("{:>9} {:>11} {:>13} {:>11} {:>13}".format(
+        "receptors", "json bytes", "binary bytes", "json (ms)", "binary (ms)"))
+    for num_receptors in [4, 16, 64, 197]:
+        delay_model_all = make_delay_model(num_receptors)
+        json_size = len(json.dumps(delay_model_all))
+        binary_size = encode_delay_model(delay_model_all).nbytes
+
+        json_time = timeit.timeit(
+            lambda: json_path(delay_model_all), number=number) / number
+        binary_time = timeit.timeit(
+            lambda: binary_path(delay_model_all), number=number) / number
+        print("{:>9} {:>11} {:>13} {:>11.2f} {:>13.2f}".format(
+            num_receptors, json_size, binary_size, json_time * 1e3, binary_time * 1e3))
+
+
+if __name__ == "__main__":
+    main()
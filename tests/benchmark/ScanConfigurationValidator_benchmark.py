@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""
+Benchmark of the scan configuration validation, against the number of FSPs
+and of search beams per FSP.
+
+Run with: python tests/benchmark/ScanConfigurationValidator_benchmark.py
+"""
+
+# Standard imports
+import os
+import json
+import timeit
+
+#Local imports
+from ska_mid_cbf_mcs.subarray.scan_configuration import ScanConfiguration
+from ska_mid_cbf_mcs.subarray.scan_configuration_validator import ScanConfigurationValidator
+
+file_path = os.path.dirname(os.path.abspath(__file__))
+
+COUNT_FSP = 27
+RECEPTORS = [1, 2, 3, 4]
+
+
+def make_configuration(num_fsp, num_beams):
+    """Return a PSS-BF heavy scan configuration with the given sizes."""
+    with open(file_path + "/../data/ConfigureScan_basic.json") as f:
+        full_configuration = json.load(f)
+    fsp_corr, fsp_pss, _ = full_configuration["cbf"]["fsp"]
+
+    fsps = []
+    for fsp_id in range(1, num_fsp + 1):
+        if fsp_id % 2:
+            fsp = dict(fsp_corr, fsp_id=fsp_id)
+        else:
+            fsp = dict(fsp_pss, fsp_id=fsp_id, search_beam=[
+                dict(
+                    fsp_pss["search_beam"][0],
+                    search_beam_id=beam_id,
+                    receptor_ids=[RECEPTORS[beam_id % len(RECEPTORS)]]
+                )
+                for beam_id in range(1, num_beams + 1)
+            ])
+        fsps.append(fsp)
+    full_configuration["cbf"]["fsp"] = fsps
+    return json.dumps(full_configuration)
+
+
+def main(number=20):
+    start = timeit.default_timer()
+    validator = ScanConfigurationValidator(COUNT_FSP)
+    print("schema compiled in {:.2f} ms\n".format(
+        (timeit.default_timer() - start) * 1e3))
+
+    print("{:>5} {:>6} {:>10} {:>12} {:>14}".format(
+        "fsps", "beams", "bytes", "parse (ms)", "validate (ms)"))
+    for num_fsp in [1, 4, 8, 16, 27]:
+        for num_beams in [1, 48, 192]:
+            argin = make_configuration(num_fsp, num_beams)
+            scan_config = ScanConfiguration(argin, RECEPTORS)
+            assert validator.validate(scan_config, RECEPTORS) == []
+
+            parse_time = timeit.timeit(
+                lambda: ScanConfiguration(argin, RECEPTORS), number=number) / number
+            validate_time = timeit.timeit(
+                lambda: validator.validate(scan_config, RECEPTORS), number=number) / number
+            print("{:>5} {:>6} {:>10} {:>12.2f} {:>14.2f}".format(
+                num_fsp, num_beams, len(argin), parse_time * 1e3, validate_time * 1e3))
+
+
+if __name__ == "__main__":
+    main()
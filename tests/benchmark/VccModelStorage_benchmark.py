@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""
+Benchmark of the Vcc delay model and Jones matrix storage: lists of lists,
+as stored before, against preallocated float64 arrays updated in place.
+
+An update stores the coefficients of every frequency slice and a read
+returns the image as Tango serializes it, i.e. as a float64 array; a clear
+resets the storage, as GoToIdle does. Tango transport time is not included.
+
+Run with: python tests/benchmark/VccModelStorage_benchmark.py
+"""
+
+# Standard imports
+import timeit
+
+import numpy
+
+NUM_FREQUENCY_SLICES = 26
+
+
+class ListStorage:
+
+    def __init__(self, width):
+        self.width = width
+        self.storage = [[0] * width for i in range(NUM_FREQUENCY_SLICES)]
+
+    def update(self, fsid, values):
+        self.storage[fsid - 1] = list(values)
+
+    def read(self):
+        return numpy.asarray(self.storage, dtype=numpy.float64)
+
+    def clear(self):
+        self.storage = [[0] * self.width for i in range(NUM_FREQUENCY_SLICES)]
+
+
+class ArrayStorage:
+
+    def __init__(self, width):
+        self.storage = numpy.zeros((NUM_FREQUENCY_SLICES, width))
+
+    def update(self, fsid, values):
+        self.storage[fsid - 1, :] = values
+
+    def read(self):
+        return self.storage
+
+    def clear(self):
+        self.storage.fill(0)
+
+
+def main(number=2000):
+    print("{:>13} {:>7} {:>14} {:>14} {:>14}".format(
+        "storage", "width", "update (us)", "read (us)", "clear (us)"))
+    for width in [6, 16]:  # delay model, Jones matrix
+        coefficients = [list(numpy.random.random(width)) for _ in range(NUM_FREQUENCY_SLICES)]
+        for storage_class in [ListStorage, ArrayStorage]:
+            storage = storage_class(width)
+
+            def update():
+                for fsid, values in enumerate(coefficients, 1):
+                    storage.update(fsid, values)
+
+            times = [
+                timeit.timeit(operation, number=number) / number
+                for operation in [update, storage.read, storage.clear]
+            ]
+            print("{:>13} {:>7} {:>14.2f} {:>14.2f} {:>14.2f}".format(
+                storage_class.__name__, width, *[t * 1e6 for t in times]))
+
+
+if __name__ == "__main__":
+    main()
@@ -168,6 +168,19 @@ class TestCbfController:
         for i in range(2):
             assert proxies.fspSubarray[i + 1].State() == DevState.OFF
 
+    def test_RefreshSubscriptions(self, proxies):
+        """
+        Test a valid use of the "RefreshSubscriptions" command
+        """
+        # all the subarrays/capabilities are running, so there is nothing
+        # to refresh
+        (result_code, message) = proxies.controller.RefreshSubscriptions()
+        assert result_code[0] == ResultCode.OK
+        assert message[0] == "Subscriptions of 0 devices refreshed, 0 connected"
+
+        # the controller still tracks the capabilities afterwards
+        assert proxies.controller.reportVCCState[0] == proxies.vcc[1].State()
+
     # Don't really wanna bother fixing these three tests right now.
     """
     def test_reportVCCSubarrayMembership(
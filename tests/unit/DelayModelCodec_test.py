@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the delay model codec."""
+
+# Standard imports
+import os
+import json
+
+import numpy
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.delay_model_codec import \
+    ROW_LENGTH, encode_delay_model, decode_delay_model, rows_to_delay_details, \
+    stage_rows, split_staged_rows
+
+file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestDelayModelCodec:
+
+    @pytest.fixture
+    def delay_model_all(self):
+        with open(file_path + "/../data/delaymodel.json") as f:
+            delay_model_all = json.load(f)
+        for i, delay_model in enumerate(delay_model_all["delayModel"]):
+            delay_model["epoch"] = str(1600000000 + 10 * i)
+            delay_model["destinationType"] = ["vcc", "fsp"][i % 2]
+        return delay_model_all
+
+    def test_round_trip(self, delay_model_all):
+        models = decode_delay_model(encode_delay_model(delay_model_all))
+
+        assert len(models) == len(delay_model_all["delayModel"])
+        for (epoch, destination_type, rows), delay_model in \
+                zip(models, delay_model_all["delayModel"]):
+            assert epoch == float(delay_model["epoch"])
+            assert destination_type == delay_model["destinationType"]
+            assert rows.shape[1] == ROW_LENGTH
+            assert rows_to_delay_details(rows) == delay_model["delayDetails"]
+
+    def test_smaller_than_json(self, delay_model_all):
+        encoded = encode_delay_model(delay_model_all)
+        assert encoded.nbytes < len(json.dumps(delay_model_all))
+
+    def test_invalid_data(self, delay_model_all):
+        encoded = encode_delay_model(delay_model_all)
+        with pytest.raises(ValueError):
+            decode_delay_model(encoded[:-1])
+        with pytest.raises(ValueError):
+            decode_delay_model(numpy.concatenate([[99.0], encoded[1:]]))
+
+        delay_model_all["delayModel"][0]["delayDetails"][0][
+            "receptorDelayDetails"][0]["delayCoeff"].pop()
+        with pytest.raises(ValueError):
+            encode_delay_model(delay_model_all)
+
+    def test_staged_rows(self, delay_model_all):
+        _, _, rows = decode_delay_model(encode_delay_model(delay_model_all))[0]
+
+        epoch, split = split_staged_rows(rows.ravel())
+        assert epoch is None
+        assert (split == rows).all()
+
+        epoch, split = split_staged_rows(stage_rows(1600000000.5, rows))
+        assert epoch == 1600000000.5
+        assert (split == rows).all()
+
+        with pytest.raises(ValueError):
+            split_staged_rows(rows.ravel()[:-2])
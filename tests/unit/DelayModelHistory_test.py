@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the DelayModelHistory."""
+
+# Standard imports
+import os
+
+import numpy
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.delay_model_history import \
+    DelayModelHistory, HISTORY_DTYPE, HISTORY_ROW_LENGTH, export_path
+
+
+def coeffs(value, num_entries=1):
+    return numpy.full((num_entries, 6), float(value))
+
+
+class TestDelayModelHistory:
+
+    def test_query(self):
+        history = DelayModelHistory(16)
+        history.record(100.0, 1, [1, 2], coeffs(1, 2))
+        history.record(110.0, 1, 1, coeffs(2))
+        history.record(120.0, [1, 2], 2, coeffs(3, 2))
+
+        assert len(history.query(99.0)) == 0
+
+        entries = history.query(115.0)
+        assert entries[["receptor", "fsid"]].tolist() == [(1, 1), (1, 2)]
+        assert entries["epoch"].tolist() == [110.0, 100.0]
+        assert entries["coeffs"][:, 0].tolist() == [2.0, 1.0]
+
+        entries = history.query(120.0, receptor=1)
+        assert entries["coeffs"][:, 0].tolist() == [2.0, 3.0]
+        entries = history.query(1e9, fsid=2)
+        assert entries[["receptor", "fsid"]].tolist() == [(1, 2), (2, 2)]
+
+        rows = history.query_rows(115.0, receptor=1, fsid=1).reshape(-1, HISTORY_ROW_LENGTH)
+        assert rows.tolist() == [[110.0, 1, 1] + [2.0] * 6]
+
+    def test_ring_buffer(self):
+        history = DelayModelHistory(4)
+        for i in range(6):
+            history.record(100.0 + i, 1, 1, coeffs(i))
+        assert len(history) == 4
+        assert history.entries()["epoch"].tolist() == [102.0, 103.0, 104.0, 105.0]
+
+        # the oldest entries are forgotten
+        assert len(history.query(101.0)) == 0
+        assert history.query(103.5)["coeffs"][0, 0] == 3.0
+        assert history.query(200.0)["coeffs"][0, 0] == 5.0
+
+        history.record(200.0, 1, range(1, 7), coeffs(9, 6))
+        assert history.entries()["fsid"].tolist() == [3, 4, 5, 6]
+
+    def test_out_of_order_epoch(self):
+        history = DelayModelHistory(4)
+        history.record(100.0, 1, 1, coeffs(1))
+        history.record(90.0, 1, 1, coeffs(2))
+        # active from the last activation, but its epoch is kept
+        assert history.entries()["active_from"].tolist() == [100.0, 100.0]
+        assert history.entries()["epoch"].tolist() == [100.0, 90.0]
+        assert history.query(99.0).size == 0
+        assert history.query(100.0)["coeffs"][0, 0] == 2.0
+        assert history.query(100.0)["epoch"][0] == 90.0
+
+    def test_export(self, tmp_path):
+        history = DelayModelHistory(4)
+        history.record(100.0, 3, 7, coeffs(1))
+        path = str(tmp_path / "history.npy")
+        assert history.export(path) == 1
+
+        entries = numpy.load(path)
+        assert entries.dtype == HISTORY_DTYPE
+        assert entries[["epoch", "receptor", "fsid"]].tolist() == [(100.0, 3, 7)]
+
+    def test_export_path(self):
+        assert export_path("/data/history", "history.npy") == \
+            os.path.join("/data/history", "history.npy")
+        for file_name in ["", ".", "..", "../history.npy", "a/b.npy", "a\\b.npy",
+                          "/etc/history.npy", "..history.npy"]:
+            with pytest.raises(ValueError):
+                export_path("/data/history", file_name)
+        with pytest.raises(ValueError):
+            export_path("", "history.npy")
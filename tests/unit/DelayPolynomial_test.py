@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the delay polynomial evaluation."""
+
+# Standard imports
+import numpy
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.delay_model_history import DelayModelHistory
+from ska_mid_cbf_mcs.commons.delay_polynomial import \
+    evaluate_entries, evaluate_polynomial, evaluation_rows, parse_evaluation_request
+
+
+class TestDelayPolynomial:
+
+    def test_evaluate_polynomial(self):
+        coeffs = numpy.random.random((4, 6))
+        dt = numpy.linspace(-2.0, 3.0, 11)
+        for derivative in range(7):
+            expected = numpy.array([
+                numpy.polynomial.polynomial.polyval(
+                    dt, numpy.polynomial.polynomial.polyder(c, derivative))
+                for c in coeffs
+            ])
+            numpy.testing.assert_allclose(
+                evaluate_polynomial(coeffs, dt, derivative), expected)
+
+    def test_evaluate_entries(self):
+        history = DelayModelHistory(16)
+        # delay 1 + t - 100 until 110, then 11 + 2 (t - 110): continuous
+        history.record(100.0, 1, 1, [[1, 1, 0, 0, 0, 0]])
+        history.record(110.0, 1, 1, [[11, 2, 0, 0, 0, 0]])
+        history.record(110.0, 2, 3, [[5, 0, 0, 0, 0, 0]])
+
+        times = numpy.array([95.0, 100.0, 105.0, 110.0, 115.0])
+        keys, values = evaluate_entries(history.entries(), times)
+        assert keys == [(1, 1), (2, 3)]
+        numpy.testing.assert_array_equal(values, [
+            [numpy.nan, 1.0, 6.0, 11.0, 21.0],
+            [numpy.nan, numpy.nan, numpy.nan, 5.0, 5.0],
+        ])
+
+        _, rates = evaluate_entries(history.entries(), times, derivative=1)
+        numpy.testing.assert_array_equal(rates[0], [numpy.nan, 1.0, 1.0, 2.0, 2.0])
+
+        rows = evaluation_rows(keys, values).reshape(-1, 2 + len(times))
+        assert rows[:, :2].tolist() == [[1, 1], [2, 3]]
+
+    def test_evaluate_out_of_order_entry(self):
+        history = DelayModelHistory(4)
+        history.record(100.0, 1, 1, [[0, 1, 0, 0, 0, 0]])
+        # received after the first one: active from 100, evaluated from 90
+        history.record(90.0, 1, 1, [[0, 2, 0, 0, 0, 0]])
+        _, values = evaluate_entries(history.entries(), [100.0, 105.0])
+        numpy.testing.assert_array_equal(values, [[20.0, 30.0]])
+
+    def test_evaluate_no_entries(self):
+        keys, values = evaluate_entries(DelayModelHistory(4).entries(), [1.0, 2.0])
+        assert keys == []
+        assert len(evaluation_rows(keys, values)) == 0
+
+    def test_parse_evaluation_request(self):
+        times, derivative = parse_evaluation_request([10.0, 0.5, 3])
+        assert times.tolist() == [10.0, 10.5, 11.0]
+        assert derivative == 0
+        assert parse_evaluation_request([10.0, 0.5, 3, 2])[1] == 2
+
+        for argin in [[10.0, 0.5], [10.0, 0.5, 0], [10.0, 0.5, 2.5], [10.0, 0.5, 1e9],
+                      [numpy.nan, 0.5, 3], [10.0, 0.5, 3, 6]]:
+            with pytest.raises(ValueError):
+                parse_evaluation_request(argin)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the DeliveryTelemetry."""
+
+# Standard imports
+import json
+
+#Local imports
+from ska_mid_cbf_mcs.commons.delivery_telemetry import DeliveryTelemetry
+
+
+class TestDeliveryTelemetry:
+
+    def test_lateness_histogram(self):
+        telemetry = DeliveryTelemetry(bucket_edges=(0.01, 0.1))
+        assert telemetry.histogram() == [0, 0, 0]
+
+        assert telemetry.record("delay_model", 90.0, 100.0, 100.0, 100.005) == \
+            100.005 - 100.0
+        telemetry.record("delay_model", 90.0, 100.0, 100.0, 100.05)
+        telemetry.record("jones_matrix", 90.0, 100.0, 100.0, 101.0)
+
+        assert telemetry.histogram("delay_model") == [1, 1, 0]
+        assert telemetry.histogram("jones_matrix") == [0, 0, 1]
+        assert telemetry.histogram() == [1, 1, 1]
+
+    def test_staged_lateness_histogram(self):
+        # staged updates are due 2 s before their epoch; their lateness is
+        # measured against that deadline, so they spread over the buckets
+        telemetry = DeliveryTelemetry()
+        for completed in [97.9995, 98.0005, 98.003, 98.02, 98.3, 99.0]:
+            lateness = telemetry.record(
+                "delay_model", 90.0, 100.0, 98.0, completed, deadline=98.0)
+            assert abs(lateness - (completed - 98.0)) < 1e-9
+
+        histogram = telemetry.histogram("delay_model")
+        assert histogram == [1, 1, 1, 0, 1, 0, 1, 1, 0, 0]
+        assert telemetry.to_dict()["delay_model"]["last"]["deadline"] == 98.0
+
+    def test_arrived_late(self):
+        telemetry = DeliveryTelemetry()
+        telemetry.record("delay_model", 90.0, 100.0, 100.0, 100.1)
+        telemetry.record("delay_model", 101.0, 100.0, 101.0, 101.1)
+        telemetry.record("beam_weights", 102.0, 100.0, 102.0, 102.1)
+
+        assert telemetry.arrived_late_count("delay_model") == 1
+        assert telemetry.arrived_late_count() == 2
+
+    def test_to_dict(self):
+        telemetry = DeliveryTelemetry(bucket_edges=(0.01, 0.1))
+        telemetry.record("delay_model", 90.0, 100.0, 100.0, 100.5)
+
+        telemetry_dict = json.loads(json.dumps(telemetry.to_dict()))
+        assert telemetry_dict["bucket_edges"] == [0.01, 0.1]
+        assert telemetry_dict["delay_model"]["last"] == {
+            "arrived": 90.0, "epoch": 100.0, "deadline": 100.0, "issued": 100.0,
+            "completed": 100.5,
+            "lateness": 0.5
+        }
+        assert telemetry_dict["delay_model"]["histogram"] == [0, 0, 1]
+        assert telemetry_dict["delay_model"]["arrived_late"] == 0
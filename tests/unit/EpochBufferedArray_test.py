@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the EpochBufferedArray."""
+
+# Standard imports
+import time
+
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.epoch_buffer import EpochBufferedArray
+
+
+def wait_for_swaps(table, count, timeout=5.0):
+    deadline = time.time() + timeout
+    while table.swap_count < count and time.time() < deadline:
+        time.sleep(0.001)
+    return table.swap_count >= count
+
+
+class TestEpochBufferedArray:
+
+    def test_activated_at_epoch(self):
+        table = EpochBufferedArray((4, 2), name="delay_model")
+        epoch = time.time() + 0.05
+        table.stage(epoch, [1], [[1.0, 2.0]])
+        assert table.pending_epoch == epoch
+        assert table.active[1].tolist() == [0.0, 0.0]
+
+        assert wait_for_swaps(table, 1)
+        assert time.time() >= epoch
+        assert table.active[1].tolist() == [1.0, 2.0]
+        assert table.active_epoch == epoch
+        assert table.pending_epoch == 0.0
+        assert 0.0 <= table.last_jitter < 0.05
+        table.stop()
+
+    def test_updates_activated_in_epoch_order(self):
+        table = EpochBufferedArray((4, 1))
+        now = time.time()
+        table.stage(now + 0.06, [0], [[2.0]])
+        table.stage(now + 0.03, [0, 1], [[1.0], [1.0]])
+        assert table.pending_epoch == now + 0.03
+
+        assert wait_for_swaps(table, 1)
+        assert table.active[:, 0].tolist() == [1.0, 1.0, 0.0, 0.0]
+        assert wait_for_swaps(table, 2)
+        # the second update applies on top of the first one
+        assert table.active[:, 0].tolist() == [2.0, 1.0, 0.0, 0.0]
+        table.stop()
+
+    def test_apply_and_clear(self):
+        table = EpochBufferedArray((2, 2))
+        table.apply([0], [[3.0, 4.0]])
+        table.stage(time.time() + 0.03, [1], [[5.0, 6.0]])
+        assert wait_for_swaps(table, 1)
+        assert table.active.tolist() == [[3.0, 4.0], [5.0, 6.0]]
+
+        table.stage(time.time() + 60, [0], [[7.0, 8.0]])
+        table.clear()
+        assert table.pending_count == 0
+        assert table.active_epoch == 0.0
+        assert table.active.tolist() == [[0.0, 0.0], [0.0, 0.0]]
+        table.stop()
+
+    def test_on_activate(self):
+        activations = []
+        table = EpochBufferedArray(
+            (2, 1), on_activate=lambda epoch, indices, values: activations.append(
+                (epoch, indices, values)))
+        table.apply([0], [[1.0]])
+        epoch = time.time() + 0.02
+        table.stage(epoch, [1], [[2.0]])
+        assert wait_for_swaps(table, 1)
+
+        assert len(activations) == 2
+        assert activations[0][1:] == ([0], [[1.0]])
+        assert activations[1] == (epoch, [1], [[2.0]])
+        table.stop()
+
+    def test_invalid_update_rejected(self):
+        table = EpochBufferedArray((4, 2), name="delay_model")
+        for indices, values in [([4], [[1.0, 2.0]]), ([-1], [[1.0, 2.0]]),
+                                ([0], [[1.0, 2.0, 3.0]]), ([0, 1], [[1.0, 2.0]]),
+                                ([0.5], [[1.0, 2.0]])]:
+            with pytest.raises(ValueError):
+                table.stage(time.time(), indices, values)
+            with pytest.raises(ValueError):
+                table.apply(indices, values)
+        assert table.pending_count == 0
+        assert not table.active.any()
+
+    def test_failing_callback_keeps_timer_running(self):
+        def on_activate(epoch, indices, values):
+            raise RuntimeError("callback failure")
+
+        table = EpochBufferedArray((2, 1), on_activate=on_activate)
+        now = time.time()
+        table.stage(now + 0.01, [0], [[1.0]])
+        table.stage(now + 0.02, [1], [[2.0]])
+        assert wait_for_swaps(table, 2)
+        assert table.active[:, 0].tolist() == [1.0, 2.0]
+        table.stop()
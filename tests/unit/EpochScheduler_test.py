@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the EpochScheduler."""
+
+# Standard imports
+import time
+import threading
+
+#Local imports
+from ska_mid_cbf_mcs.commons.epoch_scheduler import EpochScheduler
+
+
+class TestEpochScheduler:
+
+    def test_delivers_in_epoch_order(self):
+        scheduler = EpochScheduler("test", num_workers=2)
+        delivered = []
+        done = threading.Event()
+
+        def deliver(value):
+            delivered.append(value)
+            if len(delivered) == 3:
+                done.set()
+
+        now = time.time()
+        scheduler.schedule(now + 0.3, "model", deliver, "c")
+        scheduler.schedule(now + 0.1, "model", deliver, "a")
+        scheduler.schedule(now + 0.2, "model", deliver, "b")
+
+        assert done.wait(2)
+        assert delivered == ["a", "b", "c"]
+        assert scheduler.queue_depth == 0
+        assert scheduler.next_epoch == 0
+        scheduler.stop()
+
+    def test_cancel_pending(self):
+        scheduler = EpochScheduler("test", num_workers=1)
+        delivered = []
+
+        epoch = time.time() + 60
+        scheduler.schedule(epoch, "model", delivered.append, 1)
+        scheduler.schedule(epoch + 1, "model", delivered.append, 2)
+        assert scheduler.queue_depth == 2
+        assert scheduler.next_epoch == epoch
+
+        assert scheduler.cancel_pending() == 2
+        assert scheduler.queue_depth == 0
+        assert delivered == []
+        scheduler.stop()
+
+    def test_late_delivery_is_counted(self):
+        scheduler = EpochScheduler("test", num_workers=1, late_tolerance=0.1)
+        done = threading.Event()
+
+        scheduler.schedule(time.time() - 5, "model", done.set)
+
+        assert done.wait(2)
+        assert scheduler.late_count == 1
+        scheduler.stop()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the EventDispatchTable."""
+
+# Standard imports
+from types import SimpleNamespace
+
+import numpy
+
+#Local imports
+from ska_mid_cbf_mcs.commons.event_dispatch import EventDispatchTable
+
+
+def make_event(device_name, attr_name, value):
+    return SimpleNamespace(
+        device=SimpleNamespace(dev_name=lambda: device_name),
+        attr_name=attr_name,
+        attr_value=SimpleNamespace(value=value)
+    )
+
+
+class TestEventDispatchTable:
+
+    def test_dispatch_to_array_and_dict(self):
+        health_states = numpy.zeros(2, dtype=numpy.uint16)
+        states = {}
+        table = EventDispatchTable()
+        table.register("mid_csp_cbf/vcc/002", "healthState", health_states, 1)
+        table.register("mid_csp_cbf/vcc/002", "State", states, "mid_csp_cbf/vcc/002")
+        assert len(table) == 2
+
+        assert table.dispatch(make_event(
+            "mid_csp_cbf/vcc/002",
+            "tango://databaseds:10000/mid_csp_cbf/vcc/002/healthstate",
+            3
+        ))
+        assert health_states.tolist() == [0, 3]
+
+        assert table.dispatch(make_event("MID_CSP_CBF/vcc/002", "state", "ON"))
+        assert states == {"mid_csp_cbf/vcc/002": "ON"}
+
+    def test_unknown_attribute(self):
+        table = EventDispatchTable()
+        table.register("mid_csp_cbf/vcc/001", "State", {}, "mid_csp_cbf/vcc/001")
+        assert not table.dispatch(make_event("mid_csp_cbf/vcc/001", "adminMode", 0))
+        assert table.lookup(make_event("mid_csp_cbf/fsp/01", "State", "ON")) is None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for group_command_inout."""
+
+# Standard imports
+import itertools
+
+#Local imports
+from ska_mid_cbf_mcs.commons.group_command import group_command_inout
+
+
+class FakeReply:
+    """Group reply of one device."""
+
+    class Error:
+        def __init__(self, desc):
+            self.desc = desc
+
+    def __init__(self, device_name, error=None):
+        self._device_name = device_name
+        self._error = error
+
+    def dev_name(self):
+        return self._device_name
+
+    def has_failed(self):
+        return self._error is not None
+
+    def get_err_stack(self):
+        return [self.Error(self._error)]
+
+
+class FakeGroup:
+    """Group that records the order of the asynchronous calls."""
+
+    request_ids = itertools.count(1)
+
+    def __init__(self, name, devices, calls, failing=()):
+        self._name = name
+        self._devices = devices
+        self._calls = calls
+        self._failing = failing
+
+    def get_name(self):
+        return self._name
+
+    def command_inout_asynch(self, command_name, data=None):
+        self._calls.append(("asynch", self._name, command_name, data))
+        return next(self.request_ids)
+
+    def command_inout_reply(self, request_id, timeout_ms):
+        self._calls.append(("reply", self._name))
+        assert timeout_ms > 0
+        return [
+            FakeReply(device, "failed" if device in self._failing else None)
+            for device in self._devices
+        ]
+
+
+class TestGroupCommand:
+
+    def test_all_groups_are_called_before_replies(self):
+        calls = []
+        groups = [
+            FakeGroup("VCC", ["vcc/1", "vcc/2"], calls),
+            FakeGroup("FSP Subarray Corr", ["corr/1"], calls),
+            FakeGroup("FSP Subarray Pss", [], calls),
+        ]
+
+        report = group_command_inout(groups, "Scan", "1")
+
+        assert [call[0] for call in calls] == ["asynch"] * 3 + ["reply"] * 3
+        assert all(call[3] == "1" for call in calls[:3])
+        assert report.ok
+        assert list(report.devices) == ["vcc/1", "vcc/2", "corr/1"]
+        assert all(result.latency >= 0 for result in report.devices.values())
+
+    def test_failures_are_reported(self):
+        calls = []
+        groups = [FakeGroup("VCC", ["vcc/1", "vcc/2"], calls, failing=["vcc/2"])]
+
+        report = group_command_inout(groups, "EndScan")
+
+        assert calls[0] == ("asynch", "VCC", "EndScan", None)
+        assert report.failed == ["vcc/2"]
+        devices = report.to_dict()["devices"]
+        assert devices["vcc/1"]["ok"]
+        assert devices["vcc/2"]["error"] == "failed"
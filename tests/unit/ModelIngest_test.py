@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the model ingest helpers."""
+
+# Standard imports
+import numpy
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.model_ingest import \
+    find_receptor_entry, frequency_slice_rows, split_epoch
+
+
+class TestModelIngest:
+
+    def test_find_receptor_entry(self):
+        entries = [{"receptor": receptorID} for receptorID in [3, 1, 2]]
+        assert find_receptor_entry(entries, 1) is entries[1]
+        assert find_receptor_entry(entries, 4) is None
+        assert find_receptor_entry(entries[:1], 3) is entries[0]
+        assert find_receptor_entry(entries[:1], 1) is None
+        assert find_receptor_entry([], 1) is None
+
+    def test_frequency_slice_rows(self):
+        frequency_slices = [
+            {"fsid": 3, "delayCoeff": [1, 2, 3, 4, 5, 6]},
+            {"fsid": 1, "delayCoeff": [7, 8, 9, 10, 11, 12]},
+        ]
+        indices, values = frequency_slice_rows(frequency_slices, "delayCoeff", 6)
+        assert indices.tolist() == [2, 0]
+
+        storage = numpy.zeros((26, 6))
+        storage[indices, :] = values
+        assert storage[2].tolist() == [1, 2, 3, 4, 5, 6]
+        assert storage[0].tolist() == [7, 8, 9, 10, 11, 12]
+
+        indices, values = frequency_slice_rows([], "matrix", 16)
+        assert values.shape == (0, 16)
+
+    @pytest.mark.parametrize("frequency_slices", [
+        [{"fsid": 0, "matrix": [0] * 16}],
+        [{"fsid": 27, "matrix": [0] * 16}],
+        [{"fsid": 1, "matrix": [0] * 16}, {"fsid": 2, "matrix": [0] * 15}],
+        [{"fsid": 1, "matrix": [0] * 17}],
+        [{"fsid": 1}],
+    ])
+    def test_invalid_frequency_slices(self, frequency_slices):
+        with pytest.raises(ValueError):
+            frequency_slice_rows(frequency_slices, "matrix", 16)
+
+    def test_split_epoch(self):
+        entries = [{"receptor": 1}]
+        assert split_epoch(entries, "delayDetails") == (None, entries)
+        assert split_epoch({"epoch": "12.5", "delayDetails": entries}, "delayDetails") == \
+            (12.5, entries)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the PowerSequencer."""
+
+# Standard imports
+import itertools
+
+#Local imports
+from ska_mid_cbf_mcs.commons.power_sequencer import PowerSequencer
+
+
+class FakeReply:
+    """Group reply of one device."""
+
+    class Error:
+        def __init__(self, desc):
+            self.desc = desc
+
+    def __init__(self, device_name, error=None):
+        self._device_name = device_name
+        self._error = error
+
+    def dev_name(self):
+        return self._device_name
+
+    def has_failed(self):
+        return self._error is not None
+
+    def get_err_stack(self):
+        return [self.Error(self._error)]
+
+
+class FakeGroup:
+    """Group that records the calls of every batch."""
+
+    request_ids = itertools.count(1)
+
+    def __init__(self, name, calls, failing=()):
+        self._name = name
+        self._devices = []
+        self._calls = calls
+        self._failing = failing
+        self.timeout_ms = None
+
+    def get_name(self):
+        return self._name
+
+    def add(self, device_name):
+        self._devices.append(device_name)
+
+    def set_timeout_millis(self, timeout_ms):
+        self.timeout_ms = timeout_ms
+
+    def command_inout_asynch(self, command_name, data=None):
+        self._calls.append((self._name, command_name, list(self._devices)))
+        return next(self.request_ids)
+
+    def command_inout_reply(self, request_id, timeout_ms):
+        return [
+            FakeReply(device, "failed" if device in self._failing else None)
+            for device in self._devices
+        ]
+
+
+class TestPowerSequencer:
+
+    def test_batches(self):
+        calls = []
+        groups = []
+
+        def group_factory(name):
+            groups.append(FakeGroup(name, calls, failing=["vcc/2"]))
+            return groups[-1]
+
+        devices = ["subarray/1", "vcc/1", "vcc/2", "fsp/1", "fsp/2"]
+        sequencer = PowerSequencer(devices, batch_size=2, timeout=1.5, group_factory=group_factory)
+        assert len(sequencer) == 5
+        assert sequencer.batch_count == 3
+        assert all(group.timeout_ms == 1500 for group in groups)
+
+        progress = []
+        report = sequencer.run("On", on_progress=progress.append)
+
+        assert calls == [
+            ("Power batch 1", "On", ["subarray/1", "vcc/1"]),
+            ("Power batch 2", "On", ["vcc/2", "fsp/1"]),
+            ("Power batch 3", "On", ["fsp/2"]),
+        ]
+        assert progress == [40, 80, 100]
+        assert list(report.devices) == devices
+        assert report.failed == ["vcc/2"]
+
+    def test_single_batch(self):
+        calls = []
+        sequencer = PowerSequencer(
+            ["vcc/1", "vcc/2", "fsp/1"],
+            group_factory=lambda name: FakeGroup(name, calls))
+        assert sequencer.batch_count == 1
+
+        report = sequencer.run("Off")
+        assert len(calls) == 1
+        assert report.ok
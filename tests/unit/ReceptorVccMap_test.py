@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the receptor to VCC tables, ReceptorVccMap,
+VccMembershipReplica and ControllerReplicas."""
+
+# Standard imports
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.receptor_vcc_map import ControllerReplicas, \
+    ReceptorVccMap, VccMembershipReplica, encode_receptor_to_vcc, parse_receptor_to_vcc
+
+
+class TestParseReceptorToVcc:
+
+    def test_pairs(self):
+        receptor_to_vcc, vcc_to_receptor = parse_receptor_to_vcc(["1:4", "2:1", "3:3"], 4)
+        assert list(receptor_to_vcc) == [4, 1, 3, 0]
+        assert list(vcc_to_receptor) == [2, 0, 3, 1]
+
+    def test_identity_without_pairs(self):
+        receptor_to_vcc, vcc_to_receptor = parse_receptor_to_vcc([], 3)
+        assert list(receptor_to_vcc) == [1, 2, 3]
+        assert list(vcc_to_receptor) == [1, 2, 3]
+
+    @pytest.mark.parametrize("pairs", [["1-2"], ["0:1"], ["1:5"], ["1:1", "2:1"], ["1:1", "1:2"]])
+    def test_invalid(self, pairs):
+        with pytest.raises(ValueError):
+            parse_receptor_to_vcc(pairs, 4)
+
+
+class TestReceptorVccMap:
+
+    def test_lookup(self):
+        encoded = encode_receptor_to_vcc(1, {1: 3, 2: 1, 3: 2}, 4)
+        assert encoded == [1, 3, 1, 2, 0]
+
+        receptor_to_vcc = ReceptorVccMap()
+        assert receptor_to_vcc.version == 0
+        assert receptor_to_vcc.update(encoded)
+        assert not receptor_to_vcc.update(encoded)
+        assert receptor_to_vcc.version == 1
+        assert receptor_to_vcc.vcc_id(1) == 3
+        assert receptor_to_vcc.receptor_id(3) == 1
+        for receptorID in [0, 4, 5]:
+            with pytest.raises(KeyError):
+                receptor_to_vcc.vcc_id(receptorID)
+
+    def test_loaded_once_without_events(self):
+        reads = []
+
+        def read():
+            reads.append(1)
+            return [7, 2, 1]
+
+        receptor_to_vcc = ReceptorVccMap(read=read)
+        assert receptor_to_vcc.vcc_id(1) == 2
+        assert receptor_to_vcc.vcc_id(2) == 1
+        assert len(reads) == 1
+        assert receptor_to_vcc.version == 7
+
+
+class TestVccMembershipReplica:
+
+    def test_mismatch_is_confirmed_remotely(self):
+        reads = []
+        remote_membership = {1: 2, 2: 0}
+
+        def read_membership(vccID):
+            reads.append(vccID)
+            return remote_membership[vccID]
+
+        membership = VccMembershipReplica(read_membership)
+        membership.update([0, 0])
+
+        # the replica is stale: confirmed with the VCC, then cached
+        assert membership.subarray_id(1, 2) == 2
+        assert membership.subarray_id(1, 2) == 2
+        assert reads == [1]
+
+        assert membership.subarray_id(2, 2) == 0
+        assert reads == [1, 2]
+
+
+class FakeController:
+    """Controller proxy that records its subscriptions."""
+
+    def __init__(self):
+        self.receptorToVccMap = encode_receptor_to_vcc(1, {1: 2}, 2)
+        self.callbacks = {}
+        self._next_id = 0
+
+    def subscribe_event(self, attribute_name, event_type, callback, stateless=False):
+        self._next_id += 1
+        self.callbacks[self._next_id] = (attribute_name, callback)
+        return self._next_id
+
+    def unsubscribe_event(self, event_id):
+        del self.callbacks[event_id]
+
+
+class TestControllerReplicas:
+
+    def test_subscribe_and_unsubscribe(self):
+        controller = FakeController()
+        replicas = ControllerReplicas(controller, [])
+        assert replicas.receptor_to_vcc.vcc_id(1) == 2
+
+        replicas.subscribe()
+        assert sorted(name for name, _ in controller.callbacks.values()) == \
+            ["receptorToVccMap", "reportVCCSubarrayMembership"]
+
+        # a re-Init unsubscribes before subscribing again
+        replicas.unsubscribe()
+        assert controller.callbacks == {}
+        replicas.unsubscribe()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the ReconnectionQueue."""
+
+# Standard imports
+import threading
+
+#Local imports
+from ska_mid_cbf_mcs.commons.reconnection_queue import ReconnectionQueue
+
+
+class TestReconnectionQueue:
+
+    def test_retries_until_connected(self):
+        attempts = []
+        connected = threading.Event()
+
+        def connect(device_name):
+            attempts.append(device_name)
+            if len(attempts) < 3:
+                raise RuntimeError("unreachable")
+
+        queue = ReconnectionQueue(
+            connect, initial_delay=0.001, max_delay=0.01,
+            on_connected=lambda device_name: connected.set())
+        queue.add("mid_csp_cbf/vcc/001")
+        queue.add("mid_csp_cbf/vcc/001")
+        assert queue.pending == ["mid_csp_cbf/vcc/001"]
+
+        assert connected.wait(5)
+        assert attempts == ["mid_csp_cbf/vcc/001"] * 3
+        assert queue.pending == []
+        assert queue.connected_count == 1
+        queue.stop()
+
+    def test_backoff(self):
+        queue = ReconnectionQueue(lambda device_name: None, initial_delay=1.0, max_delay=5.0)
+        assert [queue._delay(attempts) for attempts in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_stop(self):
+        def connect(device_name):
+            raise RuntimeError("unreachable")
+
+        queue = ReconnectionQueue(connect, initial_delay=0.001, max_delay=0.001)
+        queue.add("mid_csp_cbf/fsp/01")
+        queue.stop()
+        assert len(queue) == 0
+        queue.add("mid_csp_cbf/fsp/02")
+        assert len(queue) == 0
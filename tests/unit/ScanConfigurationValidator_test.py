@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the ScanConfigurationValidator."""
+
+# Standard imports
+import os
+import json
+
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.subarray.scan_configuration import ScanConfiguration
+from ska_mid_cbf_mcs.subarray.scan_configuration_validator import ScanConfigurationValidator
+
+file_path = os.path.dirname(os.path.abspath(__file__))
+
+RECEPTORS = [1, 2, 3, 4]
+
+
+class TestScanConfigurationValidator:
+
+    @pytest.fixture(scope="class")
+    def validator(self):
+        return ScanConfigurationValidator(4)
+
+    @pytest.fixture
+    def full_configuration(self):
+        with open(file_path + "/../data/ConfigureScan_basic.json") as f:
+            return json.load(f)
+
+    @staticmethod
+    def validate(validator, full_configuration, receptors=RECEPTORS):
+        scan_config = ScanConfiguration(json.dumps(full_configuration), receptors)
+        return validator.validate(scan_config, receptors)
+
+    def test_valid_configuration(self, validator, full_configuration):
+        assert self.validate(validator, full_configuration) == []
+
+    def test_all_violations_are_reported(self, validator, full_configuration):
+        full_configuration["common"]["band_5_tuning"] = [1, 2]
+        fsp_corr, fsp_pss, fsp_pst = full_configuration["cbf"]["fsp"]
+        fsp_corr["zoom_factor"] = 9
+        del fsp_corr["channel_offset"]
+        fsp_pss["search_beam"][0]["search_beam_destination_address"] = "10.1.1"
+        fsp_pst["fsp_id"] = 5
+
+        errors = self.validate(validator, full_configuration)
+        assert len(errors) == 5
+        assert "common.band_5_tuning: Elements in 'band5Tuning'" in errors[-1]
+        assert any(error.startswith("cbf.fsp[0].zoom_factor") for error in errors)
+        assert any(error.startswith("cbf.fsp[2].fsp_id") for error in errors)
+
+    def test_cross_field_rules(self, validator, full_configuration):
+        fsp_corr = full_configuration["cbf"]["fsp"][0]
+        fsp_corr["zoom_window_tuning"] = 1
+        fsp_corr["channel_averaging_map"][1] = [5, 8]
+
+        errors = self.validate(validator, full_configuration, [1, 2, 3])
+        assert errors == [
+            "cbf.fsp[0]: Receptor 4 does not belong to the subarray.",
+            "cbf.fsp[0].zoom_window_tuning: 'zoomWindowTuning' must be within "
+            "observed frequency slice.",
+            "cbf.fsp[0].channel_averaging_map[1]: 5 is not the channel ID of the "
+            "first channel in a group."
+        ]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the ScanConfiguration."""
+
+# Standard imports
+import os
+import json
+
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.subarray.scan_configuration import ScanConfiguration
+
+file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestScanConfiguration:
+
+    @pytest.fixture
+    def argin(self):
+        with open(file_path + "/../data/ConfigureScan_basic.json") as f:
+            return f.read().replace("\n", "")
+
+    def test_common_parameters_are_applied(self, argin):
+        scan_config = ScanConfiguration(argin, [4, 1])
+        for fsp in scan_config.fsp:
+            assert fsp["config_id"] == scan_config.config_id
+            assert fsp["frequency_band"] == "5a"
+            assert fsp["band_5_tuning"] == [5.85, 7.25]
+            assert fsp["frequency_band_offset_stream_1"] == \
+                scan_config.frequency_band_offset_stream_1
+        for search_window in scan_config.search_windows:
+            assert search_window["band_5_tuning"] == [5.85, 7.25]
+
+    def test_default_receptors(self, argin):
+        fsp_pss = [fsp for fsp in ScanConfiguration(argin, [4, 1]).fsp
+                   if fsp["function_mode"] == "PSS-BF"][0]
+        for search_beam in fsp_pss["search_beam"]:
+            assert "receptor_ids" in search_beam
+
+    def test_argin_is_not_modified(self, argin):
+        full_configuration = json.loads(argin)
+        full_configuration["common"].pop("band_5_tuning")
+        full_configuration["cbf"].pop("frequency_band_offset_stream_1")
+        scan_config = ScanConfiguration(json.dumps(full_configuration), [4])
+
+        assert scan_config.band_5_tuning == [0, 0]
+        assert scan_config.frequency_band_offset_stream_1 == 0
+        assert "band_5_tuning" not in full_configuration["common"]
+        with pytest.raises(TypeError):
+            scan_config.fsp[0]["fsp_id"] = 4
+
+    def test_payloads_are_serialized_once(self, argin):
+        scan_config = ScanConfiguration(argin, [4, 1])
+        payload = scan_config.fsp_payload(0)
+        assert json.loads(payload) == dict(scan_config.fsp[0])
+        assert scan_config.fsp_payload(0) is payload
+        assert scan_config.search_window_payloads[0] is \
+            scan_config.search_window_payloads[0]
+
+    def test_invalid_argin(self):
+        with pytest.raises(ValueError):
+            ScanConfiguration("not json")
+        with pytest.raises(ValueError):
+            ScanConfiguration(json.dumps({"common": {}}))
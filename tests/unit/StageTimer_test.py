@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the StageTimer and StageTimingHistory."""
+
+# Standard imports
+import json
+import time
+
+import pytest
+
+#Local imports
+from ska_mid_cbf_mcs.commons.stage_timer import StageTimer, StageTimingHistory
+
+
+class TestStageTimer:
+
+    def test_stages(self):
+        timer = StageTimer()
+        time.sleep(0.01)
+        timer.mark("parse")
+        timer.mark("validate")
+        time.sleep(0.01)
+        timer.mark("parse")
+
+        assert list(timer.stages) == ["parse", "validate"]
+        assert timer.stages["parse"] >= 0.02
+        assert timer.total == pytest.approx(sum(timer.stages.values()))
+
+    def test_history(self):
+        history = StageTimingHistory(length=3)
+        for i in range(5):
+            timer = StageTimer()
+            timer.stages["parse"] = float(i)
+            history.add(timer, config_id=str(i))
+
+        assert len(history) == 3
+        runs = json.loads(json.dumps(history.to_dict()))["runs"]
+        assert [run["config_id"] for run in runs] == ["2", "3", "4"]
+
+        statistics = history.statistics()
+        assert statistics["parse"] == {"p50": 3.0, "p95": 4.0, "max": 4.0, "count": 3}
+        assert "total" in statistics
+
+    def test_empty_history(self):
+        assert StageTimingHistory().to_dict() == {"runs": [], "statistics": {}}
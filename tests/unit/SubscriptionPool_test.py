@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the SubscriptionPool."""
+
+# Standard imports
+import itertools
+import threading
+import time
+
+#Local imports
+from ska_mid_cbf_mcs.commons.subscription_pool import SubscriptionPool
+
+
+class FakeAttributeProxy:
+    """Attribute proxy that records its subscriptions."""
+
+    event_ids = itertools.count(1)
+
+    def __init__(self, fqdn):
+        self.fqdn = fqdn
+        self.callbacks = {}
+
+    def ping(self):
+        return 0
+
+    def subscribe_event(self, event_type, callback):
+        event_id = next(self.event_ids)
+        self.callbacks[event_id] = callback
+        callback("{} initial".format(self.fqdn))
+        return event_id
+
+    def unsubscribe_event(self, event_id):
+        del self.callbacks[event_id]
+
+    def push(self, event):
+        for callback in list(self.callbacks.values()):
+            callback(event)
+
+
+class TestSubscriptionPool:
+
+    def test_reuse_and_generations(self):
+        proxies = {}
+
+        def proxy_factory(fqdn):
+            proxies[fqdn] = FakeAttributeProxy(fqdn)
+            return proxies[fqdn]
+
+        pool = SubscriptionPool("test", proxy_factory=proxy_factory)
+        received = []
+
+        pool.begin_generation()
+        pool.acquire("a/b/c/delayModel", received.append)
+        assert received == ["a/b/c/delayModel initial"]
+
+        # a new generation ignores events until the point is acquired again
+        pool.begin_generation()
+        proxies["a/b/c/delayModel"].push("stale")
+        assert received == ["a/b/c/delayModel initial"]
+
+        # reuse replays the last event instead of subscribing again
+        pool.acquire("a/b/c/delayModel", received.append)
+        assert received[-1] == "stale"
+        proxies["a/b/c/delayModel"].push("fresh")
+        assert received[-1] == "fresh"
+
+        assert pool.subscribe_count == 1
+        assert pool.reuse_count == 1
+        assert pool.active_count == 1
+
+        pool.close()
+        assert len(pool) == 0
+        assert proxies["a/b/c/delayModel"].callbacks == {}
+
+    def test_release(self):
+        proxies = {}
+
+        def proxy_factory(fqdn):
+            proxies[fqdn] = FakeAttributeProxy(fqdn)
+            return proxies[fqdn]
+
+        pool = SubscriptionPool("test", proxy_factory=proxy_factory)
+        received = []
+
+        # first configuration uses a and b, the next one b and c
+        pool.begin_generation()
+        pool.acquire("a/b/c/delayModel", received.append)
+        pool.acquire("a/b/c/jonesMatrix", received.append)
+        pool.begin_generation()
+        pool.acquire("a/b/c/jonesMatrix", received.append)
+        pool.acquire("a/b/c/beamWeights", received.append)
+        pool.release("a/b/c/delayModel")
+        pool.release("a/b/c/jonesMatrix")
+
+        # a is unused and unsubscribed from; b is still subscribed
+        assert proxies["a/b/c/delayModel"].callbacks == {}
+        assert len(proxies["a/b/c/jonesMatrix"].callbacks) == 1
+        assert len(pool) == 2
+
+        pool.release("a/b/c/jonesMatrix")
+        pool.release("a/b/c/beamWeights")
+        assert len(pool) == 0
+        assert all(proxy.callbacks == {} for proxy in proxies.values())
+        # releasing an unknown attribute does nothing
+        pool.release("a/b/c/delayModel")
+
+    def test_concurrent_acquire(self):
+        created = []
+
+        class SlowAttributeProxy(FakeAttributeProxy):
+            def subscribe_event(self, event_type, callback):
+                time.sleep(0.05)
+                return super().subscribe_event(event_type, callback)
+
+        def proxy_factory(fqdn):
+            created.append(SlowAttributeProxy(fqdn))
+            return created[-1]
+
+        pool = SubscriptionPool("test", proxy_factory=proxy_factory)
+        threads = [
+            threading.Thread(target=pool.acquire, args=("a/b/c/delayModel", lambda event: None))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # subscribed to once, and only unsubscribed from by the last release
+        assert len(created) == 1
+        assert pool.subscribe_count == 1
+        assert pool.reuse_count == 3
+        for _ in range(3):
+            pool.release("a/b/c/delayModel")
+        assert len(created[0].callbacks) == 1
+        pool.release("a/b/c/delayModel")
+        assert created[0].callbacks == {}
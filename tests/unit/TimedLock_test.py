@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of the mid-cbf-mcs project
+#
+#
+#
+# Distributed under the terms of the BSD-3-Clause license.
+# See LICENSE.txt for more info.
+"""Contain the tests for the TimedLock."""
+
+# Standard imports
+import threading
+import time
+
+#Local imports
+from ska_mid_cbf_mcs.commons.timed_lock import TimedLock
+
+
+class TestTimedLock:
+
+    def test_hold_time(self):
+        lock = TimedLock("delay_model/vcc")
+        assert lock.statistics()["count"] == 0
+
+        with lock:
+            time.sleep(0.02)
+        statistics = lock.statistics()
+        assert statistics["count"] == 1
+        assert statistics["last_hold"] >= 0.02
+        assert statistics["max_hold"] == statistics["last_hold"]
+
+    def test_wait_time(self):
+        lock = TimedLock("delay_model/fsp")
+
+        def waiter_target():
+            with lock:
+                pass
+
+        lock.acquire()
+        waiter = threading.Thread(target=waiter_target)
+        waiter.start()
+        time.sleep(0.02)
+        lock.release()
+        waiter.join()
+
+        statistics = lock.statistics()
+        assert statistics["count"] == 2
+        assert statistics["max_wait"] >= 0.02